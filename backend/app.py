@@ -1,13 +1,27 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, stream_with_context
 from flask_cors import CORS
 import json
 import logging
 import datetime
-from typing import Dict, List, Optional, Any
-from medical_model import MedicalDiagnosisModel
+import os
+from typing import Dict, List, Optional, Any, Tuple
+from werkzeug.local import LocalProxy
+from assessment_cache import AssessmentCache, assessment_key
+from diagnosis_sessions import SessionStore
+from medical_model import get_model, preload_model
+from ndjson import DECODE_ERRORS, UnsupportedEncoding, iter_lines, open_body
+from recommendation_rules import EXERCISE_LEVELS, SLEEP_BANDS, age_band, bmi_band
+from request_logging import QUEUE_SIZE, Redacted, begin_request, configure_logging, parse_sample_rates
+from response_builder import FragmentCache, encode, encode_with_fragments
+from scoring_strategies import strategy_registry
+from static_responses import STATIC_MAX_AGE, StaticResponse
 
-# Initialize medical model instance
-medical_model = MedicalDiagnosisModel()
+# Process-wide medical model, built on first use (see medical_model.get_model)
+medical_model = LocalProxy(get_model)
+
+# Build the model at import time, e.g. under gunicorn --preload so workers share it
+if os.environ.get('PRELOAD_MODEL', '').lower() in ('1', 'true', 'yes'):
+    preload_model()
 
 
 app = Flask(__name__)
@@ -17,6 +31,20 @@ CORS(app, resources={r"/api/*": {"origins": "*", "allow_headers": ["Content-Type
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Hand log records to a background writer, keeping only a sample of each route's INFO logs,
+# e.g. LOG_SAMPLE_RATES="/api/health-assessment=0.05,/health=0"; at most LOG_QUEUE_SIZE records wait to be written
+if os.environ.get('ASYNC_LOGGING', '').lower() in ('1', 'true', 'yes'):
+    configure_logging(
+        sample_rates=parse_sample_rates(os.environ.get('LOG_SAMPLE_RATES', '')),
+        default_rate=float(os.environ.get('LOG_SAMPLE_RATE', '1.0')),
+        queue_size=int(os.environ.get('LOG_QUEUE_SIZE', str(QUEUE_SIZE)))
+    )
+
+
+@app.before_request
+def sample_request_logs():
+    begin_request(request.path)
+
 # Health conditions with detailed diagnosis and recommendations
 HEALTH_CONDITIONS = {
     'fever_headache': {
@@ -325,193 +353,727 @@ def generate_fitness_plan(age: int, lifestyle: str) -> Dict[str, Any]:
             'rest': ['7-8 hours sleep', '1 rest day per week', 'Recovery techniques']
         }
 
+# Largest number of assessments accepted by the batch endpoint
+MAX_BATCH_SIZE = 10000
+
+# Streamed bulk assessments: records assessed together, and the longest record line accepted
+STREAM_CHUNK_SIZE = int(os.environ.get('STREAM_CHUNK_SIZE', 256))
+MAX_STREAM_LINE_BYTES = int(os.environ.get('MAX_STREAM_LINE_BYTES', 1024 * 1024))
+
+# Results of equivalent assessments (see assessment_cache.assessment_key). ASSESSMENT_CACHE_SIZE=0
+# disables the cache; ASSESSMENT_CACHE_DB adds a SQLite tier shared by the workers on this host.
+_assessment_ttl = os.environ.get('ASSESSMENT_CACHE_TTL', '300')
+assessment_cache = AssessmentCache(
+    capacity=int(os.environ.get('ASSESSMENT_CACHE_SIZE', 1024)),
+    ttl=float(_assessment_ttl) if _assessment_ttl else None,
+    shared_path=os.environ.get('ASSESSMENT_CACHE_DB') or None,
+    shared_capacity=int(os.environ.get('ASSESSMENT_CACHE_DB_SIZE', 10000))
+)
+
+
+# Scoring strategy of assessments that do not choose one (see scoring_strategies)
+DEFAULT_STRATEGY = os.environ.get('SCORING_STRATEGY', 'fuzzy')
+if DEFAULT_STRATEGY not in strategy_registry:
+    logger.error(f"Unknown SCORING_STRATEGY {DEFAULT_STRATEGY!r}, using 'fuzzy'")
+    DEFAULT_STRATEGY = 'fuzzy'
+
+# Symptom typeahead: most suggestions per request, and longest prefix looked up
+MAX_AUTOCOMPLETE_LIMIT = 25
+MAX_AUTOCOMPLETE_QUERY = 100
+
+# Incremental diagnosis sessions (see diagnosis_sessions), held by this worker process
+MAX_SESSION_SYMPTOMS = 64
+MAX_SESSION_TOP_K = 20
+session_store = SessionStore(
+    max_bytes=int(float(os.environ.get('SESSION_MEMORY_MB', 64)) * 1024 * 1024),
+    ttl=float(os.environ.get('SESSION_TTL', 1800))
+)
+
+
+def validate_assessment(data: Any) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, str]]]:
+    """Validate a health assessment payload.
+
+    Returns ``(params, None)`` with the normalized request fields, or
+    ``(None, error)`` with the error body to return with a 400 status.
+    """
+    if not data or not isinstance(data, dict):
+        logger.error("Invalid input data format")
+        return None, {
+            'error': 'Invalid input data format',
+            'details': 'Request body must be a JSON object'
+        }
+    
+    # Required fields validation (free-text symptoms can replace the symptom list)
+    required_fields = ['symptoms', 'age', 'gender', 'height', 'weight']
+    if 'symptoms_text' in data:
+        required_fields.remove('symptoms')
+    missing_fields = [field for field in required_fields if field not in data]
+    if missing_fields:
+        logger.error(f"Missing required fields: {missing_fields}")
+        return None, {
+            'error': 'Missing required fields',
+            'details': f"Missing fields: {', '.join(missing_fields)}"
+        }
+    
+    # Extract and validate data
+    symptoms = data.get('symptoms', [])
+    if not isinstance(symptoms, list) or not all(isinstance(s, str) for s in symptoms):
+        logger.error("Invalid symptoms format")
+        return None, {
+            'error': 'Invalid symptoms format',
+            'details': 'Symptoms must be a list of strings'
+        }
+    
+    # Extract canonical symptoms from free text, if provided
+    symptoms_text = data.get('symptoms_text')
+    if symptoms_text is not None:
+        if not isinstance(symptoms_text, str):
+            logger.error("Invalid symptoms_text format")
+            return None, {
+                'error': 'Invalid symptoms_text format',
+                'details': 'symptoms_text must be a string'
+            }
+        extracted = medical_model.extract_symptoms(symptoms_text)
+        symptoms = symptoms + [s for s in extracted if s not in symptoms]
+    
+    # Convert and validate numeric values
+    try:
+        age = int(data.get('age', ''))
+        weight = int(data.get('weight', ''))
+        height = int(data.get('height', ''))
+        
+        if age <= 0 or weight <= 0 or height <= 0:
+            raise ValueError("Numeric values must be positive")
+            
+    except (ValueError, TypeError) as e:
+        logger.warning(f"Error converting numeric values: {str(e)}")
+        return None, {
+            'error': 'Invalid numeric values',
+            'details': str(e)
+        }
+    
+    # Handle lifestyle data
+    lifestyle = data.get('lifestyle', {})
+    if not isinstance(lifestyle, dict):
+        lifestyle = {}
+        logger.warning("Lifestyle data not provided as dictionary, using default values")
+    
+    gender = data.get('gender', '').lower()
+    if gender not in ['male', 'female', 'other']:
+        gender = None
+        logger.warning(f"Invalid gender value, using None")
+    
+    # Scoring strategy, e.g. exact overlap for callers sending canonical symptoms
+    strategy = data.get('strategy', DEFAULT_STRATEGY)
+    if strategy not in strategy_registry:
+        logger.error("Invalid strategy")
+        return None, {
+            'error': 'Invalid strategy',
+            'details': f"strategy must be one of: {', '.join(strategy_registry.names())}"
+        }
+    
+    return {
+        'symptoms': symptoms,
+        'age': age,
+        'gender': gender,
+        'weight': weight,
+        'height': height,
+        'lifestyle': lifestyle,
+        'strategy': strategy
+    }, None
+
+
+def check_diagnosis(diagnosis: Optional[Dict[str, Any]]) -> Optional[Dict[str, str]]:
+    """Return the error body for an empty or incomplete diagnosis, or None if it is usable."""
+    if not diagnosis:
+        logger.error("Medical model returned empty diagnosis")
+        return {
+            'error': 'Failed to generate diagnosis',
+            'details': 'Medical model returned empty response'
+        }
+    
+    # Validate diagnosis response
+    required_diagnosis_fields = [
+        'diagnosis', 'condition', 'condition_id', 'confidence',
+        'severity', 'description', 'recommendation',
+        'alternative_conditions', 'symptoms'
+    ]
+    missing_fields = [field for field in required_diagnosis_fields if field not in diagnosis]
+    if missing_fields:
+        logger.error(f"Missing fields in diagnosis: {missing_fields}")
+        return {
+            'error': 'Incomplete diagnosis data',
+            'details': f"Missing fields: {', '.join(missing_fields)}"
+        }
+    return None
+
+
+# Recommendation sections shared by every request in a bucket, kept with their encoded JSON
+fragments = FragmentCache()
+
+# Assessment data fields filled from ``fragments``
+SHARED_SECTIONS = (
+    'lifestyle_recommendations', 'preventive_measures', 'diet_plan',
+    'fitness_plan', 'emergency_contacts', 'health_tips'
+)
+
+
+def _shared(sections: Optional[Dict], key: Tuple, build):
+    """Build a recommendation section once per key when a shared section cache is given."""
+    if sections is None:
+        return build()
+    if key not in sections:
+        sections[key] = build()
+    return sections[key]
+
+
+def build_assessment_data(diagnosis: Dict[str, Any], params: Dict[str, Any],
+                          sections: Optional[Dict] = None) -> Dict[str, Any]:
+    """Combine a diagnosis with the recommendation sections for one assessment.
+
+    Sections that only depend on a bucket of the inputs (condition, age band,
+    BMI band, exercise and sleep answers) come from the process-wide
+    ``fragments``; ``sections`` additionally lets a batch reuse the
+    differential and follow-up sections across patients.
+    """
+    condition = diagnosis['condition']
+    symptoms = params['symptoms']
+    age = params['age']
+    weight = params['weight']
+    height = params['height']
+    lifestyle = params['lifestyle']
+    # Buckets of the inputs the lifestyle, fitness and diet rules read; unknown answers behave alike
+    exercise = lifestyle.get('exercise', 'sometimes')
+    exercise_level = exercise if exercise in EXERCISE_LEVELS else None
+    sleep = lifestyle.get('sleep', '7-8')
+    sleep_level = sleep if sleep in SLEEP_BANDS else None
+    data = {
+        **diagnosis
+    }
+
+    # Try to get differential diagnosis
+    try:
+        differential = _shared(sections, ('differential', condition, tuple(symptoms)),
+                               lambda: medical_model.get_differential_diagnosis(condition, symptoms))
+        data['differential_diagnosis'] = differential
+    except AttributeError:
+        logger.warning("Differential diagnosis method not available")
+
+    # Try to get follow-up instructions
+    try:
+        follow_up = _shared(sections, ('follow_up', condition, age, tuple(symptoms)),
+                            lambda: medical_model.get_follow_up_instructions(condition, age, symptoms))
+        data['follow_up_instructions'] = follow_up
+    except AttributeError:
+        logger.warning("Follow-up instructions method not available")
+
+    # Try to get lifestyle recommendations
+    try:
+        lifestyle_rec = fragments.section(('lifestyle', exercise_level, sleep_level),
+                                          lambda: medical_model.get_lifestyle_recommendations(lifestyle))
+        data['lifestyle_recommendations'] = lifestyle_rec
+    except AttributeError:
+        logger.warning("Lifestyle recommendations method not available")
+
+    # Try to get preventive measures
+    try:
+        preventive = fragments.section(('preventive', condition),
+                                       lambda: medical_model.get_preventive_measures(condition))
+        data['preventive_measures'] = preventive
+    except AttributeError:
+        logger.warning("Preventive measures method not available")
+
+    # Try to get diet plan
+    try:
+        diet_plan = fragments.section(('diet', age_band(age), bmi_band(weight, height),
+                                       exercise in ('regularly', 'daily')),
+                                      lambda: medical_model.generate_diet_plan(age, weight, height, lifestyle))
+        data['diet_plan'] = diet_plan
+    except AttributeError:
+        logger.warning("Diet plan method not available")
+
+    # Try to get fitness plan
+    try:
+        fitness_plan = fragments.section(('fitness', exercise_level, sleep_level),
+                                         lambda: medical_model.generate_fitness_plan(age, lifestyle))
+        data['fitness_plan'] = fitness_plan
+    except AttributeError:
+        logger.warning("Fitness plan method not available")
+
+    # Try to get emergency contacts
+    try:
+        emergency = fragments.section(('emergency',), medical_model.emergency_contacts)
+        data['emergency_contacts'] = emergency
+    except AttributeError:
+        logger.warning("Emergency contacts method not available")
+
+    # Try to get health tips
+    try:
+        health_tips_list = fragments.section(('health_tips',), medical_model.health_tips)
+        data['health_tips'] = health_tips_list
+    except AttributeError:
+        logger.warning("Health tips method not available")
+
+    return data
+
+
+def assessment_body(data: Dict[str, Any]) -> bytes:
+    """JSON body for one assessment, spliced from the pre-encoded shared sections."""
+    return encode_with_fragments({
+        'timestamp': datetime.datetime.now().isoformat(),
+        'success': True,
+        'data': data
+    }, fragments, 'data', SHARED_SECTIONS) + b'\n'
+
+
+def assessment_response(data: Dict[str, Any]):
+    """Response for one assessment."""
+    return app.response_class(assessment_body(data), mimetype=app.json.mimetype)
+
+
+def cached_assessment(params: Dict[str, Any]) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+    """Return ``(cache_key, data)`` for validated params; ``data`` is None unless an equivalent request is cached."""
+    key = assessment_key(params, medical_model.symptom_index.fingerprint)
+    cached = assessment_cache.get(key) if key is not None else None
+    if cached is None:
+        return key, None
+    # Equivalent request: reuse the body, echoing this request's symptoms
+    return key, {**cached, 'symptoms': params['symptoms']}
+
+
+def compute_assessment(params: Dict[str, Any],
+                       key: Optional[str]) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, str]]]:
+    """Diagnose validated params and add the recommendation sections.
+
+    Returns ``(data, None)``, caching ``data`` under ``key``, or
+    ``(None, error)`` with the error body to return with a 500 status.
+    """
+    # Generate diagnosis
+    diagnosis = medical_model.generate_diagnosis(
+        symptoms=params['symptoms'],
+        age=params['age'],
+        gender=params['gender'],
+        strategy=params['strategy']
+    )
+    
+    error = check_diagnosis(diagnosis)
+    if error:
+        return None, error
+    
+    # Generate recommendations using medical_model instance
+    try:
+        data = build_assessment_data(diagnosis, params)
+    except Exception as e:
+        logger.error(f"Error generating recommendations: {str(e)}", exc_info=True)
+        return None, {
+            'error': 'Failed to generate recommendations',
+            'details': str(e)
+        }
+
+    if key is not None and diagnosis['condition'] != 'error':
+        assessment_cache.put(key, data)
+    logger.info("Successfully generated complete response")
+    return data, None
+
+
 @app.route('/api/health-assessment', methods=['POST'])
 def health_assessment():
     try:
         data = request.get_json()
-        logger.info(f"Received health assessment request: {data}")
+        logger.info("Received health assessment request: %s", Redacted(data))
         
-        # Validate request data
-        if not data or not isinstance(data, dict):
-            logger.error("Invalid input data format")
-            return jsonify({
-                'error': 'Invalid input data format',
-                'details': 'Request body must be a JSON object'
-            }), 400
-        
-        # Required fields validation
-        required_fields = ['symptoms', 'age', 'gender', 'height', 'weight']
-        missing_fields = [field for field in required_fields if field not in data]
-        if missing_fields:
-            logger.error(f"Missing required fields: {missing_fields}")
-            return jsonify({
-                'error': 'Missing required fields',
-                'details': f"Missing fields: {', '.join(missing_fields)}"
-            }), 400
+        params, error = validate_assessment(data)
+        if error:
+            return jsonify(error), 400
         
-        # Extract and validate data
-        symptoms = data.get('symptoms', [])
-        if not isinstance(symptoms, list) or not all(isinstance(s, str) for s in symptoms):
-            logger.error("Invalid symptoms format")
-            return jsonify({
-                'error': 'Invalid symptoms format',
-                'details': 'Symptoms must be a list of strings'
-            }), 400
+        logger.info("Processing %d symptoms", len(params['symptoms']))
+        key, data = cached_assessment(params)
+        if data is None:
+            data, error = compute_assessment(params, key)
+            if error:
+                return jsonify(error), 500
+        return assessment_response(data)
         
-        # Convert and validate numeric values
+    except ValueError as ve:
+        logger.error(f"Value error in health assessment: {str(ve)}", exc_info=True)
+        return jsonify({
+            'error': 'Invalid input data',
+            'details': str(ve)
+        }), 400
+    
+    except Exception as e:
+        logger.error(f"Unexpected error in health assessment: {str(e)}", exc_info=True)
+        return jsonify({
+            'error': 'Internal server error',
+            'details': str(e)
+        }), 500
+
+
+def assess_many(items: List[Any]) -> List[Dict[str, Any]]:
+    """Validate and assess request payloads, returning one result per item in input order.
+
+    Each result is ``{'success': True, 'data': ...}`` or ``{'success': False,
+    'error': ..., 'details': ...}``. Identical symptom sets are scored once
+    and recommendation sections are shared across the items.
+    """
+    results: List[Optional[Dict[str, Any]]] = [None] * len(items)
+    valid = []
+    for i, item in enumerate(items):
+        params, error = validate_assessment(item)
+        if error:
+            results[i] = {'success': False, **error}
+        else:
+            valid.append((i, params))
+    
+    diagnoses = medical_model.generate_diagnosis_batch([
+        {'symptoms': params['symptoms'], 'age': params['age'], 'gender': params['gender'],
+         'strategy': params['strategy']}
+        for _, params in valid
+    ])
+    
+    sections: Dict = {}
+    for (i, params), diagnosis in zip(valid, diagnoses):
+        error = check_diagnosis(diagnosis)
+        if error:
+            results[i] = {'success': False, **error}
+            continue
         try:
-            age = int(data.get('age', ''))
-            weight = int(data.get('weight', ''))
-            height = int(data.get('height', ''))
-            
-            if age <= 0 or weight <= 0 or height <= 0:
-                raise ValueError("Numeric values must be positive")
-                
-        except (ValueError, TypeError) as e:
-            logger.warning(f"Error converting numeric values: {str(e)}")
-            return jsonify({
-                'error': 'Invalid numeric values',
+            results[i] = {
+                'success': True,
+                'data': build_assessment_data(diagnosis, params, sections)
+            }
+        except Exception as e:
+            logger.error(f"Error generating recommendations: {str(e)}", exc_info=True)
+            results[i] = {
+                'success': False,
+                'error': 'Failed to generate recommendations',
                 'details': str(e)
+            }
+    return results
+
+
+@app.route('/api/health-assessment/batch', methods=['POST'])
+def health_assessment_batch():
+    """Run many health assessments in one request.
+
+    The body is ``{"assessments": [...]}`` where each item has the same shape
+    as a ``/api/health-assessment`` request. Identical symptom sets are
+    scored once and recommendation sections are shared across items. The
+    response lists one result per item, in input order; an invalid item gets
+    an error entry without failing the rest of the batch.
+    """
+    try:
+        data = request.get_json()
+        assessments = data.get('assessments') if isinstance(data, dict) else None
+        if not isinstance(assessments, list):
+            logger.error("Invalid batch input data format")
+            return jsonify({
+                'error': 'Invalid input data format',
+                'details': 'Request body must be a JSON object with an "assessments" list'
             }), 400
-        
-        # Handle lifestyle data
-        lifestyle = data.get('lifestyle', {})
-        if not isinstance(lifestyle, dict):
-            lifestyle = {}
-            logger.warning("Lifestyle data not provided as dictionary, using default values")
-        
-        gender = data.get('gender', '').lower()
-        if gender not in ['male', 'female', 'other']:
-            gender = None
-            logger.warning(f"Invalid gender value, using None")
-        
-        logger.info(f"Processing symptoms: {symptoms}")
-        logger.info(f"User data - Age: {age}, Gender: {gender}, Weight: {weight}, Height: {height}, Lifestyle: {lifestyle}")
-        
-        # Generate diagnosis
-        diagnosis = medical_model.generate_diagnosis(
-            symptoms=symptoms,
-            age=age,
-            gender=gender
-        )
-        
-        if not diagnosis:
-            logger.error("Medical model returned empty diagnosis")
+        if len(assessments) > MAX_BATCH_SIZE:
             return jsonify({
-                'error': 'Failed to generate diagnosis',
-                'details': 'Medical model returned empty response'
-            }), 500
+                'error': 'Batch too large',
+                'details': f"At most {MAX_BATCH_SIZE} assessments per request"
+            }), 413
         
-        # Validate diagnosis response
-        required_diagnosis_fields = [
-            'diagnosis', 'condition', 'condition_id', 'confidence',
-            'severity', 'description', 'recommendation',
-            'alternative_conditions', 'symptoms'
-        ]
-        missing_fields = [field for field in required_diagnosis_fields if field not in diagnosis]
-        if missing_fields:
-            logger.error(f"Missing fields in diagnosis: {missing_fields}")
-            return jsonify({
-                'error': 'Incomplete diagnosis data',
-                'details': f"Missing fields: {', '.join(missing_fields)}"
-            }), 500
+        logger.info("Received batch health assessment request with %d items", len(assessments))
         
-        # Generate recommendations using medical_model instance
-        response = {
+        results = [{'index': i, **result} for i, result in enumerate(assess_many(assessments))]
+        
+        succeeded = sum(1 for result in results if result['success'])
+        logger.info("Completed batch: %d succeeded, %d failed", succeeded, len(results) - succeeded)
+        return jsonify({
             'timestamp': datetime.datetime.now().isoformat(),
             'success': True,
-            'data': {
-                **diagnosis
-            }
-        }
+            'count': len(results),
+            'results': results
+        })
+    
+    except Exception as e:
+        logger.error(f"Unexpected error in batch health assessment: {str(e)}", exc_info=True)
+        return jsonify({
+            'error': 'Internal server error',
+            'details': str(e)
+        }), 500
 
-        try:
-            # Try to get differential diagnosis
-            try:
-                differential = medical_model.get_differential_diagnosis(diagnosis['condition'], symptoms)
-                response['data']['differential_diagnosis'] = differential
-            except AttributeError:
-                logger.warning("Differential diagnosis method not available")
-
-            # Try to get follow-up instructions
-            try:
-                follow_up = medical_model.get_follow_up_instructions(diagnosis['condition'], age, symptoms)
-                response['data']['follow_up_instructions'] = follow_up
-            except AttributeError:
-                logger.warning("Follow-up instructions method not available")
-
-            # Try to get lifestyle recommendations
-            try:
-                lifestyle_rec = medical_model.get_lifestyle_recommendations(lifestyle)
-                response['data']['lifestyle_recommendations'] = lifestyle_rec
-            except AttributeError:
-                logger.warning("Lifestyle recommendations method not available")
-
-            # Try to get preventive measures
-            try:
-                preventive = medical_model.get_preventive_measures(diagnosis['condition'])
-                response['data']['preventive_measures'] = preventive
-            except AttributeError:
-                logger.warning("Preventive measures method not available")
-
-            # Try to get diet plan
-            try:
-                diet_plan = medical_model.generate_diet_plan(age, weight, height, lifestyle)
-                response['data']['diet_plan'] = diet_plan
-            except AttributeError:
-                logger.warning("Diet plan method not available")
-
-            # Try to get fitness plan
-            try:
-                fitness_plan = medical_model.generate_fitness_plan(age, lifestyle)
-                response['data']['fitness_plan'] = fitness_plan
-            except AttributeError:
-                logger.warning("Fitness plan method not available")
-
-            # Try to get emergency contacts
-            try:
-                emergency = medical_model.emergency_contacts()
-                response['data']['emergency_contacts'] = emergency
-            except AttributeError:
-                logger.warning("Emergency contacts method not available")
-
-            # Try to get health tips
-            try:
-                health_tips_list = medical_model.health_tips()
-                response['data']['health_tips'] = health_tips_list
-            except AttributeError:
-                logger.warning("Health tips method not available")
 
-        except Exception as e:
-            logger.error(f"Error generating recommendations: {str(e)}", exc_info=True)
-            return jsonify({
-                'error': 'Failed to generate recommendations',
-                'details': str(e)
-            }), 500
 
-        logger.info("Successfully generated complete response")
-        return jsonify(response)
-        
-    except ValueError as ve:
-        logger.error(f"Value error in health assessment: {str(ve)}", exc_info=True)
+def _stream_line(result: Dict[str, Any]) -> bytes:
+    if 'data' in result:
+        return encode_with_fragments(result, fragments, 'data', SHARED_SECTIONS) + b'\n'
+    return encode(result) + b'\n'
+
+
+def _assess_stream(lines) -> Any:
+    """Assess ``(line_number, line)`` pairs a chunk at a time, yielding one NDJSON result line per record."""
+    received = succeeded = 0
+    chunk: List[Tuple[int, Any]] = []
+
+    def flush():
+        # Records that failed to parse keep their error; the rest are assessed together
+        payloads = [(number, item) for number, item in chunk if not isinstance(item, Exception)]
+        assessed = dict(zip((number for number, _ in payloads), assess_many([item for _, item in payloads])))
+        for number, item in chunk:
+            if number in assessed:
+                result = {'line': number, **assessed[number]}
+            elif isinstance(item, OverflowError):
+                result = {'line': number, 'success': False, 'error': 'Line too long',
+                          'details': f"Records are limited to {MAX_STREAM_LINE_BYTES} bytes"}
+            else:
+                result = {'line': number, 'success': False, 'error': 'Invalid JSON', 'details': str(item)}
+            yield result
+        chunk.clear()
+
+    try:
+        for number, line in lines:
+            received += 1
+            if line is None:
+                chunk.append((number, OverflowError()))
+            else:
+                try:
+                    chunk.append((number, json.loads(line)))
+                except ValueError as e:
+                    chunk.append((number, e))
+            if len(chunk) >= STREAM_CHUNK_SIZE:
+                for result in flush():
+                    succeeded += result['success']
+                    yield _stream_line(result)
+        for result in flush():
+            succeeded += result['success']
+            yield _stream_line(result)
+    except DECODE_ERRORS as e:
+        # A corrupt or truncated body cannot be resynchronized; report it and end the stream
+        logger.error(f"Could not decode bulk assessment body: {str(e)}")
+        yield encode({'success': False, 'error': 'Invalid request body', 'details': str(e)}) + b'\n'
+    logger.info("Completed bulk assessment stream: %d succeeded, %d failed", succeeded, received - succeeded)
+
+
+@app.route('/api/health-assessment/stream', methods=['POST'])
+def health_assessment_stream():
+    """Run health assessments over a newline-delimited JSON body.
+
+    Each line of the body (optionally sent with ``Content-Encoding: gzip``)
+    is one ``/api/health-assessment`` payload. Records are read and assessed
+    ``STREAM_CHUNK_SIZE`` at a time, and the response streams one NDJSON line
+    per record, in input order: ``{"line": n, "success": true, "data": ...}``
+    or ``{"line": n, "success": false, "error": ..., "details": ...}``. Blank
+    lines are skipped, and a bad record only fails its own line. Memory use
+    does not grow with the size of the upload.
+    """
+    try:
+        body = open_body(request.stream, request.headers.get('Content-Encoding'))
+    except UnsupportedEncoding as e:
         return jsonify({
-            'error': 'Invalid input data',
-            'details': str(ve)
-        }), 400
+            'error': 'Unsupported Content-Encoding',
+            'details': str(e)
+        }), 415
+    
+    logger.info("Received bulk health assessment stream")
+    lines = iter_lines(body, MAX_STREAM_LINE_BYTES)
+    return app.response_class(stream_with_context(_assess_stream(lines)), mimetype='application/x-ndjson')
+
+
+def _requested_top_k() -> Tuple[Optional[int], Any]:
+    """``(top_k, None)`` from the ``top_k`` query parameter (default 3), or ``(None, error response)``."""
+    top_k = request.args.get('top_k', 3, type=int)
+    if top_k is None or not 1 <= top_k <= MAX_SESSION_TOP_K:
+        return None, (jsonify({
+            'error': 'Invalid top_k',
+            'details': f"top_k must be an integer from 1 to {MAX_SESSION_TOP_K}"
+        }), 400)
+    return top_k, None
+
+
+def _session_state(session, top_k: int, status: int = 200):
+    """Response with a session's symptoms and current top matches."""
+    return jsonify({
+        'success': True,
+        'session_id': session.id,
+        'symptoms': list(session.symptoms),
+        'matches': [match.to_dict() for match in medical_model.session_matches(session, top_k)],
+        'expires_in': session_store.ttl
+    }), status
+
+
+def _session_not_found(session_id: str):
+    return jsonify({
+        'error': 'Session not found',
+        'details': f"No active session {session_id}; it may have expired"
+    }), 404
+
+
+def _add_session_symptom(session, symptom: Any) -> Optional[Dict[str, str]]:
+    """Add one symptom to a locked session; returns the error body on invalid input."""
+    if not isinstance(symptom, str) or not symptom.strip():
+        return {'error': 'Invalid symptom', 'details': 'Symptom must be a non-empty string'}
+    if len(session) >= MAX_SESSION_SYMPTOMS:
+        return {'error': 'Too many symptoms', 'details': f"At most {MAX_SESSION_SYMPTOMS} symptoms per session"}
+    session.add(symptom)
+    return None
+
+
+@app.route('/api/sessions', methods=['POST'])
+def create_session():
+    """Start an incremental diagnosis session, optionally with initial ``symptoms``.
+
+    Symptoms are then added and removed one at a time; each change updates
+    per-condition running sums instead of rescoring the whole list, and the
+    current matches equal what ``/api/health-assessment`` ranks for the same
+    symptoms. Sessions expire after ``SESSION_TTL`` seconds without use.
+    """
+    try:
+        top_k, error_response = _requested_top_k()
+        if error_response:
+            return error_response
+        data = request.get_json(silent=True) or {}
+        symptoms = data.get('symptoms', []) if isinstance(data, dict) else None
+        if not isinstance(symptoms, list):
+            return jsonify({
+                'error': 'Invalid symptoms format',
+                'details': 'Symptoms must be a list of strings'
+            }), 400
+        
+        session = session_store.create(medical_model.similarity_engine)
+        with session.lock:
+            for symptom in symptoms:
+                error = _add_session_symptom(session, symptom)
+                if error:
+                    session_store.delete(session.id)
+                    return jsonify(error), 400
+            session_store.resize(session)
+            logger.info("Started diagnosis session with %d symptoms", len(session))
+            return _session_state(session, top_k, 201)
     
     except Exception as e:
-        logger.error(f"Unexpected error in health assessment: {str(e)}", exc_info=True)
+        logger.error(f"Unexpected error creating session: {str(e)}", exc_info=True)
         return jsonify({
             'error': 'Internal server error',
             'details': str(e)
         }), 500
 
 
+@app.route('/api/sessions/<session_id>', methods=['GET'])
+def get_session(session_id: str):
+    """Current symptoms and top matches of a session"""
+    top_k, error_response = _requested_top_k()
+    if error_response:
+        return error_response
+    session = session_store.get(session_id)
+    if session is None:
+        return _session_not_found(session_id)
+    with session.lock:
+        return _session_state(session, top_k)
 
-@app.route('/api/health-tips', methods=['GET'])
-def health_tips():
-    """Get general health tips"""
-    tips = [
+
+@app.route('/api/sessions/<session_id>', methods=['DELETE'])
+def delete_session(session_id: str):
+    """End a session"""
+    if not session_store.delete(session_id):
+        return _session_not_found(session_id)
+    return jsonify({'success': True, 'session_id': session_id})
+
+
+@app.route('/api/sessions/<session_id>/symptoms', methods=['POST'])
+def add_session_symptom(session_id: str):
+    """Add a symptom (``{"symptom": "..."}``) and return the updated matches"""
+    top_k, error_response = _requested_top_k()
+    if error_response:
+        return error_response
+    session = session_store.get(session_id)
+    if session is None:
+        return _session_not_found(session_id)
+    data = request.get_json(silent=True)
+    with session.lock:
+        error = _add_session_symptom(session, data.get('symptom') if isinstance(data, dict) else None)
+        if error:
+            return jsonify(error), 400
+        session_store.resize(session)
+        return _session_state(session, top_k)
+
+
+@app.route('/api/sessions/<session_id>/symptoms/<path:symptom>', methods=['DELETE'])
+def remove_session_symptom(session_id: str, symptom: str):
+    """Remove a symptom and return the updated matches"""
+    top_k, error_response = _requested_top_k()
+    if error_response:
+        return error_response
+    session = session_store.get(session_id)
+    if session is None:
+        return _session_not_found(session_id)
+    with session.lock:
+        if not session.remove(symptom):
+            return jsonify({
+                'error': 'Symptom not found',
+                'details': f"Symptom not in session: {symptom}"
+            }), 404
+        session_store.resize(session)
+        return _session_state(session, top_k)
+
+
+@app.route('/api/symptoms/autocomplete', methods=['GET'])
+def symptom_autocomplete():
+    """Canonical catalog symptoms for the prefix in ``q``, most common first.
+
+    Suggestions come from the catalog vocabulary and common phrasings of it,
+    and only change with the catalog, so responses carry an ETag and may be
+    cached by browsers and proxies per query string.
+    """
+    query = request.args.get('q', '')
+    limit = request.args.get('limit', 10, type=int)
+    if limit is None or not 1 <= limit <= MAX_AUTOCOMPLETE_LIMIT:
+        return jsonify({
+            'error': 'Invalid limit',
+            'details': f"limit must be an integer from 1 to {MAX_AUTOCOMPLETE_LIMIT}"
+        }), 400
+    if len(query) > MAX_AUTOCOMPLETE_QUERY:
+        return jsonify({
+            'error': 'Query too long',
+            'details': f"q is limited to {MAX_AUTOCOMPLETE_QUERY} characters"
+        }), 400
+    
+    response = jsonify({
+        'success': True,
+        'query': query,
+        'suggestions': medical_model.suggest_symptoms(query, limit)
+    })
+    response.cache_control.public = True
+    response.cache_control.max_age = STATIC_MAX_AGE
+    response.add_etag()
+    return response.make_conditional(request)
+
+
+@app.route('/api/cache-stats', methods=['GET'])
+def cache_stats():
+    """Hit ratio and eviction statistics of the assessment and similarity caches, and session memory"""
+    return jsonify({
+        'success': True,
+        'assessment_cache': assessment_cache.stats(),
+        'similarity_cache': medical_model.similarity_cache_stats(),
+        'sessions': session_store.stats()
+    })
+
+@app.route('/api/pool-stats', methods=['GET'])
+def pool_stats():
+    """Size and backlog of this worker's scoring pool (null when scoring in-process)"""
+    return jsonify({
+        'success': True,
+        'scoring_pool': medical_model.scoring_pool_stats()
+    })
+
+@app.route('/api/scoring-strategies', methods=['GET'])
+def scoring_strategies():
+    """Available scoring strategies with their cost profiles and this worker's latency for each"""
+    return jsonify({
+        'success': True,
+        'default': DEFAULT_STRATEGY,
+        'strategies': strategy_registry.stats()
+    })
+
+# Static endpoints are serialized once at import; see static_responses.StaticResponse
+_health_tips_response = StaticResponse.json(app, {
+    'success': True,
+    'tips': [
         "Stay hydrated by drinking at least 8 glasses of water daily",
         "Include fruits and vegetables in every meal",
         "Exercise for at least 30 minutes daily",
@@ -523,34 +1085,38 @@ def health_tips():
         "Practice good hygiene",
         "Stay socially connected"
     ]
-    
-    return jsonify({
-        'success': True,
-        'tips': tips
-    })
+})
 
-@app.route('/api/emergency-contacts', methods=['GET'])
-def emergency_contacts():
-    """Get emergency contact information"""
-    contacts = {
+_emergency_contacts_response = StaticResponse.json(app, {
+    'success': True,
+    'contacts': {
         'emergency': '911',
         'poison_control': '1-800-222-1222',
         'mental_health': '988',
         'healthcare_provider': 'Contact your primary care physician'
     }
-    
-    return jsonify({
-        'success': True,
-        'contacts': contacts
-    })
+})
+
+_health_check_response = StaticResponse.json(app, {
+    'status': 'healthy',
+    'message': 'Healthcare AI API is running'
+}, max_age=0)
+
+@app.route('/api/health-tips', methods=['GET'])
+def health_tips():
+    """Get general health tips"""
+    return _health_tips_response.respond(request)
+
+@app.route('/api/emergency-contacts', methods=['GET'])
+def emergency_contacts():
+    """Get emergency contact information"""
+    return _emergency_contacts_response.respond(request)
 
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
-    return jsonify({
-        'status': 'healthy',
-        'message': 'Healthcare AI API is running'
-    })
+    return _health_check_response.respond(request)
 
 if __name__ == '__main__':
+    preload_model()
     app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
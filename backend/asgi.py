@@ -0,0 +1,363 @@
+"""
+ASGI serving mode
+
+Serves the same API as the Flask app under an ASGI server, e.g.::
+
+    uvicorn asgi:application --host 0.0.0.0 --port 5000
+
+The event loop reads requests, parses and validates assessments, answers
+cache hits and serves the static endpoints straight from their pre-encoded
+bytes. Scoring and recommendation building run on a bounded executor; when
+``ASYNC_MAX_PENDING`` assessments are already queued or running, further ones
+get a 503 instead of piling up, so cheap endpoints stay responsive while
+heavy assessments run. Any other route (batch, bulk streams, cache stats,
+CORS preflight, 404/405...) is passed to the Flask app on the same executor;
+its request and response bodies are streamed through, not buffered.
+
+- ``ASYNC_WORKERS``: executor threads (default: CPU count)
+- ``ASYNC_MAX_PENDING``: queued plus running calls allowed (default: 8 per worker)
+- ``ASYNC_MAX_BODY``: largest single-assessment body in bytes (default: 16 MiB)
+- ``SCORING_WORKERS``: scoring processes started at lifespan startup (default: none)
+"""
+import asyncio
+import contextvars
+import io
+import json
+import logging
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, BinaryIO, Callable, Dict, Iterable, List, Optional, Tuple
+
+from werkzeug.exceptions import BadRequest, UnsupportedMediaType
+
+import app as flask_app
+from medical_model import preload_model, start_scoring_pool, stop_scoring_pool
+from request_logging import Redacted, begin_request
+from response_builder import encode
+
+logger = logging.getLogger(__name__)
+
+Headers = List[Tuple[str, str]]
+Response = Tuple[int, Headers, bytes]
+
+MAX_BODY_BYTES = int(os.environ.get('ASYNC_MAX_BODY', 16 * 1024 * 1024))
+
+STATIC_ROUTES = {
+    '/api/health-tips': flask_app._health_tips_response,
+    '/api/emergency-contacts': flask_app._emergency_contacts_response,
+    '/health': flask_app._health_check_response
+}
+
+
+class Overloaded(Exception):
+    """Raised when the executor already has its maximum number of pending calls."""
+
+
+class BoundedExecutor:
+    """Thread pool that refuses work beyond ``max_pending`` queued or running calls.
+
+    Only the event loop submits work, so the pending count needs no lock.
+    Calls run in a copy of the caller's context, which keeps per-request
+    state such as the log sampling decision.
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.pending = 0
+        self.rejected = 0
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='assessment')
+
+    async def run(self, function: Callable, *args) -> Any:
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise Overloaded()
+        self.pending += 1
+        try:
+            context = contextvars.copy_context()
+            return await asyncio.get_running_loop().run_in_executor(self._executor, context.run, function, *args)
+        finally:
+            self.pending -= 1
+
+    def stats(self) -> Dict[str, int]:
+        return {'workers': self.workers, 'max_pending': self.max_pending,
+                'pending': self.pending, 'rejected': self.rejected}
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+
+_workers = int(os.environ.get('ASYNC_WORKERS', os.cpu_count() or 1))
+executor = BoundedExecutor(_workers, int(os.environ.get('ASYNC_MAX_PENDING', _workers * 8)))
+
+
+def json_response(status: int, payload: Any, headers: Optional[Headers] = None) -> Response:
+    body = encode(payload) + b'\n'
+    return status, [('Content-Type', 'application/json'), ('Content-Length', str(len(body)))] + (headers or []), body
+
+
+def _busy() -> Response:
+    return json_response(503, {
+        'error': 'Server busy',
+        'details': 'Too many assessments in progress, retry later'
+    }, [('Retry-After', '1')])
+
+
+def _assess(params: Dict[str, Any], key: Optional[str]) -> Response:
+    # Runs on the executor: scoring, recommendation building and encoding
+    try:
+        data, error = flask_app.compute_assessment(params, key)
+        if error:
+            return json_response(500, error)
+        body = flask_app.assessment_body(data)
+        return 200, [('Content-Type', 'application/json'), ('Content-Length', str(len(body)))], body
+    except ValueError as ve:
+        logger.error(f"Value error in health assessment: {str(ve)}", exc_info=True)
+        return json_response(400, {'error': 'Invalid input data', 'details': str(ve)})
+    except Exception as e:
+        logger.error(f"Unexpected error in health assessment: {str(e)}", exc_info=True)
+        return json_response(500, {'error': 'Internal server error', 'details': str(e)})
+
+
+def _load_json(headers: Dict[str, str], body: bytes) -> Any:
+    # Same acceptance rules, and the same errors, as Flask's request.get_json()
+    mimetype = headers.get('content-type', '').split(';', 1)[0].strip().lower()
+    if not (mimetype == 'application/json' or (mimetype.startswith('application/') and mimetype.endswith('+json'))):
+        raise UnsupportedMediaType(
+            "Did not attempt to load JSON data because the request Content-Type was not 'application/json'."
+        )
+    try:
+        return json.loads(body)
+    except ValueError:
+        raise BadRequest()
+
+
+async def health_assessment(headers: Dict[str, str], body: bytes) -> Response:
+    try:
+        data = _load_json(headers, body)
+        logger.info("Received health assessment request: %s", Redacted(data))
+
+        params, error = flask_app.validate_assessment(data)
+        if error:
+            return json_response(400, error)
+
+        logger.info("Processing %d symptoms", len(params['symptoms']))
+        # The lookup may reach the SQLite tier, so it stays off the event loop too
+        key, data = await executor.run(flask_app.cached_assessment, params)
+        if data is not None:
+            body = flask_app.assessment_body(data)
+            return 200, [('Content-Type', 'application/json'), ('Content-Length', str(len(body)))], body
+        return await executor.run(_assess, params, key)
+
+    except Overloaded:
+        return _busy()
+    except ValueError as ve:
+        logger.error(f"Value error in health assessment: {str(ve)}", exc_info=True)
+        return json_response(400, {'error': 'Invalid input data', 'details': str(ve)})
+    except Exception as e:
+        logger.error(f"Unexpected error in health assessment: {str(e)}", exc_info=True)
+        return json_response(500, {'error': 'Internal server error', 'details': str(e)})
+
+
+class _ReceiveStream(io.RawIOBase):
+    """Blocking reader over the ASGI ``receive`` channel, for a WSGI app running on the executor."""
+
+    def __init__(self, receive: Callable[[], Awaitable[Dict]], loop: asyncio.AbstractEventLoop):
+        self._receive = receive
+        self._loop = loop
+        self._pending = b''
+        self._done = False
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, target) -> int:
+        while not self._pending and not self._done:
+            message = asyncio.run_coroutine_threadsafe(self._receive(), self._loop).result()
+            if message['type'] == 'http.disconnect':
+                self._done = True
+                break
+            self._pending = message.get('body', b'')
+            self._done = not message.get('more_body', False)
+        count = min(len(target), len(self._pending))
+        target[:count] = self._pending[:count]
+        self._pending = self._pending[count:]
+        return count
+
+
+def _wsgi_environ(scope: Dict[str, Any], body: BinaryIO) -> Dict[str, Any]:
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('', 0)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'REMOTE_ADDR': client[0],
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': body,
+        'wsgi.input_terminated': True,
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False
+    }
+    for name, value in scope.get('headers', []):
+        name = name.decode('latin-1').upper().replace('-', '_')
+        value = value.decode('latin-1')
+        if name in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+            environ[name] = value
+        else:
+            key = f"HTTP_{name}"
+            environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return environ
+
+
+def _call_flask(environ: Dict[str, Any], send: Callable[[Dict], Awaitable[None]],
+                loop: asyncio.AbstractEventLoop) -> None:
+    # Runs on the executor; body chunks are sent as the app produces them
+    started: Dict[str, Any] = {}
+
+    def emit(message: Dict) -> None:
+        asyncio.run_coroutine_threadsafe(send(message), loop).result()
+
+    def start_response(status: str, headers: Headers, exc_info=None):
+        started['status'] = int(status.split(' ', 1)[0])
+        started['headers'] = headers
+
+    def start() -> None:
+        if 'sent' not in started:
+            started['sent'] = True
+            emit({
+                'type': 'http.response.start',
+                'status': started['status'],
+                'headers': [(name.lower().encode('latin-1'), value.encode('latin-1'))
+                            for name, value in started['headers']]
+            })
+
+    chunks: Iterable[bytes] = flask_app.app(environ, start_response)
+    try:
+        for chunk in chunks:
+            if chunk:
+                start()
+                emit({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+    finally:
+        if hasattr(chunks, 'close'):
+            chunks.close()
+    start()
+    emit({'type': 'http.response.body', 'body': b''})
+
+
+def _with_cors(path: str, headers: Dict[str, str], response: Response) -> Response:
+    # What Flask-CORS adds to simple /api/* requests (origins "*", credentials allowed)
+    origin = headers.get('origin')
+    status, response_headers, body = response
+    if origin is None or not path.startswith('/api/'):
+        return response
+    # The reflected origin makes the response vary by Origin, so shared caches keep one copy per origin
+    merged = []
+    varied = False
+    for name, value in response_headers:
+        if name.lower() == 'vary':
+            varied = True
+            if 'origin' not in (part.strip().lower() for part in value.split(',')):
+                value = f"{value}, Origin"
+        merged.append((name, value))
+    if not varied:
+        merged.append(('Vary', 'Origin'))
+    return status, merged + [
+        ('Access-Control-Allow-Origin', origin),
+        ('Access-Control-Allow-Credentials', 'true')
+    ], body
+
+
+async def _read_body(receive: Callable[[], Awaitable[Dict]]) -> Optional[bytes]:
+    chunks = []
+    size = 0
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            return None
+        chunk = message.get('body', b'')
+        size += len(chunk)
+        if size > MAX_BODY_BYTES:
+            raise OverflowError()
+        chunks.append(chunk)
+        if not message.get('more_body', False):
+            return b''.join(chunks)
+
+
+async def _send(send: Callable[[Dict], Awaitable[None]], response: Response) -> None:
+    status, headers, body = response
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers]
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def _lifespan(receive, send) -> None:
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            try:
+                # Build the model before serving, off the event loop
+                await asyncio.get_running_loop().run_in_executor(None, preload_model)
+                start_scoring_pool()
+            except Exception as e:
+                await send({'type': 'lifespan.startup.failed', 'message': str(e)})
+                return
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            executor.shutdown()
+            stop_scoring_pool()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def application(scope, receive, send) -> None:
+    """ASGI 3 entry point."""
+    if scope['type'] == 'lifespan':
+        await _lifespan(receive, send)
+        return
+    if scope['type'] != 'http':
+        return
+
+    path = scope['path']
+    method = scope['method']
+    begin_request(path)
+    headers = {name.decode('latin-1').lower(): value.decode('latin-1') for name, value in scope.get('headers', [])}
+
+    static = STATIC_ROUTES.get(path)
+    if static is not None and method in ('GET', 'HEAD'):
+        status, response_headers, body = static.negotiate(headers.get('accept-encoding'),
+                                                          headers.get('if-none-match'))
+        response = (status, response_headers, b'' if method == 'HEAD' else body)
+        await _send(send, _with_cors(path, headers, response))
+        return
+
+    if path == '/api/health-assessment' and method == 'POST':
+        try:
+            body = await _read_body(receive)
+        except OverflowError:
+            await _send(send, _with_cors(path, headers, json_response(413, {
+                'error': 'Request too large',
+                'details': f"Request bodies are limited to {MAX_BODY_BYTES} bytes"
+            })))
+            return
+        if body is not None:
+            await _send(send, _with_cors(path, headers, await health_assessment(headers, body)))
+        return
+
+    loop = asyncio.get_running_loop()
+    environ = _wsgi_environ(scope, io.BufferedReader(_ReceiveStream(receive, loop)))
+    try:
+        await executor.run(_call_flask, environ, send, loop)
+    except Overloaded:
+        await _send(send, _with_cors(path, headers, _busy()))
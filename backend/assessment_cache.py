@@ -0,0 +1,78 @@
+"""
+Result cache for health assessments keyed on the normalized request
+"""
+import json
+from typing import Any, Dict, Optional
+
+from cache import LRUCache, SQLiteCache
+from recommendation_rules import age_band, bmi_band
+
+# Raw symptoms that add symptom-based differentials (matched case-sensitively)
+DIFFERENTIAL_TRIGGERS = ('fever', 'headache', 'nausea')
+
+
+def assessment_key(params: Dict[str, Any], catalog: str) -> Optional[str]:
+    """Cache key of a validated assessment, or None if the request should not be cached.
+
+    Two requests get the same key exactly when every part of the response
+    except the echoed ``symptoms`` is the same for both: the same symptoms up
+    to order, case and surrounding whitespace, the same age band, gender, BMI
+    band and exercise/sleep answers, the same scoring strategy and the
+    same catalog. Reordered symptoms can change the fuzzy confidence in its
+    last bits, since the scores are summed in input order.
+    """
+    symptoms = params['symptoms']
+    lifestyle = params['lifestyle']
+    exercise = lifestyle.get('exercise', 'sometimes')
+    sleep = lifestyle.get('sleep', '7-8')
+    if not symptoms or not isinstance(exercise, str) or not isinstance(sleep, str):
+        return None
+
+    return json.dumps([
+        catalog,
+        sorted(s.lower().strip() for s in symptoms if s.strip()),
+        [trigger in symptoms for trigger in DIFFERENTIAL_TRIGGERS],
+        age_band(params['age']),
+        params['gender'],
+        bmi_band(params['weight'], params['height']),
+        exercise,
+        sleep,
+        params.get('strategy', 'fuzzy')
+    ], separators=(',', ':'))
+
+
+class AssessmentCache:
+    """Two-tier cache of assessment ``data`` bodies.
+
+    Lookups go to an in-process LRU with TTL first and then, if configured,
+    to a SQLite file shared by the worker processes of the host; shared hits
+    are copied into the local tier. Cached bodies are shared and must not be
+    modified.
+    """
+
+    def __init__(self, capacity: int = 1024, ttl: Optional[float] = 300.0,
+                 shared_path: Optional[str] = None, shared_capacity: int = 10000):
+        self.local = LRUCache(capacity, ttl=ttl)
+        self.shared = SQLiteCache(shared_path, shared_capacity, ttl=ttl) if shared_path else None
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached body for ``key``, or None."""
+        data = self.local.get(key)
+        if data is None and self.shared is not None:
+            data = self.shared.get(key)
+            if data is not None:
+                self.local.put(key, data)
+        return data
+
+    def put(self, key: str, data: Dict[str, Any]) -> None:
+        """Store a freshly built body in both tiers."""
+        self.local.put(key, data)
+        if self.shared is not None:
+            self.shared.put(key, data)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit ratio, eviction and expiration counts of each tier."""
+        return {
+            'local': self.local.stats(),
+            'shared': self.shared.stats() if self.shared is not None else None
+        }
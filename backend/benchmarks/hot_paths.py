@@ -0,0 +1,349 @@
+"""
+Timings of the diagnosis and recommendation hot paths, with a baseline check.
+
+Times preprocess_symptoms, find_similar_conditions (and find_conditions with
+each other scoring strategy), generate_diagnosis, each recommendation
+generator and a full POST /api/health-assessment through the Flask test
+client. The scoring paths are swept over input symptom count, catalog size
+(generated catalogs around the built-in conditions) and caching (the
+similarity cache, plus the assessment cache for the full request).
+
+Usage:
+    python benchmarks/hot_paths.py --output results.json
+    python benchmarks/hot_paths.py --baseline results.json [--tolerance 0.25]
+
+Results are written as JSON: one entry per case with the median and best
+per-call time of several rounds, and the best time of each pass. The
+suite runs ``--passes`` times, each pass in a fresh process, and keeps
+each case's best pass: a process's memory layout alone can make the
+fastest cases half as slow again for as long as it runs, and a stretch of
+a busy machine slows only some passes. String hashing is seeded with
+``PYTHONHASHSEED`` (0 unless set), as dict and set layouts otherwise move
+timings too.
+
+With ``--baseline`` the suite runs as many passes as the baseline did,
+and each case's best time is compared with its baseline best time,
+beyond the median change of all cases' best times (a shared or throttled
+machine slows every case alike). Cases slower by more than
+``--tolerance`` are reported, and the exit status is 1. Both sides, and
+the machine drift, use the one statistic, best of the same number of
+passes, and every case gets every pass, so a noisy case is not given
+extra chances to pass. The median round times move too much between
+identical runs to gate on, and a change that slows every case alike
+reads as machine drift, which is printed. Baselines are only comparable
+when recorded on the same machine with the same options, and ``--quick``
+runs are too short to compare at all.
+"""
+import argparse
+import datetime
+import json
+import logging
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+logging.disable(logging.WARNING)
+
+import app as app_module  # noqa: E402
+import medical_model as medical_model_module  # noqa: E402
+from assessment_cache import AssessmentCache  # noqa: E402
+from medical_model import MedicalDiagnosisModel  # noqa: E402
+from scoring_strategies import strategy_registry  # noqa: E402
+
+QUALIFIERS = ['mild', 'severe', 'chronic', 'sudden', 'persistent', 'recurring', 'sharp', 'dull',
+              'intermittent', 'acute', 'burning', 'throbbing']
+SITES = ['chest', 'abdominal', 'back', 'joint', 'muscle', 'neck', 'eye', 'ear', 'skin', 'throat',
+         'knee', 'shoulder', 'wrist', 'ankle', 'jaw', 'pelvic', 'scalp', 'foot', 'hand', 'hip']
+COMPLAINTS = ['pain', 'swelling', 'stiffness', 'itching', 'numbness', 'weakness', 'tingling',
+              'redness', 'cramps', 'tenderness', 'discharge', 'rash']
+SEVERITIES = ['mild', 'moderate', 'moderate to severe', 'mild to severe', 'severe', 'chronic']
+
+PATIENT = {'age': 42, 'gender': 'female', 'weight': 70, 'height': 170,
+           'lifestyle': {'exercise': 'sometimes', 'sleep': '7-8'}}
+
+
+def generated_catalog(size: int, seed: int = 7) -> Dict[str, Dict]:
+    """The built-in conditions followed by synthetic ones, ``size`` in total.
+
+    The vocabulary grows with the catalog, as in real catalogs where most
+    conditions reuse common symptoms.
+    """
+    catalog = dict(MedicalDiagnosisModel().conditions)
+    rng = random.Random(seed)
+    builtin = sorted({symptom for condition in catalog.values() for symptom in condition['symptoms']})
+    synthetic = [f"{qualifier} {site} {complaint}" for qualifier in QUALIFIERS
+                 for site in SITES for complaint in COMPLAINTS]
+    rng.shuffle(synthetic)
+    vocabulary = builtin + synthetic[:300 + size // 8]
+    for i in range(len(catalog), size):
+        catalog[f"condition_{i}"] = {
+            'symptoms': rng.sample(vocabulary, rng.randint(3, 8)),
+            'description': f"Synthetic condition {i}",
+            'severity': rng.choice(SEVERITIES)
+        }
+    return catalog
+
+
+def input_symptoms(model: MedicalDiagnosisModel, count: int, seed: int = 11) -> List[str]:
+    """``count`` patient symptoms: catalog symptoms, some misspelled, some unknown."""
+    rng = random.Random(seed)
+    vocabulary = model.symptom_index.vocabulary
+    symptoms = []
+    for i in range(count):
+        symptom = rng.choice(vocabulary)
+        if i % 3 == 1:
+            symptom = symptom[:-1]
+        elif i % 3 == 2:
+            symptom = f"{symptom} at night"
+        symptoms.append(symptom.title() if i % 2 else symptom)
+    return symptoms
+
+
+def iteration_count(function: Callable[[], Any], seconds: float) -> int:
+    """Calls of ``function`` that take about ``seconds``."""
+    # The first call may fill caches; size the rounds from a warm call
+    function()
+    started = time.perf_counter()
+    function()
+    return max(1, int(seconds / max(time.perf_counter() - started, 1e-7)))
+
+
+def timed_round(function: Callable[[], Any], iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        function()
+    return (time.perf_counter() - started) / iterations
+
+
+def measure(function: Callable[[], Any], rounds: int, round_seconds: float) -> Dict[str, Any]:
+    """Median and best per-call seconds over ``rounds`` rounds of about ``round_seconds`` each."""
+    iterations = iteration_count(function, round_seconds)
+    timings = [timed_round(function, iterations) for _ in range(rounds)]
+    return {
+        'median_us': round(statistics.median(timings) * 1e6, 3),
+        'min_us': round(min(timings) * 1e6, 3),
+        'iterations': iterations,
+        'rounds': rounds
+    }
+
+
+class Suite:
+    """Collects the timing of each named case, skipping the ones ``pattern`` excludes."""
+
+    def __init__(self, rounds: int, round_seconds: float, pattern: Optional[str]):
+        self.rounds = rounds
+        self.round_seconds = round_seconds
+        self.pattern = pattern
+        self.results: Dict[str, Dict[str, Any]] = {}
+
+    def run(self, name: str, function: Callable[[], Any], **params) -> None:
+        if params:
+            name = f"{name}[{','.join(f'{key}={value}' for key, value in params.items())}]"
+        if self.pattern and self.pattern not in name:
+            return
+        result = self.results[name] = measure(function, self.rounds, self.round_seconds)
+        print(f"{name:<72} {result['median_us']:>12.1f} us", flush=True)
+
+
+def bench_recommendations(suite: Suite) -> None:
+    model = MedicalDiagnosisModel()
+    lifestyle = PATIENT['lifestyle']
+    symptoms = ['fever', 'headache', 'nausea']
+    suite.run('preprocess_symptoms', lambda: model.preprocess_symptoms(['  Fever', 'Headache ', 'nausea']))
+    suite.run('get_lifestyle_recommendations', lambda: model.get_lifestyle_recommendations(lifestyle))
+    suite.run('generate_diet_plan', lambda: model.generate_diet_plan(42, 70, 170, lifestyle))
+    suite.run('generate_fitness_plan', lambda: model.generate_fitness_plan(42, lifestyle))
+    suite.run('get_follow_up_instructions', lambda: model.get_follow_up_instructions('migraine', 42, symptoms))
+    suite.run('get_preventive_measures', lambda: model.get_preventive_measures('influenza'))
+    suite.run('get_differential_diagnosis', lambda: model.get_differential_diagnosis('influenza', symptoms))
+    suite.run('generate_recommendation',
+              lambda: model._generate_recommendation('influenza', 'moderate to severe', 42, 'female'))
+
+
+def bench_scoring(suite: Suite, catalog: Dict[str, Dict], symptom_counts: List[int]) -> None:
+    client = app_module.app.test_client()
+    for cache in ('on', 'off'):
+        model = MedicalDiagnosisModel(cache_size=1024 if cache == 'on' else 0)
+        model.load_conditions(catalog)
+        # Serve the test client requests from this model and cache setting
+        medical_model_module._model = model
+        app_module.assessment_cache = AssessmentCache(capacity=1024 if cache == 'on' else 0)
+        for count in symptom_counts:
+            symptoms = input_symptoms(model, count)
+            params = dict(catalog=len(catalog), symptoms=count, cache=cache)
+            suite.run('find_similar_conditions', lambda: model.find_similar_conditions(symptoms), **params)
+            for strategy in strategy_registry.names():
+                if strategy != 'fuzzy':
+                    suite.run('find_conditions', lambda: model.find_conditions(symptoms, strategy),
+                              strategy=strategy, **params)
+            suite.run('generate_diagnosis', lambda: model.generate_diagnosis(symptoms, 42, 'female'), **params)
+            body = json.dumps({'symptoms': symptoms, **PATIENT})
+            suite.run('health_assessment_request', lambda: client.post(
+                '/api/health-assessment', data=body, content_type='application/json'
+            ).get_data(), **params)
+
+
+def run_pass(args: argparse.Namespace) -> Dict[str, Dict]:
+    """Timings of one pass over the suite in this process."""
+    suite = Suite(args.rounds, args.round_seconds, args.filter)
+    process_model = medical_model_module._model
+    process_cache = app_module.assessment_cache
+    try:
+        bench_recommendations(suite)
+        for size in args.catalog_sizes:
+            bench_scoring(suite, generated_catalog(size), args.symptom_counts)
+    finally:
+        medical_model_module._model = process_model
+        app_module.assessment_cache = process_cache
+    return suite.results
+
+
+def spawn_pass(args: argparse.Namespace) -> Dict[str, Dict]:
+    """Timings of one pass over the suite in a fresh process."""
+    with tempfile.TemporaryDirectory() as directory:
+        output = os.path.join(directory, 'pass.json')
+        command = [
+            sys.executable, os.path.abspath(__file__), '--worker', output,
+            '--catalog-sizes', ','.join(map(str, args.catalog_sizes)),
+            '--symptom-counts', ','.join(map(str, args.symptom_counts)),
+            '--rounds', str(args.rounds), '--round-seconds', str(args.round_seconds)
+        ]
+        if args.filter:
+            command += ['--filter', args.filter]
+        subprocess.run(command, check=True, env={'PYTHONHASHSEED': '0', **os.environ})
+        with open(output) as handle:
+            return json.load(handle)
+
+
+def keep_best(results: Dict[str, Dict], timings: Dict[str, Dict]) -> None:
+    """Merge a pass's ``timings`` into ``results``, keeping each case's best time and every pass's best."""
+    for name, result in timings.items():
+        passes = results[name]['pass_min_us'] if name in results else []
+        if name not in results or result['min_us'] < results[name]['min_us']:
+            results[name] = result
+        results[name]['pass_min_us'] = passes + [result['min_us']]
+
+
+def machine_drift(results: Dict[str, Dict], baseline: Dict[str, Dict]) -> float:
+    """Median ratio of the best times of the cases both runs share, if the machine runs slower now."""
+    ratios = [result['min_us'] / baseline[name]['min_us'] for name, result in results.items()
+              if baseline.get(name, {}).get('min_us')]
+    # A faster machine is not held against anything
+    return max(statistics.median(ratios), 1.0) if ratios else 1.0
+
+
+def change(result: Dict[str, Any], previous: Dict[str, Any], drift: float = 1.0) -> float:
+    """Relative change of a case's best time against its baseline best time, beyond the machine's drift."""
+    reference = previous['min_us'] * drift
+    return result['min_us'] / reference - 1 if reference else 0.0
+
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], tolerance: float) -> List[str]:
+    """Print each case's best time against the baseline's and return the names of the regressed ones.
+
+    A case's best time is compared with its baseline best time, scaled by
+    the machine's slowdown, which is printed first: a machine that runs
+    slower as a whole slows every case alike, a regression slows the cases
+    it touches.
+    """
+    regressions = []
+    drift = machine_drift(results, baseline)
+    print(f"\nMachine slowdown against the baseline (median change of all cases): {drift - 1:+.1%}")
+    print(f"\n{'case':<72} {'baseline':>10} {'current':>10} {'change':>8}")
+    for name, result in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            print(f"{name:<72} {'-':>10} {result['min_us']:>10.1f} {'new':>8}")
+            continue
+        relative = change(result, previous, drift)
+        flag = ''
+        if relative > tolerance:
+            regressions.append(name)
+            flag = '  REGRESSION'
+        print(f"{name:<72} {previous['min_us']:>10.1f} {result['min_us']:>10.1f} {relative:>+8.1%}{flag}")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--output', help='write the results to this JSON file')
+    parser.add_argument('--baseline', help='compare against results saved with --output')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='allowed slowdown of a best time before it counts as a regression (default: 0.25)')
+    parser.add_argument('--catalog-sizes', default='6,1000,10000', help='comma-separated catalog sizes')
+    parser.add_argument('--symptom-counts', default='1,3,6,10', help='comma-separated input symptom counts')
+    parser.add_argument('--rounds', type=int, default=3, help='rounds per case in each pass')
+    parser.add_argument('--round-seconds', type=float, default=0.2)
+    parser.add_argument('--passes', type=int,
+                        help="times the whole suite runs, each in a new process (default: the baseline's, or 10)")
+    parser.add_argument('--filter', help='only run cases whose name contains this text')
+    parser.add_argument('--quick', action='store_true',
+                        help='small catalogs, one pass of short rounds; a smoke run, not for --baseline')
+    # A pass run by spawn_pass, which writes its timings to this file
+    parser.add_argument('--worker', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.quick and args.baseline:
+        parser.error("--quick runs are too noisy to compare against a baseline")
+
+    args.catalog_sizes = [int(size) for size in args.catalog_sizes.split(',')]
+    args.symptom_counts = [int(count) for count in args.symptom_counts.split(',')]
+    if args.quick:
+        args.catalog_sizes = [size for size in args.catalog_sizes if size <= 1000]
+        args.rounds, args.round_seconds, args.passes = 3, 0.05, 1
+
+    if args.worker:
+        with open(args.worker, 'w') as handle:
+            json.dump(run_pass(args), handle)
+        return 0
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as handle:
+            recorded = json.load(handle)
+        baseline = recorded['results']
+        baseline_passes = recorded['meta']['options']['passes']
+        if args.passes is None:
+            args.passes = baseline_passes
+        elif args.passes != baseline_passes:
+            # The best of more passes is lower by chance alone; only the same count compares
+            parser.error(f"the baseline was recorded with --passes {baseline_passes}")
+    if args.passes is None:
+        args.passes = 10
+
+    results: Dict[str, Dict] = {}
+    for _ in range(args.passes):
+        keep_best(results, spawn_pass(args))
+
+    report = {
+        'meta': {
+            'recorded': datetime.datetime.now().isoformat(),
+            'python': platform.python_version(),
+            'hash_seed': os.environ.get('PYTHONHASHSEED', '0'),
+            'platform': platform.platform(),
+            'options': {'catalog_sizes': args.catalog_sizes, 'symptom_counts': args.symptom_counts,
+                        'rounds': args.rounds, 'round_seconds': args.round_seconds, 'passes': args.passes}
+        },
+        'results': results
+    }
+    if args.output:
+        with open(args.output, 'w') as handle:
+            json.dump(report, handle, indent=2, sort_keys=True)
+
+    if baseline is not None:
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} case(s) slower than the baseline by more than {args.tolerance:.0%}")
+            return 1
+        print("\nNo regressions")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,96 @@
+"""
+Recall and speed of the ``lsh`` scoring strategy against the exhaustive fuzzy scan.
+
+For generated catalogs (see hot_paths.generated_catalog) each query is two
+to four symptoms of one condition, a third of them misspelled (last letter
+dropped), as patients report them. Every ``bands x rows`` / ``neighbors``
+setting is compared with ``fuzzy`` (similarity cache off) on the same
+queries: recall@k is the share of the exhaustive top-k that LSH also
+returns, ``exact`` the share of queries whose top-k is identical, and
+``candidates`` the mean number of conditions scored per query.
+
+Usage:
+    python benchmarks/lsh_recall.py [--catalog-sizes 10000,100000] [--queries 200] [--top-k 3]
+        [--settings 32x1,64x1,32x2] [--neighbors 1,3]
+"""
+import argparse
+import logging
+import os
+import random
+import statistics
+import sys
+import time
+from typing import List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+logging.disable(logging.WARNING)
+
+from hot_paths import generated_catalog  # noqa: E402
+from medical_model import MedicalDiagnosisModel  # noqa: E402
+from scoring_strategies import LshStrategy  # noqa: E402
+
+
+def patient_queries(model: MedicalDiagnosisModel, count: int, seed: int = 13) -> List[List[str]]:
+    """``count`` symptom lists drawn from random conditions, some symptoms misspelled."""
+    rng = random.Random(seed)
+    index = model.symptom_index
+    vocabulary = index.vocabulary
+    queries = []
+    while len(queries) < count:
+        symptom_ids = list(index.condition_symptom_ids[rng.randrange(len(index))])
+        if len(symptom_ids) < 2:
+            continue
+        symptoms = [vocabulary[i] for i in rng.sample(symptom_ids, rng.randint(2, min(4, len(symptom_ids))))]
+        queries.append([symptom[:-1] if rng.random() < 1 / 3 else symptom for symptom in symptoms])
+    return queries
+
+
+def timed(function, queries: List[List[str]]) -> Tuple[list, float]:
+    """Results of ``function`` for every query and the mean seconds per query."""
+    started = time.perf_counter()
+    results = [function(query) for query in queries]
+    return results, (time.perf_counter() - started) / len(queries)
+
+
+def report(size: int, query_count: int, top_k: int, settings: List[Tuple[int, int]], neighbors: List[int]) -> None:
+    model = MedicalDiagnosisModel(cache_size=0)
+    model.load_conditions(generated_catalog(size))
+    queries = patient_queries(model, query_count)
+    expected, exhaustive = timed(lambda query: model.rank_similar(query, top_k), queries)
+    print(f"catalog of {size} conditions, {len(model.symptom_index.vocabulary)} distinct symptoms, "
+          f"{query_count} queries, top {top_k}")
+    print(f"  {'fuzzy (exhaustive)':<22} {'':>8} {'':>8} {'':>11} {exhaustive * 1000:>9.2f} ms")
+    print(f"  {'setting':<22} {'recall':>8} {'exact':>8} {'candidates':>11} {'latency':>12} {'build':>9}")
+    for bands, rows in settings:
+        for neighbor_count in neighbors:
+            started = time.perf_counter()
+            strategy = LshStrategy(model, bands=bands, rows=rows, neighbors=neighbor_count)
+            build = time.perf_counter() - started
+            results, latency = timed(lambda query: strategy.rank(query, top_k), queries)
+            found = sum(len({p for p, _ in want} & {p for p, _ in got}) for want, got in zip(expected, results))
+            wanted = sum(len(want) for want in expected)
+            identical = sum(want == got for want, got in zip(expected, results))
+            candidates = statistics.mean(len(strategy.candidates(query)) for query in queries)
+            name = f"{bands}x{rows}, {neighbor_count} neighbors"
+            print(f"  {name:<22} {found / max(wanted, 1):>8.1%} {identical / len(queries):>8.1%} "
+                  f"{candidates:>11.0f} {latency * 1000:>9.2f} ms {build:>7.2f} s")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--catalog-sizes', default='10000,100000', help='comma-separated catalog sizes')
+    parser.add_argument('--queries', type=int, default=200, help='queries per catalog')
+    parser.add_argument('--top-k', type=int, default=3, help='conditions ranked per query')
+    parser.add_argument('--settings', default='32x1,64x1,32x2', help='comma-separated bands x rows')
+    parser.add_argument('--neighbors', default='1,3', help='comma-separated vocabulary neighbors per unknown symptom')
+    args = parser.parse_args(argv)
+    settings = [tuple(int(part) for part in setting.split('x')) for setting in args.settings.split(',')]
+    neighbors = [int(count) for count in args.neighbors.split(',')]
+    for size in (int(size) for size in args.catalog_sizes.split(',')):
+        report(size, args.queries, args.top_k, settings, neighbors)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,101 @@
+"""
+Memory held by the condition catalog and by ranked results, old layout against new.
+
+The old layout is what the model kept before the compact store: the catalog
+as a dict of per-condition dicts next to the symptom index (with list
+postings and a tuple of severity strings), and one dict per ranked
+condition. The new layout is the compact ``SymptomIndex`` alone, viewed
+through ``ConditionCatalog``, with ``ConditionMatch`` results.
+
+Usage:
+    python benchmarks/memory_layout.py [--catalog-sizes 1000,10000,50000] [--results 10000]
+
+Sizes are measured with tracemalloc, so they count Python allocations only
+and vary slightly between Python versions.
+"""
+import argparse
+import copy
+import gc
+import logging
+import os
+import sys
+import tracemalloc
+from typing import Any, Callable, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+logging.disable(logging.WARNING)
+
+from condition_store import ConditionCatalog, ConditionMatch  # noqa: E402
+from hot_paths import generated_catalog  # noqa: E402
+from symptom_index import SymptomIndex  # noqa: E402
+
+
+def allocated(build: Callable[[], Any]) -> Tuple[Any, int]:
+    """Return what ``build`` returns and the bytes it still holds once built."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        value = build()
+        gc.collect()
+        return value, tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+
+
+def legacy_layout(conditions):
+    """The old catalog: a private copy of the conditions plus list postings and severity strings."""
+    index = SymptomIndex(conditions)
+    catalog = copy.deepcopy(conditions)
+    postings = [list(positions) for positions in index.postings]
+    severities = tuple(index.severity(position) for position in range(len(index)))
+    return index, catalog, postings, severities
+
+
+def compact_layout(conditions):
+    """The catalog now: the index alone, read through a ``ConditionCatalog``."""
+    index = SymptomIndex(conditions)
+    return index, ConditionCatalog(index)
+
+
+def legacy_results(index: SymptomIndex, ranked: List[Tuple[int, float]]):
+    return [{
+        'condition': index.condition_keys[position],
+        'similarity': similarity,
+        'description': index.descriptions[position],
+        'severity': index.severity(position)
+    } for position, similarity in ranked]
+
+
+def compact_results(index: SymptomIndex, ranked: List[Tuple[int, float]]):
+    return [ConditionMatch(index, position, similarity) for position, similarity in ranked]
+
+
+def report(size: int, result_count: int) -> None:
+    conditions = generated_catalog(size)
+    _, legacy = allocated(lambda: legacy_layout(conditions))
+    (index, _), compact = allocated(lambda: compact_layout(conditions))
+    ranked = [(i % len(index), 1.0 - i / result_count) for i in range(result_count)]
+    _, legacy_matches = allocated(lambda: legacy_results(index, ranked))
+    _, compact_matches = allocated(lambda: compact_results(index, ranked))
+
+    print(f"catalog of {size} conditions, {len(index.vocabulary)} distinct symptoms")
+    print(f"  {'catalog':<24} {legacy / 1024:>10.1f} KiB -> {compact / 1024:>10.1f} KiB  "
+          f"({1 - compact / legacy:.0%} less)")
+    print(f"  {f'{result_count} ranked results':<24} {legacy_matches / 1024:>10.1f} KiB -> "
+          f"{compact_matches / 1024:>10.1f} KiB  ({1 - compact_matches / legacy_matches:.0%} less)")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--catalog-sizes', default='1000,10000,50000', help='comma-separated catalog sizes')
+    parser.add_argument('--results', type=int, default=10000, help='number of ranked results to hold')
+    args = parser.parse_args(argv)
+    for size in (int(size) for size in args.catalog_sizes.split(',')):
+        report(size, args.results)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,78 @@
+"""
+Serialization cost of one health-assessment response: jsonify versus the
+response builder, with orjson when installed and with the standard library
+encoder (spliced from pre-encoded fragments, and encoded in one pass).
+
+Usage: python benchmarks/serialization.py [iterations]
+"""
+import datetime
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+logging.disable(logging.INFO)
+
+import response_builder  # noqa: E402
+from app import app, assessment_response, build_assessment_data, medical_model  # noqa: E402
+
+PARAMS = {
+    'symptoms': ['fever', 'headache', 'fatigue'],
+    'age': 42,
+    'gender': 'female',
+    'weight': 70,
+    'height': 170,
+    'lifestyle': {'exercise': 'sometimes', 'sleep': '7-8'}
+}
+
+
+def _per_call(function, iterations: int) -> float:
+    function()
+    started = time.perf_counter()
+    for _ in range(iterations):
+        function()
+    return (time.perf_counter() - started) / iterations
+
+
+def main(iterations: int = 5000) -> None:
+    diagnosis = medical_model.generate_diagnosis(PARAMS['symptoms'], PARAMS['age'], PARAMS['gender'])
+    data = build_assessment_data(diagnosis, PARAMS)
+
+    def with_jsonify():
+        return app.json.response({
+            'timestamp': datetime.datetime.now().isoformat(),
+            'success': True,
+            'data': data
+        }).get_data()
+
+    def with_builder():
+        return assessment_response(data).get_data()
+
+    def without_fragments():
+        return app.response_class(response_builder.encode({
+            'timestamp': datetime.datetime.now().isoformat(),
+            'success': True,
+            'data': data
+        }) + b'\n', mimetype=app.json.mimetype).get_data()
+
+    with app.app_context():
+        results = {'jsonify': _per_call(with_jsonify, iterations)}
+        encoder = response_builder.orjson
+        if encoder is not None:
+            results['builder (orjson)'] = _per_call(with_builder, iterations)
+        response_builder.orjson = None
+        try:
+            results['builder (json, spliced)'] = _per_call(with_builder, iterations)
+            results['json, one pass'] = _per_call(without_fragments, iterations)
+        finally:
+            response_builder.orjson = encoder
+
+    baseline = results['jsonify']
+    print(f"Response body: {len(with_builder())} bytes, {iterations} iterations")
+    for name, seconds in results.items():
+        print(f"{name:>24}: {seconds * 1e6:8.1f} us/request  saved {(baseline - seconds) * 1e6:7.1f} us")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
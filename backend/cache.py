@@ -0,0 +1,211 @@
+"""
+Thread-safe bounded caches
+"""
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class LRUCache:
+    """Size-bounded least-recently-used cache with hit/miss/eviction counters.
+
+    All operations take a lock, so one instance can be shared between request
+    threads. Values are computed outside the lock by ``get_or_compute``; two
+    threads missing on the same key may both compute it, and the last one wins.
+    With a ``ttl`` (seconds) entries also expire that long after being stored;
+    an expired entry counts as a miss.
+    """
+
+    def __init__(self, capacity: int = 1024, ttl: Optional[float] = None):
+        if capacity < 0:
+            raise ValueError("Cache capacity cannot be negative")
+        self.capacity = capacity
+        self.ttl = ttl
+        self._data: 'OrderedDict[Hashable, Any]' = OrderedDict()
+        self._expires: Dict[Hashable, float] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value for ``key`` and mark it as recently used."""
+        with self._lock:
+            value = self._data.get(key, _MISSING)
+            if value is not _MISSING and self.ttl is not None and self._expires[key] <= time.monotonic():
+                del self._data[key]
+                del self._expires[key]
+                self.expirations += 1
+                value = _MISSING
+            if value is _MISSING:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Store ``value``, evicting the least recently used entries beyond capacity."""
+        if self.capacity == 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if self.ttl is not None:
+                self._expires[key] = time.monotonic() + self.ttl
+            while len(self._data) > self.capacity:
+                evicted, _ = self._data.popitem(last=False)
+                self._expires.pop(evicted, None)
+                self.evictions += 1
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """Return the cached value for ``key``, computing and storing it on a miss."""
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self) -> None:
+        """Drop every entry; counters are kept."""
+        with self._lock:
+            self._data.clear()
+            self._expires.clear()
+
+    def stats(self) -> Dict[str, Optional[float]]:
+        """Return size, capacity, hit/miss/eviction/expiration counts and the hit ratio."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._data),
+                'capacity': self.capacity,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'hit_ratio': self.hits / lookups if lookups else None
+            }
+
+
+class SQLiteCache:
+    """Bounded cache of JSON values in a local SQLite file, shared by every process on the host.
+
+    Meant as a second tier behind an ``LRUCache`` so gunicorn workers reuse
+    each other's results without an external service. When the table grows
+    past ``capacity`` the oldest stored entries are evicted. Each process
+    keeps its own hit/miss/eviction counters. Database errors are logged and
+    treated as misses, so a broken cache file never fails a request.
+    """
+
+    def __init__(self, path: str, capacity: int = 10000, ttl: Optional[float] = None):
+        if capacity < 0:
+            raise ValueError("Cache capacity cannot be negative")
+        self.path = path
+        self.capacity = capacity
+        self.ttl = ttl
+        self._local = threading.local()
+        self._counter_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        # One connection per thread, reopened after a fork
+        connection = getattr(self._local, 'connection', None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS cache "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL, stored REAL NOT NULL, expires REAL)"
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS cache_stored ON cache (stored)")
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def _count(self, counter: str, amount: int = 1) -> None:
+        with self._counter_lock:
+            setattr(self, counter, getattr(self, counter) + amount)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return the cached value for ``key``, or ``default`` if it is missing or expired."""
+        try:
+            connection = self._connection()
+            row = connection.execute("SELECT value, expires FROM cache WHERE key = ?", (key,)).fetchone()
+            if row is not None and row[1] is not None and row[1] <= time.time():
+                connection.execute("DELETE FROM cache WHERE key = ? AND expires <= ?", (key, time.time()))
+                self._count('expirations')
+                row = None
+        except sqlite3.Error as e:
+            logger.warning("Shared cache read failed: %s", e)
+            row = None
+        if row is None:
+            self._count('misses')
+            return default
+        self._count('hits')
+        return json.loads(row[0])
+
+    def put(self, key: str, value: Any) -> None:
+        """Store a JSON-serializable ``value``, evicting the oldest entries beyond capacity."""
+        if self.capacity == 0:
+            return
+        now = time.time()
+        expires = now + self.ttl if self.ttl is not None else None
+        try:
+            connection = self._connection()
+            connection.execute(
+                "INSERT OR REPLACE INTO cache (key, value, stored, expires) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value, separators=(',', ':')), now, expires)
+            )
+            excess = connection.execute("SELECT COUNT(*) FROM cache").fetchone()[0] - self.capacity
+            if excess > 0:
+                deleted = connection.execute(
+                    "DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY stored LIMIT ?)", (excess,)
+                ).rowcount
+                self._count('evictions', deleted)
+        except sqlite3.Error as e:
+            logger.warning("Shared cache write failed: %s", e)
+
+    def clear(self) -> None:
+        """Drop every entry for all processes; counters are kept."""
+        try:
+            self._connection().execute("DELETE FROM cache")
+        except sqlite3.Error as e:
+            logger.warning("Shared cache clear failed: %s", e)
+
+    def stats(self) -> Dict[str, Optional[float]]:
+        """Return the shared size and this process's hit/miss/eviction/expiration counts."""
+        try:
+            size = self._connection().execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+        except sqlite3.Error:
+            size = None
+        with self._counter_lock:
+            lookups = self.hits + self.misses
+            return {
+                'path': self.path,
+                'size': size,
+                'capacity': self.capacity,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'hit_ratio': self.hits / lookups if lookups else None
+            }
@@ -0,0 +1,43 @@
+"""
+Character-profile candidate index over the canonical symptom vocabulary
+"""
+from typing import Sequence
+
+import numpy as np
+
+ALPHABET = 'abcdefghijklmnopqrstuvwxyz0123456789 -'
+
+
+class CharProfileIndex:
+    """Per-symptom character-count profiles used to bound fuzzy similarity.
+
+    ``difflib.SequenceMatcher.ratio()`` is ``2 * M / (len_a + len_b)`` where
+    ``M`` (the number of matched characters) can never exceed the size of
+    the multiset intersection of the two strings' characters. Comparing
+    character-count profiles therefore gives an upper bound of the ratio for
+    the whole vocabulary in one array operation, which is what
+    ``upper_bounds`` returns. Characters outside ``ALPHABET`` share a single
+    overflow column; merging characters can only grow the intersection, so
+    the bound stays valid.
+    """
+
+    def __init__(self, vocabulary: Sequence[str]):
+        self._columns = {char: i for i, char in enumerate(ALPHABET)}
+        self._profiles = np.vstack(
+            [self.profile(symptom) for symptom in vocabulary]
+        ) if vocabulary else np.zeros((0, len(ALPHABET) + 1), dtype=np.int32)
+        self._lengths = np.fromiter((len(symptom) for symptom in vocabulary),
+                                    dtype=np.float64, count=len(vocabulary))
+
+    def profile(self, text: str) -> np.ndarray:
+        """Character-count vector of ``text``."""
+        counts = np.zeros(len(ALPHABET) + 1, dtype=np.int32)
+        overflow = len(ALPHABET)
+        for char in text:
+            counts[self._columns.get(char, overflow)] += 1
+        return counts
+
+    def upper_bounds(self, symptom: str) -> np.ndarray:
+        """Upper bound of the similarity of ``symptom`` to every vocabulary entry."""
+        common = np.minimum(self._profiles, self.profile(symptom)).sum(axis=1)
+        return 2.0 * common / (len(symptom) + self._lengths)
@@ -0,0 +1,129 @@
+"""
+Compact views over the compiled condition catalog
+
+The catalog itself lives in ``SymptomIndex`` as parallel arrays: symptom
+ids per condition in ``array('I')``, severities as one-byte codes, and
+shared description strings. The classes here read those arrays without
+copying them into per-condition dicts.
+"""
+from collections.abc import Mapping
+from enum import IntEnum
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional
+
+if TYPE_CHECKING:  # pragma: no cover
+    from symptom_index import SymptomIndex
+
+
+class Severity(IntEnum):
+    """Severity labels used by the catalogs, stored as one-byte codes.
+
+    A catalog may use other labels; they get codes after these (see
+    ``SymptomIndex.severity_labels``).
+    """
+
+    MILD = 0
+    MODERATE = 1
+    SEVERE = 2
+    MILD_TO_SEVERE = 3
+    MODERATE_TO_SEVERE = 4
+    CHRONIC = 5
+
+    @property
+    def label(self) -> str:
+        return self.name.lower().replace('_', ' ')
+
+    @classmethod
+    def from_label(cls, label: str) -> Optional['Severity']:
+        """The member whose label is ``label``, or None for any other severity."""
+        return _BY_LABEL.get(label)
+
+
+_BY_LABEL = {severity.label: severity for severity in Severity}
+
+MATCH_FIELDS = ('condition', 'similarity', 'description', 'severity')
+
+
+class ConditionMatch(Mapping):
+    """One ranked condition, read from the index on access.
+
+    Behaves as a read-only mapping with the keys of the dicts
+    ``find_similar_conditions`` used to return (and compares equal to
+    them); ``to_dict`` makes the plain dict for a JSON response.
+    """
+
+    __slots__ = ('index', 'position', 'similarity')
+
+    def __init__(self, index: 'SymptomIndex', position: int, similarity: float):
+        self.index = index
+        self.position = position
+        self.similarity = similarity
+
+    @property
+    def condition(self) -> str:
+        return self.index.condition_keys[self.position]
+
+    @property
+    def description(self) -> str:
+        return self.index.descriptions[self.position]
+
+    @property
+    def severity(self) -> str:
+        return self.index.severity(self.position)
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in MATCH_FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(MATCH_FIELDS)
+
+    def __len__(self) -> int:
+        return len(MATCH_FIELDS)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {field: getattr(self, field) for field in MATCH_FIELDS}
+
+    def __repr__(self) -> str:
+        return f"ConditionMatch({self.to_dict()!r})"
+
+
+class ConditionCatalog(Mapping):
+    """Read-only ``{condition_id: {'symptoms', 'description', 'severity', ...}}`` view of an index.
+
+    Each lookup builds a fresh dict from the index arrays, so the catalog
+    costs no memory beyond the index; changing a returned dict does not
+    change the catalog (use ``MedicalDiagnosisModel.load_conditions``).
+    """
+
+    __slots__ = ('index',)
+
+    def __init__(self, index: 'SymptomIndex'):
+        self.index = index
+
+    def __getitem__(self, condition_id: str) -> Dict[str, Any]:
+        position = self.index.position(condition_id)
+        if position is None:
+            raise KeyError(condition_id)
+        return self.record(position)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.index.condition_keys)
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def __contains__(self, condition_id: object) -> bool:
+        return isinstance(condition_id, str) and self.index.position(condition_id) is not None
+
+    def record(self, position: int) -> Dict[str, Any]:
+        """Condition at ``position`` in the catalog's input format, with canonical symptoms."""
+        index = self.index
+        vocabulary = index.vocabulary
+        symptoms: List[str] = [vocabulary[symptom_id] for symptom_id in index.condition_symptom_ids[position]]
+        return {
+            'symptoms': symptoms,
+            'description': index.descriptions[position],
+            'severity': index.severity(position),
+            **index.extras.get(position, {})
+        }
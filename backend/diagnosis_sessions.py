@@ -0,0 +1,192 @@
+"""
+Incremental diagnosis sessions
+
+A session holds the symptoms a patient has entered so far and, for every
+condition, the running sum of their best-match similarities. Adding a
+symptom costs one cached similarity lookup and one vector add, instead of a
+rescan of every symptom against the catalog.
+"""
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from similarity_engine import SimilarityEngine
+
+# Bookkeeping of a session besides its vectors (ids, lists, lock), roughly
+SESSION_OVERHEAD_BYTES = 1024
+
+
+class DiagnosisSession:
+    """Symptoms entered so far and the per-condition sum of their best matches.
+
+    Sums are built by adding each symptom's vector in entry order, which is
+    the order a fresh ranking sums them in, so ``rank`` returns exactly what
+    ``SimilarityEngine.rank`` returns for the same symptoms. Removing a
+    symptom re-adds the remaining vectors in order rather than subtracting,
+    which would leave rounding residue in the sums; no similarity is
+    recomputed either way. Callers serialize access with ``lock``.
+    """
+
+    __slots__ = ('id', 'engine', 'symptoms', 'lock', '_vectors', '_totals')
+
+    def __init__(self, session_id: str, engine: SimilarityEngine):
+        self.id = session_id
+        self.engine = engine
+        self.symptoms: List[str] = []  # as entered
+        self.lock = threading.Lock()
+        self._vectors: List[Any] = []
+        self._totals = None
+
+    def __len__(self) -> int:
+        return len(self.symptoms)
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by the session (vectors counted even when shared with the cache)."""
+        vectors = sum(vector.nbytes for vector in self._vectors)
+        totals = self._totals.nbytes if self._totals is not None else 0
+        return SESSION_OVERHEAD_BYTES + vectors + totals
+
+    def add(self, symptom: str) -> None:
+        """Add one symptom; raises ValueError if it is blank."""
+        normalized = symptom.lower().strip()
+        if not normalized:
+            raise ValueError("Symptom cannot be empty")
+        vector = self.engine.exact_matches(normalized)
+        self.symptoms.append(symptom)
+        self._vectors.append(vector)
+        self._accumulate(vector)
+
+    def remove(self, symptom: str) -> bool:
+        """Remove the first symptom equal to ``symptom`` after normalization; False if there is none."""
+        normalized = symptom.lower().strip()
+        for i, entered in enumerate(self.symptoms):
+            if entered.lower().strip() == normalized:
+                del self.symptoms[i]
+                del self._vectors[i]
+                self._resum()
+                return True
+        return False
+
+    def rebind(self, engine: SimilarityEngine) -> None:
+        """Recompute the vectors against another engine, e.g. after a catalog reload."""
+        self.engine = engine
+        self._vectors = [engine.exact_matches(symptom.lower().strip()) for symptom in self.symptoms]
+        self._resum()
+
+    def rank(self, threshold: float, top_k: int) -> List[Tuple[int, float]]:
+        """Current ``(position, score)`` top-k, as ``SimilarityEngine.rank`` would return it."""
+        return self.engine.rank_totals(self._totals, len(self._vectors), threshold, top_k)
+
+    def _accumulate(self, vector) -> None:
+        if self._totals is None:
+            self._totals = vector.copy()
+        else:
+            self._totals += vector
+
+    def _resum(self) -> None:
+        self._totals = None
+        for vector in self._vectors:
+            self._accumulate(vector)
+
+
+class SessionStore:
+    """Live sessions, expiring ``ttl`` seconds after their last use.
+
+    The sessions together are kept under ``max_bytes``: creating or growing
+    a session evicts the least recently used ones beyond it. Sessions live
+    in the process that created them.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, ttl: float = 1800.0):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._sessions: 'OrderedDict[str, DiagnosisSession]' = OrderedDict()
+        self._expires: Dict[str, float] = {}
+        self._sizes: Dict[str, int] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.created = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def create(self, engine: SimilarityEngine) -> DiagnosisSession:
+        """Start an empty session."""
+        session = DiagnosisSession(secrets.token_urlsafe(16), engine)
+        with self._lock:
+            self._expire()
+            self._sessions[session.id] = session
+            self._expires[session.id] = time.monotonic() + self.ttl
+            self._sizes[session.id] = 0
+            self.created += 1
+        self.resize(session)
+        return session
+
+    def get(self, session_id: str) -> Optional[DiagnosisSession]:
+        """Return a live session and extend its lifetime, or None."""
+        with self._lock:
+            self._expire()
+            session = self._sessions.get(session_id)
+            if session is not None:
+                self._sessions.move_to_end(session_id)
+                self._expires[session_id] = time.monotonic() + self.ttl
+            return session
+
+    def delete(self, session_id: str) -> bool:
+        """End a session; False if it does not exist (or already expired)."""
+        with self._lock:
+            if session_id not in self._sessions:
+                return False
+            self._drop(session_id)
+            return True
+
+    def resize(self, session: DiagnosisSession) -> None:
+        """Account for a session that changed size, evicting others if over ``max_bytes``."""
+        size = session.nbytes
+        with self._lock:
+            if session.id not in self._sessions:
+                return
+            self._bytes += size - self._sizes[session.id]
+            self._sizes[session.id] = size
+            # Never evict the session being resized, even if it alone exceeds the budget
+            while self._bytes > self.max_bytes and len(self._sessions) > 1:
+                oldest = next(iter(self._sessions))
+                if oldest == session.id:
+                    self._sessions.move_to_end(oldest)
+                    oldest = next(iter(self._sessions))
+                self._drop(oldest)
+                self.evictions += 1
+
+    def _expire(self) -> None:
+        # Sessions are in last-use order, so expired ones are at the front
+        now = time.monotonic()
+        while self._sessions:
+            oldest = next(iter(self._sessions))
+            if self._expires[oldest] > now:
+                break
+            self._drop(oldest)
+            self.expirations += 1
+
+    def _drop(self, session_id: str) -> None:
+        del self._sessions[session_id]
+        del self._expires[session_id]
+        self._bytes -= self._sizes.pop(session_id)
+
+    def stats(self) -> Dict[str, Any]:
+        """Live sessions, their memory and created/evicted/expired counts."""
+        with self._lock:
+            self._expire()
+            return {
+                'sessions': len(self._sessions),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'ttl': self.ttl,
+                'created': self.created,
+                'evictions': self.evictions,
+                'expirations': self.expirations
+            }
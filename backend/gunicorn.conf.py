@@ -0,0 +1,27 @@
+"""
+Gunicorn hooks for the scoring worker pool and background log writer
+
+Each gunicorn worker forks its own ``SCORING_WORKERS`` scoring processes
+once it has loaded the app, and stops them when it exits, e.g.::
+
+    PRELOAD_MODEL=1 SCORING_WORKERS=4 gunicorn --preload -w 2 app:app
+
+With ``--preload`` the model is built once in the master and the scoring
+processes share its pages with every gunicorn worker. With ``ASYNC_LOGGING``
+the master's log writer thread does not survive the fork, so each worker
+starts its own.
+"""
+from medical_model import start_scoring_pool, stop_scoring_pool
+from request_logging import restart_listener
+
+
+def post_fork(server, worker):
+    restart_listener()
+
+
+def post_worker_init(worker):
+    start_scoring_pool()
+
+
+def worker_exit(server, worker):
+    stop_scoring_pool()
@@ -0,0 +1,194 @@
+"""
+Streaming loader for external condition knowledge bases
+
+Condition records are read one at a time from CSV or JSON-lines files
+(optionally gzip-compressed), normalized, validated and compiled straight
+into a ``SymptomIndex``; no catalog dict is built on the way, so memory
+peaks at the index plus one record. Supported layouts:
+
+- JSON lines: one object per line with ``condition_id`` (or ``id``),
+  ``symptoms`` (list of strings), ``description`` and ``severity``.
+- Wide CSV: a ``symptoms`` column holding ``;``-separated symptoms.
+- Long CSV: a ``symptom`` column with one condition-symptom pair per row;
+  rows of the same condition are merged.
+
+Any other fields are kept on the condition as-is.
+"""
+import csv
+import gzip
+import io
+import json
+import logging
+import os
+import sys
+import time
+import tracemalloc
+from typing import Any, Dict, Iterator, Tuple
+
+from symptom_index import SymptomIndex, normalize_symptom
+
+logger = logging.getLogger(__name__)
+
+SYMPTOM_SEPARATOR = ';'
+
+# Invalid records are listed in the load report up to this many
+MAX_REPORTED_ERRORS = 20
+
+
+class KnowledgeBaseError(ValueError):
+    """Raised for an unreadable knowledge base or, in strict mode, an invalid record."""
+
+
+def _open_text(path: str) -> io.TextIOBase:
+    if path.endswith('.gz'):
+        return io.TextIOWrapper(gzip.open(path, 'rb'), encoding='utf-8', newline='')
+    return open(path, 'r', encoding='utf-8', newline='')
+
+
+def _file_format(path: str) -> str:
+    name = path[:-3] if path.endswith('.gz') else path
+    extension = os.path.splitext(name)[1].lower()
+    if extension == '.csv':
+        return 'csv'
+    if extension in ('.jsonl', '.ndjson'):
+        return 'jsonl'
+    raise KnowledgeBaseError(f"Unsupported knowledge base format: {path}")
+
+
+def iter_records(path: str) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """Yield ``(line_number, raw_record)`` pairs from a knowledge base file, one at a time."""
+    file_format = _file_format(path)
+    with _open_text(path) as handle:
+        if file_format == 'jsonl':
+            for line_number, line in enumerate(handle, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError as e:
+                    yield line_number, {'_error': f"Invalid JSON: {e.msg}"}
+                    continue
+                yield line_number, record if isinstance(record, dict) else {'_error': 'Record must be a JSON object'}
+        else:
+            reader = csv.DictReader(handle)
+            for record in reader:
+                if record.get('symptoms') is not None:
+                    record['symptoms'] = record['symptoms'].split(SYMPTOM_SEPARATOR)
+                elif record.get('symptom') is not None:
+                    record['symptoms'] = [record.pop('symptom')]
+                yield reader.line_num, record
+
+
+def normalize_record(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Validate a raw record and return ``{'condition_id', 'symptoms', 'description', 'severity', ...}``.
+
+    Symptoms are normalized and de-duplicated in order. Raises ``ValueError``
+    describing the first problem found.
+    """
+    if '_error' in record:
+        raise ValueError(record['_error'])
+
+    condition_id = record.get('condition_id', record.get('id'))
+    if not isinstance(condition_id, str) or not condition_id.strip():
+        raise ValueError("Missing condition_id")
+
+    symptoms = record.get('symptoms')
+    if not isinstance(symptoms, list) or not all(isinstance(s, str) for s in symptoms):
+        raise ValueError("symptoms must be a list of strings")
+    normalized = list(dict.fromkeys(s for s in map(normalize_symptom, symptoms) if s))
+    if not normalized:
+        raise ValueError("Condition has no symptoms")
+
+    description = record.get('description') or ''
+    severity = record.get('severity')
+    if not isinstance(description, str):
+        raise ValueError("description must be a string")
+    if not isinstance(severity, str) or not severity.strip():
+        raise ValueError("Missing severity")
+
+    extra = {key: value for key, value in record.items()
+             if isinstance(key, str) and key not in ('condition_id', 'id', 'symptoms', 'description', 'severity')
+             and value not in (None, '')}
+    return {
+        'condition_id': condition_id.strip(),
+        'symptoms': normalized,
+        'description': description.strip(),
+        'severity': severity.strip().lower(),
+        **extra
+    }
+
+
+def _valid_records(path: str, strict: bool, report: Dict[str, Any]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """Yield ``(condition_id, record)`` for each valid record, counting and listing the invalid ones in ``report``."""
+    for line_number, raw in iter_records(path):
+        report['records'] += 1
+        try:
+            record = normalize_record(raw)
+        except ValueError as e:
+            if strict:
+                raise KnowledgeBaseError(f"{path}:{line_number}: {e}") from e
+            report['skipped'] += 1
+            if len(report['errors']) < MAX_REPORTED_ERRORS:
+                report['errors'].append(f"line {line_number}: {e}")
+            continue
+        yield record.pop('condition_id'), record
+
+
+def compile_conditions(path: str, strict: bool = False) -> Tuple[SymptomIndex, Dict[str, Any]]:
+    """Stream a knowledge base file into a ``SymptomIndex`` ready for ``MedicalDiagnosisModel.load_index``.
+
+    Returns ``(index, report)``. Records for a condition that was already
+    seen are merged into it. Invalid records raise ``KnowledgeBaseError``
+    when ``strict``, otherwise they are skipped and listed in the report.
+    """
+    report = {'path': path, 'records': 0, 'skipped': 0, 'errors': []}
+    index = SymptomIndex.from_records(_valid_records(path, strict, report))
+    report['conditions'] = len(index)
+    report['merged'] = report['records'] - report['skipped'] - len(index)
+    report['symptom_pairs'] = sum(len(ids) for ids in index.condition_symptom_ids)
+    return index, report
+
+
+def load_knowledge_base(model, path: str, strict: bool = False, trace_memory: bool = False) -> Dict[str, Any]:
+    """Load a knowledge base file into ``model``, replacing its condition catalog.
+
+    Returns a report with record counts, the time spent reading the records
+    into the symptom index (``parse_seconds``) and building the model's
+    engines over it (``compile_seconds``), and, with ``trace_memory``, the
+    peak memory allocated while loading (tracing makes the load itself
+    noticeably slower). The model is left unchanged if loading fails.
+    """
+    if trace_memory:
+        tracemalloc.start()
+    try:
+        started = time.perf_counter()
+        index, report = compile_conditions(path, strict=strict)
+        if not len(index):
+            raise KnowledgeBaseError(f"No valid conditions in {path}")
+        parsed = time.perf_counter()
+        model.load_index(index)
+        compiled = time.perf_counter()
+        if trace_memory:
+            report['peak_memory_bytes'] = tracemalloc.get_traced_memory()[1]
+    finally:
+        if trace_memory:
+            tracemalloc.stop()
+
+    report['vocabulary'] = len(model.symptom_index.vocabulary)
+    report['parse_seconds'] = round(parsed - started, 4)
+    report['compile_seconds'] = round(compiled - parsed, 4)
+    report['load_seconds'] = round(compiled - started, 4)
+    logger.info(
+        "Loaded %d conditions (%d symptom pairs, %d skipped) from %s in %.3fs",
+        report['conditions'], report['symptom_pairs'], report['skipped'], path, report['load_seconds']
+    )
+    return report
+
+
+if __name__ == '__main__':
+    from medical_model import MedicalDiagnosisModel
+
+    if len(sys.argv) != 2:
+        print(f"Usage: python {os.path.basename(__file__)} <conditions.csv|.jsonl[.gz]>")
+        sys.exit(2)
+    print(json.dumps(load_knowledge_base(MedicalDiagnosisModel(), sys.argv[1], trace_memory=True), indent=2))
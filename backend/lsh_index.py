@@ -0,0 +1,96 @@
+"""
+MinHash / LSH candidate retrieval over condition symptom sets
+"""
+import random
+from typing import Iterable
+
+import numpy as np
+
+# Mersenne prime modulus of the MinHash hash family; values fit in 31 bits
+PRIME = (1 << 31) - 1
+
+# Conditions whose signatures are computed together, bounding the temporary arrays
+CHUNK_CONDITIONS = 8192
+
+
+class MinHashLSH:
+    """Banded MinHash index returning conditions likely to share symptoms with a request.
+
+    Each condition's set of symptom ids gets a MinHash signature of
+    ``bands * rows`` values, one per hash function ``(a * id + b) mod
+    PRIME``. The signature is split into ``bands`` bands of ``rows`` values,
+    and a condition is a candidate for a request when at least one band of
+    their signatures is identical. For Jaccard similarity ``J`` that happens
+    with probability ``1 - (1 - J ** rows) ** bands``: more bands (or fewer
+    rows) raise recall and the candidate count, fewer bands (or more rows)
+    lower both. Every candidate shares a symptom id with the request.
+
+    Per band, the condition keys are kept sorted next to the condition
+    positions, so a lookup is a binary search rather than a hash table of
+    Python objects. Requires NumPy.
+    """
+
+    def __init__(self, index, bands: int = 32, rows: int = 1, seed: int = 1):
+        if bands <= 0 or rows <= 0:
+            raise ValueError("bands and rows must be positive")
+        self.index = index
+        self.bands = bands
+        self.rows = rows
+        permutations = bands * rows
+        rng = random.Random(seed)
+        self._a = np.array([rng.randrange(1, PRIME) for _ in range(permutations)], dtype=np.uint64)
+        self._b = np.array([rng.randrange(0, PRIME) for _ in range(permutations)], dtype=np.uint64)
+        # Odd multipliers folding the rows of a band into one 64-bit key
+        self._mix = np.array([rng.getrandbits(64) | 1 for _ in range(rows)], dtype=np.uint64)
+        self._hashes = self._hash(np.arange(len(index.vocabulary), dtype=np.uint64))
+
+        lengths = np.fromiter((len(ids) for ids in index.condition_symptom_ids), dtype=np.int64, count=len(index))
+        # Conditions without symptoms can never be retrieved
+        scored = np.flatnonzero(lengths)
+        keys = np.empty((bands, len(scored)), dtype=np.uint64)
+        for start in range(0, len(scored), CHUNK_CONDITIONS):
+            chunk = scored[start:start + CHUNK_CONDITIONS]
+            offsets = np.zeros(len(chunk), dtype=np.int64)
+            np.cumsum(lengths[chunk][:-1], out=offsets[1:])
+            columns = np.concatenate([
+                np.frombuffer(index.condition_symptom_ids[i], dtype=np.uint32) for i in chunk
+            ]).astype(np.intp)
+            signatures = np.minimum.reduceat(self._hashes[columns], offsets, axis=0)
+            keys[:, start:start + len(chunk)] = self._band_keys(signatures).T
+
+        self._keys = []
+        self._positions = []
+        for band in range(bands):
+            order = np.argsort(keys[band], kind='stable')
+            self._keys.append(keys[band][order])
+            self._positions.append(scored[order].astype(np.uint32))
+
+    def _hash(self, ids):
+        return (ids[:, None] * self._a + self._b) % np.uint64(PRIME)
+
+    def _band_keys(self, signatures):
+        """``(conditions, bands)`` keys of ``(conditions, bands * rows)`` signatures."""
+        banded = signatures.reshape(len(signatures), self.bands, self.rows)
+        keys = (banded * self._mix).sum(axis=2, dtype=np.uint64)
+        return keys ^ (keys >> np.uint64(29))
+
+    def candidates(self, symptom_ids: Iterable[int]):
+        """Sorted positions of the conditions sharing a band with the set of ``symptom_ids``."""
+        ids = np.unique(np.fromiter(symptom_ids, dtype=np.intp))
+        if not len(ids):
+            return np.zeros(0, dtype=np.uint32)
+        signature = self._hashes[ids].min(axis=0)
+        found = []
+        for band, key in enumerate(self._band_keys(signature[None, :])[0]):
+            keys = self._keys[band]
+            low = np.searchsorted(keys, key, side='left')
+            high = np.searchsorted(keys, key, side='right')
+            if high > low:
+                found.append(self._positions[band][low:high])
+        return np.unique(np.concatenate(found)) if found else np.zeros(0, dtype=np.uint32)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the band tables and vocabulary hashes."""
+        return (sum(keys.nbytes for keys in self._keys) + sum(positions.nbytes for positions in self._positions)
+                + self._hashes.nbytes)
@@ -1,8 +1,24 @@
+import time
+
+_import_started = time.perf_counter()
+
+import gc
 import logging
-import json
-from typing import Dict, List, Tuple, Optional, Union
-import difflib
-import math
+import os
+import pickle
+import threading
+from typing import Any, Dict, List, Mapping, Tuple, Optional, Union
+
+from condition_store import ConditionCatalog, ConditionMatch
+from diagnosis_sessions import DiagnosisSession
+from knowledge_base import load_knowledge_base
+from similarity_engine import SimilarityEngine
+from recommendation_rules import RecommendationTables
+from scoring_pool import ScoringPool
+from scoring_strategies import ScoringStrategy, strategy_registry
+from symptom_autocomplete import SymptomAutocomplete
+from symptom_extractor import SymptomExtractor
+from symptom_index import SymptomIndex
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -11,10 +27,37 @@ logger = logging.getLogger(__name__)
 class MedicalDiagnosisModel:
     """A medical diagnosis model that uses string similarity to match symptoms to known conditions."""
 
-    def __init__(self):
-        """Initialize the medical diagnosis model."""
+    def __init__(self, cache_size: int = 1024, candidate_threshold: Optional[float] = None,
+                 verify_candidates: bool = False, lsh_options: Optional[Dict[str, Any]] = None):
+        """Initialize the medical diagnosis model.
+
+        Args:
+            cache_size: Number of input symptoms whose per-condition similarity
+                vectors are memoized (0 disables the cache).
+            candidate_threshold: Enables candidate pruning for large
+                catalogs: the exact ratio is computed only for
+                vocabulary entries whose character-profile upper bound
+                reaches it, and conditions that cannot reach the top-k are
+                skipped. Rankings are the same as the exhaustive scan's
+                (see SimilarityEngine).
+            verify_candidates: Also rank exhaustively and report any top-k
+                that pruning changed.
+            lsh_options: Options of the ``lsh`` scoring strategy (``bands``,
+                ``rows``, ``neighbors``, ``min_similarity``, ``seed``; see
+                scoring_strategies.LshStrategy).
+        """
+        # Recommendation rules, compiled into lookup tables (see recommendation_rules)
+        self._rules = RecommendationTables()
+        self._engine_options = {
+            'cache_size': cache_size,
+            'candidate_threshold': candidate_threshold,
+            'verify_candidates': verify_candidates
+        }
+        self.lsh_options = dict(lsh_options or {})
+        # Optional worker processes for scoring (see start_scoring_pool)
+        self._pool: Optional[ScoringPool] = None
         # Core conditions database (simplified for brevity)
-        self.conditions = {
+        conditions = {
             'common_cold': {
                 'symptoms': ['runny nose', 'sneezing', 'sore throat', 'cough', 'congestion', 'mild headache'],
                 'description': 'Viral infection of the upper respiratory tract',
@@ -46,209 +89,177 @@ class MedicalDiagnosisModel:
                 'severity': 'chronic'
             }
         }
-
-    def get_differential_diagnosis(self, condition_key: str, symptoms: List[str]) -> List[Dict]:
-        """Generate a list of possible alternative diagnoses to consider"""
-        differentials = {
-            'fever_headache': [
-                'Influenza (Flu)',
-                'Common Cold',
-                'COVID-19',
-                'Sinusitis',
-                'Meningitis (if severe headache and neck stiffness)',
-                'Mononucleosis (in adolescents/young adults)'
-            ],
-            'cough_fatigue': [
-                'Acute Bronchitis',
-                'Pneumonia',
-                'Asthma exacerbation',
-                'Chronic Obstructive Pulmonary Disease (COPD)',
-                'Postnasal Drip Syndrome',
-                'Gastroesophageal Reflux Disease (GERD)'
-            ],
-            'gastroenteritis': [
-                'Food Poisoning',
-                'Inflammatory Bowel Disease flare',
-                'Appendicitis (if severe abdominal pain)',
-                'Diverticulitis',
-                'Bowel Obstruction',
-                'Gastroparesis'
-            ],
-            'migraine': [
-                'Tension Headache',
-                'Cluster Headache',
-                'Sinus Headache',
-                'Medication Overuse Headache',
-                'Temporal Arteritis (in patients > 50 years)',
-                'Intracranial Hemorrhage (if sudden onset)'
-            ]
-        }
-        
-        # Get the differential diagnoses for the given condition
-        condition_differentials = differentials.get(condition_key, [])
-        
-        # Add symptom-based differentials
-        symptom_differentials = []
-        if 'fever' in symptoms:
-            symptom_differentials.extend([
-                'Infection',
-                'Viral Syndrome',
-                'Bacterial Infection'
-            ])
-        if 'headache' in symptoms:
-            symptom_differentials.extend([
-                'Migraine',
-                'Tension Headache',
-                'Cluster Headache'
-            ])
-        if 'nausea' in symptoms:
-            symptom_differentials.extend([
-                'Gastroenteritis',
-                'Food Poisoning',
-                'Vestibular Disorder'
-            ])
-
-        # Combine and remove duplicates
-        all_differentials = list(set(condition_differentials + symptom_differentials))
-        return [{
-            'condition': cond,
-            'similarity': 0.85 if cond in condition_differentials else 0.75,
-            'description': f"Alternative diagnosis: {cond}"
-        } for cond in all_differentials]
-
-    def get_follow_up_instructions(self, condition: str, age: int, symptoms: List[str]) -> List[str]:
-        """Generate follow-up instructions based on condition and patient data"""
-        base_instructions = [
-            "Follow up with your healthcare provider if symptoms persist or worsen",
-            "Keep track of symptom patterns and triggers",
-            "Maintain a symptom diary"
-        ]
-
-        condition_specific = {
-            "migraine": [
-                "Keep a headache diary to identify triggers",
-                "Avoid known triggers like caffeine and stress"
-            ],
-            "tension_headache": [
-                "Practice stress management techniques",
-                "Regular exercise can help reduce tension"
-            ]
+        self.load_conditions(conditions)
+
+    @property
+    def symptom_index(self) -> SymptomIndex:
+        """Precompiled index over the current condition catalog."""
+        return self._symptom_index
+
+    @property
+    def similarity_engine(self) -> SimilarityEngine:
+        """Scoring engine over the current condition catalog."""
+        return self._engine
+
+    def load_conditions(self, conditions: Dict[str, Dict]) -> None:
+        """Replace the condition catalog and recompile the symptom index and its engines."""
+        started = time.perf_counter()
+        self.load_index(SymptomIndex(conditions))
+        self.compile_seconds = time.perf_counter() - started
+
+    def load_index(self, index: SymptomIndex) -> None:
+        """Replace the condition catalog with an already compiled index (e.g. ``SymptomIndex.from_records``)."""
+        started = time.perf_counter()
+        self._install(index, SymptomExtractor(index.vocabulary))
+        self.compile_seconds = time.perf_counter() - started
+
+    def _install(self, index: SymptomIndex, extractor: SymptomExtractor) -> None:
+        engine = SimilarityEngine(index, **self._engine_options)
+        # The catalog is kept only in the index's arrays; this is a read-only view of them
+        self.conditions = ConditionCatalog(index)
+        self._symptom_index = index
+        self._engine = engine
+        self._extractor = extractor
+        # Built on first use, so snapshot loads stay fast
+        self._autocomplete: Optional[SymptomAutocomplete] = None
+        # Scoring strategies for this catalog, built on first use
+        self._strategies: Dict[str, ScoringStrategy] = {}
+        if self._pool is not None:
+            # The workers hold the previous catalog; fork new ones that share this one
+            workers = self._pool.workers
+            self.stop_scoring_pool()
+            self.start_scoring_pool(workers)
+
+    def start_scoring_pool(self, workers: int) -> ScoringPool:
+        """Score in ``workers`` processes forked from this one (see scoring_pool.ScoringPool).
+
+        Replaces a pool started earlier, including one inherited from a parent process.
+        """
+        if self._pool is not None and self._pool.pid == os.getpid():
+            self._pool.shutdown()
+        self._pool = ScoringPool(self._engine, workers)
+        return self._pool
+
+    def stop_scoring_pool(self) -> None:
+        """Stop the scoring workers of this process, if any, and score in-process again."""
+        pool, self._pool = self._pool, None
+        if pool is not None and pool.pid == os.getpid():
+            pool.shutdown()
+
+    def scoring_pool_stats(self) -> Optional[Dict]:
+        """Size and backlog of this process's scoring pool, or None when scoring in-process."""
+        pool = self._active_pool()
+        return pool.stats() if pool is not None else None
+
+    def _active_pool(self) -> Optional[ScoringPool]:
+        # A pool's executor does not survive a fork; a forked process scores in-process until it starts its own
+        pool = self._pool
+        return pool if pool is not None and pool.pid == os.getpid() else None
+
+    def rank_similar(self, symptoms: List[str], top_k: int) -> List[Tuple[int, float]]:
+        """Fuzzy top-k of normalized symptoms as ``(position, score)`` pairs, on the scoring pool if one runs."""
+        pool = self._active_pool()
+        if pool is not None:
+            try:
+                return pool.rank(symptoms, threshold=0.3, top_k=top_k)
+            except Exception as e:
+                logger.error(f"Scoring pool failed, scoring in-process: {str(e)}", exc_info=True)
+        return self._engine.rank(symptoms, threshold=0.3, top_k=top_k)
+
+    def rank_similar_many(self, symptom_lists: List[Tuple[str, ...]],
+                          top_k: int) -> List[List[Tuple[int, float]]]:
+        """``rank_similar`` of several symptom lists, in one engine pass; results in input order."""
+        pool = self._active_pool()
+        if pool is not None:
+            try:
+                return pool.rank_many(symptom_lists, threshold=0.3, top_k=top_k)
+            except Exception as e:
+                logger.error(f"Scoring pool failed, scoring in-process: {str(e)}", exc_info=True)
+        return self._engine.rank_many(symptom_lists, threshold=0.3, top_k=top_k)
+
+    def save_snapshot(self, path: str, source: Optional[Dict] = None) -> None:
+        """Write the compiled catalog, symptom index and extractor to a binary snapshot.
+
+        ``source`` identifies what the catalog was built from; ``load_snapshot``
+        refuses a snapshot whose source differs. The file is written
+        atomically.
+        """
+        snapshot = {
+            'version': SNAPSHOT_VERSION,
+            'source': source,
+            'index': self._symptom_index,
+            'extractor': self._extractor
         }
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, 'wb') as handle:
+            pickle.dump(snapshot, handle, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary, path)
+
+    def load_snapshot(self, path: str, source: Optional[Dict] = None) -> bool:
+        """Replace the catalog with one from ``save_snapshot``, skipping every compile step.
+
+        Returns False, leaving the model unchanged, when the snapshot has a
+        different format version or source. Snapshots are pickles: only load
+        files this deployment wrote itself.
+        """
+        started = time.perf_counter()
+        # The snapshot is one big acyclic object graph; GC passes while unpickling it are wasted work
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            with open(path, 'rb') as handle:
+                snapshot = pickle.load(handle)
+        finally:
+            if gc_enabled:
+                gc.enable()
+        if snapshot.get('version') != SNAPSHOT_VERSION or snapshot.get('source') != source:
+            return False
+        self._install(snapshot['index'], snapshot['extractor'])
+        self.compile_seconds = time.perf_counter() - started
+        return True
+
+    def load_knowledge_base(self, path: str, strict: bool = False, trace_memory: bool = False) -> Dict:
+        """Stream a CSV/JSON-lines condition catalog from ``path`` and compile it into the model.
+
+        Returns the load report (counts, timings and optionally peak memory).
+        """
+        return load_knowledge_base(self, path, strict=strict, trace_memory=trace_memory)
+
+    def extract_symptoms(self, text: str) -> List[str]:
+        """Extract canonical catalog symptoms from free text (e.g. an intake form narrative)."""
+        return self._extractor.extract(text)
+
+    def session_matches(self, session: DiagnosisSession, top_k: int = 3) -> List[ConditionMatch]:
+        """Current top-k of an incremental diagnosis session, like ``find_similar_conditions``.
+
+        A session started before the catalog was reloaded is rebuilt against the new one.
+        """
+        if session.engine is not self._engine:
+            session.rebind(self._engine)
+        return self._match_results(session.rank(threshold=0.3, top_k=top_k))
+
+    def suggest_symptoms(self, prefix: str, limit: int = 10) -> List[Dict]:
+        """Canonical catalog symptoms matching a typed prefix, most common first (see SymptomAutocomplete)."""
+        autocomplete = self._autocomplete
+        if autocomplete is None:
+            autocomplete = self._autocomplete = SymptomAutocomplete(self._symptom_index)
+        return autocomplete.suggest(prefix, limit)
+
+    def similarity_cache_stats(self) -> Dict:
+        """Hit/miss/eviction statistics of the symptom similarity cache."""
+        return self._engine.cache.stats()
+
+    def get_differential_diagnosis(self, condition_key: str, symptoms: List[str]) -> Tuple[Mapping[str, Any], ...]:
+        """Generate a list of possible alternative diagnoses to consider"""
+        return self._rules.differential_diagnosis(condition_key, symptoms)
 
-        age_based = []
-        if age and age >= 65:
-            age_based.append("Geriatric follow-up recommended due to increased risk of complications")
-
-        return base_instructions + condition_specific.get(condition.lower(), []) + age_based
+    def get_follow_up_instructions(self, condition: str, age: int, symptoms: List[str]) -> Tuple[str, ...]:
+        """Generate follow-up instructions based on condition and patient data"""
+        return self._rules.follow_up_instructions(condition, age)
 
-    def get_lifestyle_recommendations(self, lifestyle: Union[dict, str]) -> List[str]:
-        """Generate personalized lifestyle recommendations"""
-        recommendations = []
-        
-        # Handle dictionary input
-        if isinstance(lifestyle, dict):
-            exercise = lifestyle.get('exercise', 'sometimes')
-            sleep = lifestyle.get('sleep', '7-8')
-        # Handle string input (one of 'sedentary', 'moderate', 'active', 'very_active')
-        elif isinstance(lifestyle, str):
-            if lifestyle == 'sedentary':
-                exercise = 'rarely'
-                sleep = 'less than 6'
-            elif lifestyle == 'moderate':
-                exercise = 'sometimes'
-                sleep = '6-7'
-            elif lifestyle == 'active':
-                exercise = 'regularly'
-                sleep = '7-8'
-            elif lifestyle == 'very_active':
-                exercise = 'daily'
-                sleep = '8-9'
-            else:
-                exercise = 'sometimes'
-                sleep = '7-8'
-        else:
-            exercise = 'sometimes'
-            sleep = '7-8'
-
-        # Exercise recommendations
-        if exercise in ['never', 'rarely']:
-            recommendations.append(
-                "Start with light exercise (e.g., 15-minute walks) and gradually increase"
-            )
-        elif exercise in ['sometimes', 'regularly']:
-            recommendations.append(
-                "Maintain your current exercise routine and consider adding variety"
-            )
-        elif exercise == 'daily':
-            recommendations.append(
-                "Great job! Keep up your active lifestyle and ensure proper rest days"
-            )
-
-        # Sleep recommendations
-        if sleep == 'less than 6':
-            recommendations.append(
-                "Aim for 7-9 hours of sleep per night for optimal health"
-            )
-        elif sleep == '6-7':
-            recommendations.append(
-                "Try to get closer to 8 hours of sleep for better recovery"
-            )
-        elif sleep == '7-8':
-            recommendations.append(
-                "Great sleep duration! Maintain this for optimal health"
-            )
-        elif sleep == '8-9':
-            recommendations.append(
-                "Excellent sleep duration! Keep it up"
-            )
-        elif sleep == 'more than 9':
-            recommendations.append(
-                "If you feel tired, consider reducing sleep duration to 7-9 hours"
-            )
-
-        # General lifestyle tips
-        recommendations.extend([
-            "Maintain a balanced diet with plenty of fruits and vegetables",
-            "Stay hydrated by drinking at least 8 glasses of water daily",
-            "Practice stress management techniques like meditation or deep breathing",
-            "Regular health check-ups are recommended"
-        ])
-
-        return recommendations
-
-    def get_preventive_measures(self, condition: str) -> List[str]:
+    def get_preventive_measures(self, condition: str) -> Tuple[str, ...]:
         """Generate preventive measures for the given condition"""
-        measures = {
-            'fever_headache': [
-                "Annual flu vaccination",
-                "Frequent hand washing",
-                "Avoid close contact with sick individuals",
-                "Stay home when feeling unwell"
-            ],
-            'cough_fatigue': [
-                "Annual flu shot",
-                "Pneumonia vaccine if eligible",
-                "Avoid smoking and secondhand smoke",
-                "Use a humidifier in dry environments"
-            ],
-            'gastroenteritis': [
-                "Frequent hand washing, especially before eating",
-                "Proper food handling and preparation",
-                "Avoid undercooked foods when traveling",
-                "Stay hydrated"
-            ],
-            'migraine': [
-                "Identify and avoid personal triggers",
-                "Maintain regular sleep schedule",
-                "Stay hydrated and don't skip meals",
-                "Consider preventive medications if migraines are frequent"
-            ]
-        }
-        return measures.get(condition, [
-            "Regular health check-ups",
-            "Balanced diet and regular exercise",
-            "Adequate sleep and stress management"
-        ])
+        return self._rules.preventive_measures(condition)
 
     def emergency_contacts(self) -> List[Dict]:
         """Return emergency contact information"""
@@ -283,340 +294,22 @@ class MedicalDiagnosisModel:
             "Maintain social connections"
         ]
 
-    def generate_diet_plan(self, age: int, weight: float, height: float, lifestyle: Union[dict, str]) -> Dict:
+    def generate_diet_plan(self, age: int, weight: float, height: float,
+                           lifestyle: Union[dict, str]) -> Mapping[str, Any]:
         """Generate personalized diet plan based on user data"""
-        bmi = weight / ((height / 100) ** 2)
-        
-        # Default values if lifestyle is string
-        if isinstance(lifestyle, str):
-            exercise = 'sometimes'
-        else:
-            exercise = lifestyle.get('exercise', 'sometimes')
-
-        # Base recommendations
-        recommendations = {
-            'daily_calories': int(2000 + (100 if exercise in ['regularly', 'daily'] else 0)),
-            'protein': '1.2-1.6g per kg body weight',
-            'carbohydrates': '45-65% of daily calories',
-            'fats': '20-35% of daily calories',
-            'water': '8-10 glasses per day'
-        }
+        return self._rules.diet_plan(age, weight, height, lifestyle)
 
-        # Age-based recommendations
-        if age < 18:
-            recommendations['notes'] = 'Focus on balanced growth and development'
-        elif age >= 65:
-            recommendations['notes'] = 'Include more fiber and calcium-rich foods'
-
-        # Weight-based recommendations
-        if bmi < 18.5:
-            recommendations['notes'] = 'Consider increasing calorie intake'
-        elif bmi > 25:
-            recommendations['notes'] = 'Consider reducing calorie intake'
-
-        return recommendations
-
-    def generate_fitness_plan(self, age: int, lifestyle: Union[dict, str]) -> Dict:
+    def generate_fitness_plan(self, age: int, lifestyle: Union[dict, str]) -> Mapping[str, Any]:
         """Generate personalized fitness plan based on user data"""
-        # Default values if lifestyle is string
-        if isinstance(lifestyle, str):
-            exercise = 'sometimes'
-            sleep = '7-8'
-        else:
-            exercise = lifestyle.get('exercise', 'sometimes')
-            sleep = lifestyle.get('sleep', '7-8')
-
-        plan = {
-            'workout_frequency': {
-                'never': 'Start with 2-3 days/week',
-                'rarely': 'Increase to 3-4 days/week',
-                'sometimes': 'Maintain 3-4 days/week',
-                'regularly': 'Consider 4-5 days/week',
-                'daily': 'Great! Keep up daily routine'
-            }[exercise],
-            'duration': '30-45 minutes per session',
-            'intensity': {
-                'never': 'Light (walking, gentle yoga)',
-                'rarely': 'Moderate (brisk walking, light jogging)',
-                'sometimes': 'Moderate (jogging, cycling)',
-                'regularly': 'Moderate to vigorous (running, cycling)',
-                'daily': 'Vigorous (HIIT, running)'
-            }[exercise],
-            'rest': {
-                'less than 6': 'Prioritize recovery',
-                '6-7': 'Consider more sleep',
-                '7-8': 'Good recovery time',
-                '8-9': 'Excellent recovery',
-                'more than 9': 'Consider reducing sleep'
-            }[sleep]
-        }
-
-        return plan
+        return self._rules.fitness_plan(lifestyle)
 
-    def get_lifestyle_recommendations(self, lifestyle: Union[dict, str]) -> List[str]:
+    def get_lifestyle_recommendations(self, lifestyle: Union[dict, str]) -> Tuple[str, ...]:
         """Generate personalized lifestyle recommendations based on lifestyle data"""
-        recommendations = []
-        
-        # Handle dictionary input
-        if isinstance(lifestyle, dict):
-            exercise = lifestyle.get('exercise', 'sometimes')
-            sleep = lifestyle.get('sleep', '7-8')
-        # Handle string input (one of 'sedentary', 'moderate', 'active', 'very_active')
-        elif isinstance(lifestyle, str):
-            if lifestyle == 'sedentary':
-                exercise = 'rarely'
-                sleep = 'less than 6'
-            elif lifestyle == 'moderate':
-                exercise = 'sometimes'
-                sleep = '6-7'
-            elif lifestyle == 'active':
-                exercise = 'regularly'
-                sleep = '7-8'
-            elif lifestyle == 'very_active':
-                exercise = 'daily'
-                sleep = '8-9'
-            else:
-                exercise = 'sometimes'
-                sleep = '7-8'
-        else:
-            exercise = 'sometimes'
-            sleep = '7-8'
-
-        # Exercise recommendations
-        if exercise in ['never', 'rarely']:
-            recommendations.append(
-                "Start with light exercise (e.g., 15-minute walks) and gradually increase"
-            )
-        elif exercise in ['sometimes', 'regularly']:
-            recommendations.append(
-                "Maintain your current exercise routine and consider adding variety"
-            )
-        elif exercise == 'daily':
-            recommendations.append(
-                "Great job! Keep up your active lifestyle and ensure proper rest days"
-            )
-
-        # Sleep recommendations
-        if sleep == 'less than 6':
-            recommendations.append(
-                "Aim for 7-9 hours of sleep per night for optimal health"
-            )
-        elif sleep == '6-7':
-            recommendations.append(
-                "Try to get closer to 8 hours of sleep for better recovery"
-            )
-        elif sleep == '7-8':
-            recommendations.append(
-                "Great sleep duration! Maintain this for optimal health"
-            )
-        elif sleep == '8-9':
-            recommendations.append(
-                "Excellent sleep duration! Keep it up"
-            )
-        elif sleep == 'more than 9':
-            recommendations.append(
-                "If you feel tired, consider reducing sleep duration to 7-9 hours"
-            )
-
-        # General lifestyle tips
-        recommendations.extend([
-            "Maintain a balanced diet with plenty of fruits and vegetables",
-            "Stay hydrated by drinking at least 8 glasses of water daily",
-            "Practice stress management techniques like meditation or deep breathing",
-            "Regular health check-ups are recommended"
-        ])
-
-        return recommendations
-
-    def preprocess_symptoms(self, symptoms: List[str]) -> List[str]:
-        """Convert list of symptoms into a normalized format."""
-        return [symptom.lower().strip() for symptom in symptoms]
-
-    def find_similar_conditions(self, symptoms: List[str], top_k: int = 3) -> List[Dict]:
-        """Find conditions most similar to the given symptoms using string similarity."""
-        processed_symptoms = self.preprocess_symptoms(symptoms)
-        similarities = []
-
-        for condition_key, condition in self.conditions.items():
-            condition_symptoms = condition['symptoms']
-            # Calculate similarity score
-            matches = sum(1 for symptom in processed_symptoms if symptom in condition_symptoms)
-            similarity = matches / len(condition_symptoms)
-            
-            if similarity > 0:
-                similarities.append({
-                    'condition': condition_key,
-                    'description': condition['description'],
-                    'severity': condition['severity'],
-                    'symptoms': condition_symptoms,
-                    'similarity': similarity
-                })
-
-        # Sort by similarity and return top_k
-        similarities.sort(key=lambda x: x['similarity'], reverse=True)
-        return similarities[:top_k]
-
-    def generate_diagnosis(self, symptoms: List[str], age: Union[int, str, None] = None, gender: str = None) -> Dict:
-        """Generate a diagnosis based on symptoms and patient information."""
-        try:
-            # Validate symptoms
-            if not symptoms or not isinstance(symptoms, list):
-                return {
-                    'diagnosis': 'Insufficient information',
-                    'confidence': 0.0,
-                    'severity': 'low',
-                    'description': 'Not enough symptoms provided for diagnosis',
-                    'recommendation': 'Please provide more detailed symptoms',
-                    'alternative_conditions': [],
-                    'symptoms': [],
-                    'condition': 'insufficient_data',
-                    'condition_id': 'insufficient_data'
-                }
-            
-            # Convert age to integer if it's a string
-            if isinstance(age, str):
-                try:
-                    age = int(age)
-                except (ValueError, TypeError):
-                    age = None
-                    logger.warning("Invalid age format, using None")
-            
-            # Get similar conditions
-            similar_conditions = self.find_similar_conditions(symptoms)
-            
-            if not similar_conditions:
-                return {
-                    'diagnosis': 'Insufficient information',
-                    'confidence': 0.0,
-                    'severity': 'low',
-                    'description': 'Symptoms do not match any known conditions',
-                    'recommendation': 'Please consult a healthcare provider',
-                    'alternative_conditions': [],
-                    'symptoms': symptoms,
-                    'condition': 'unknown_condition',
-                    'condition_id': 'unknown_condition'
-                }
-            
-            # Get top condition
-            top_condition = similar_conditions[0]
-            confidence = top_condition['similarity']
-            
-            # Generate recommendations based on condition severity
-            recommendation = self._generate_recommendation(
-                top_condition['condition'], 
-                top_condition['severity'],
-                age,
-                gender
-            )
-            
-            # Validate response structure
-            required_fields = ['diagnosis', 'condition', 'condition_id', 'confidence', 'severity', 'description', 'recommendation', 'alternative_conditions', 'symptoms']
-            response = {
-                'diagnosis': top_condition['description'],
-                'condition': top_condition['condition'],
-                'condition_id': top_condition['condition'],
-                'confidence': float(confidence),
-                'severity': top_condition['severity'],
-                'description': top_condition['description'],
-                'recommendation': recommendation,
-                'alternative_conditions': similar_conditions[1:],
-                'symptoms': symptoms
-            }
-            
-            missing_fields = [field for field in required_fields if field not in response]
-            if missing_fields:
-                logger.error(f"Missing required fields in diagnosis response: {missing_fields}")
-                raise ValueError(f"Missing required fields: {missing_fields}")
-            
-            return response
-            
-        except ValueError as ve:
-            logger.error(f"Value error in diagnosis: {str(ve)}", exc_info=True)
-            return {
-                'diagnosis': 'Error in diagnosis',
-                'confidence': 0.0,
-                'severity': 'unknown',
-                'description': 'Failed to generate diagnosis',
-                'recommendation': 'Please try again or consult a healthcare provider',
-                'alternative_conditions': [],
-                'symptoms': symptoms,
-                'condition': 'error',
-                'condition_id': 'error'
-            }
-        except Exception as e:
-            logger.error(f"Unexpected error generating diagnosis: {str(e)}", exc_info=True)
-            return {
-                'diagnosis': 'Error in diagnosis',
-                'confidence': 0.0,
-                'severity': 'unknown',
-                'description': 'Failed to generate diagnosis',
-                'recommendation': 'Please try again or consult a healthcare provider',
-                'alternative_conditions': [],
-                'symptoms': symptoms,
-                'condition': 'error',
-                'condition_id': 'error'
-            }
+        return self._rules.lifestyle_recommendations(lifestyle)
 
     def _generate_recommendation(self, condition: str, severity: str, age: Union[str, int] = None, gender: str = None) -> str:
         """Generate personalized recommendations based on condition, severity, age, and gender."""
-        try:
-            # Convert age to integer if it's a string
-            if isinstance(age, str):
-                try:
-                    age = int(age)
-                except (ValueError, TypeError):
-                    logger.warning(f"Invalid age format: {age}")
-                    age = None
-            
-            # Base recommendations
-            recommendations = []
-            
-            # Add severity-based recommendations
-            if severity == 'high':
-                recommendations.append("Seek medical attention immediately")
-                recommendations.append("Avoid self-medication")
-            elif severity == 'moderate':
-                recommendations.append("Schedule a doctor's appointment")
-                recommendations.append("Monitor symptoms closely")
-            else:
-                recommendations.append("Rest and monitor symptoms")
-                recommendations.append("Stay hydrated")
-            
-            # Add age-specific recommendations
-            if age is not None:
-                if age < 2:
-                    recommendations.append("Contact pediatrician immediately")
-                elif age < 18:
-                    recommendations.append("Inform school/teachers")
-                elif age >= 65:
-                    recommendations.append("Contact healthcare provider")
-                    recommendations.append("Monitor for complications")
-            
-            # Add gender-specific recommendations
-            if gender == 'female':
-                recommendations.append("Monitor for pregnancy-related symptoms")
-            
-            # Add condition-specific recommendations
-            condition_recommendations = {
-                'migraine': [
-                    "Keep a headache diary",
-                    "Identify and avoid triggers",
-                    "Practice stress management"
-                ],
-                'gastroenteritis': [
-                    "Stay hydrated",
-                    "Eat bland foods",
-                    "Avoid dairy and fatty foods"
-                ]
-            }
-            
-            recommendations.extend(condition_recommendations.get(condition.lower(), []))
-            
-            return ". ".join(recommendations) + "."
-            
-        except Exception as e:
-            logger.error(f"Error generating recommendations: {str(e)}", exc_info=True)
-            return "Consult a healthcare provider for proper diagnosis and treatment."
+        return self._rules.recommendation(condition, severity, age, gender)
 
     def preprocess_symptoms(self, symptoms: List[str]) -> List[str]:
         """Convert list of symptoms into a normalized format."""
@@ -625,70 +318,75 @@ class MedicalDiagnosisModel:
             
         return [s.lower().strip() for s in symptoms if s.strip()]
 
-    def find_similar_conditions(self, symptoms: List[str], top_k: int = 3) -> List[Dict]:
+    def find_similar_conditions(self, symptoms: List[str], top_k: int = 3) -> List[ConditionMatch]:
         """Find conditions most similar to the given symptoms using string similarity."""
+        return self.find_conditions(symptoms, 'fuzzy', top_k)
+
+    def find_exact_conditions(self, symptoms: List[str], top_k: int = 3) -> List[ConditionMatch]:
+        """Conditions sharing the most canonical symptoms with the input (see OverlapIndex).
+
+        Only exact (case- and whitespace-insensitive) symptom names count, so
+        this skips the fuzzy scan for callers that already send catalog
+        symptoms.
+        """
+        return self.find_conditions(symptoms, 'exact', top_k)
+
+    def find_conditions(self, symptoms: List[str], strategy: str = 'fuzzy', top_k: int = 3) -> List[ConditionMatch]:
+        """Top conditions for the given symptoms under a registered scoring strategy.
+
+        Raises ValueError for an unknown strategy; scoring errors are logged
+        and give no matches.
+        """
+        scorer = self.scoring_strategy(strategy)
         try:
             if not symptoms:
                 logger.warning("No symptoms provided for diagnosis")
                 return []
             
-            results = []
-            
             # Normalize input symptoms
             symptoms = self.preprocess_symptoms(symptoms)
             
-            logger.info(f"Analyzing symptoms: {symptoms}")
+            logger.debug("Analyzing %d symptoms", len(symptoms))
             
-            for condition_id, condition in self.conditions.items():
-                # Calculate similarity score by comparing each symptom
-                condition_symptoms = self.preprocess_symptoms(condition['symptoms'])
-                
-                logger.debug(f"Checking condition {condition_id} with symptoms: {condition_symptoms}")
-                
-                # Calculate similarity for each symptom
-                symptom_matches = []
-                for symptom in symptoms:
-                    best_match = 0
-                    for cond_symptom in condition_symptoms:
-                        # Convert both to lowercase for comparison
-                        symptom_str = str(symptom).lower()
-                        cond_symptom_str = str(cond_symptom).lower()
-                        
-                        matcher = difflib.SequenceMatcher(None, symptom_str, cond_symptom_str)
-                        similarity = matcher.ratio()
-                        logger.debug(f"Similarity between '{symptom}' and '{cond_symptom}': {similarity}")
-                        best_match = max(best_match, similarity)
-                    symptom_matches.append(best_match)
-                
-                # Average similarity across all symptoms
-                avg_similarity = sum(symptom_matches) / len(symptom_matches) if symptom_matches else 0
-                
-                # Add a minimum threshold for similarity
-                if avg_similarity > 0.3:  # Only consider conditions with reasonable similarity
-                    results.append({
-                        'condition': condition_id,
-                        'similarity': avg_similarity,
-                        'description': condition['description'],
-                        'severity': condition['severity']
-                    })
-                
-            # Sort by similarity score in descending order
-            results.sort(key=lambda x: float(x['similarity']), reverse=True)
+            started = time.perf_counter()
+            ranked = scorer.rank(symptoms, top_k)
+            strategy_registry.record(strategy, time.perf_counter() - started)
+            results = self._match_results(ranked)
             
             if results:
-                logger.info(f"Found {len(results)} matching conditions")
-                logger.debug(f"Top conditions: {results[:top_k]}")
+                logger.info("Found %d matching conditions", len(results))
+                logger.debug("Top conditions: %s", results)
             else:
                 logger.warning("No matching conditions found")
                 
-            return results[:top_k]
+            return results
             
         except Exception as e:
             logger.error(f"Error finding similar conditions: {str(e)}", exc_info=True)
             return []
 
-    def generate_diagnosis(self, symptoms: List[str], age: Union[int, str, None] = None, gender: str = None) -> Dict:
-        """Generate a comprehensive diagnosis based on symptoms."""
+    def scoring_strategy(self, name: str) -> ScoringStrategy:
+        """Registered strategy ``name`` for the current catalog (see scoring_strategies)."""
+        # A reload replaces the dict, so a strategy built for the old catalog is never kept
+        strategies = self._strategies
+        scorer = strategies.get(name)
+        if scorer is None:
+            scorer = strategies[name] = strategy_registry.create(name, self)
+        return scorer
+
+    def _match_results(self, ranked: List[Tuple[int, float]]) -> List[ConditionMatch]:
+        """Turn engine ``(position, similarity)`` pairs into condition matches."""
+        index = self._symptom_index
+        return [ConditionMatch(index, position, similarity) for position, similarity in ranked]
+
+    def generate_diagnosis(self, symptoms: List[str], age: Union[int, str, None] = None, gender: str = None,
+                           strategy: str = 'fuzzy') -> Dict:
+        """Generate a comprehensive diagnosis based on symptoms.
+
+        ``strategy`` names a registered scoring strategy (see
+        scoring_strategies), e.g. ``'fuzzy'`` string similarity or
+        ``'exact'`` overlap with canonical symptoms.
+        """
         try:
             # Validate symptoms
             if not symptoms or not isinstance(symptoms, list):
@@ -713,53 +411,9 @@ class MedicalDiagnosisModel:
                     logger.warning("Invalid age format, using None")
             
             # Get similar conditions
-            similar_conditions = self.find_similar_conditions(symptoms)
+            similar_conditions = self.find_conditions(symptoms, strategy)
             
-            if not similar_conditions:
-                return {
-                    'diagnosis': 'Insufficient information',
-                    'confidence': 0.0,
-                    'severity': 'low',
-                    'description': 'Symptoms do not match any known conditions',
-                    'recommendation': 'Please consult a healthcare provider',
-                    'alternative_conditions': [],
-                    'symptoms': symptoms,
-                    'condition': 'unknown_condition',
-                    'condition_id': 'unknown_condition'
-                }
-            
-            # Get top condition
-            top_condition = similar_conditions[0]
-            confidence = top_condition['similarity']
-            
-            # Generate recommendations based on condition severity
-            recommendation = self._generate_recommendation(
-                top_condition['condition'], 
-                top_condition['severity'],
-                age,
-                gender
-            )
-            
-            # Validate response structure
-            required_fields = ['diagnosis', 'condition', 'condition_id', 'confidence', 'severity', 'description', 'recommendation', 'alternative_conditions', 'symptoms']
-            response = {
-                'diagnosis': top_condition['description'],
-                'condition': top_condition['condition'],
-                'condition_id': top_condition['condition'],
-                'confidence': float(confidence),
-                'severity': top_condition['severity'],
-                'description': top_condition['description'],
-                'recommendation': recommendation,
-                'alternative_conditions': similar_conditions[1:],
-                'symptoms': symptoms
-            }
-            
-            missing_fields = [field for field in required_fields if field not in response]
-            if missing_fields:
-                logger.error(f"Missing required fields in diagnosis response: {missing_fields}")
-                raise ValueError(f"Missing required fields: {missing_fields}")
-            
-            return response
+            return self._build_diagnosis(symptoms, similar_conditions, age, gender)
             
         except ValueError as ve:
             logger.error(f"Value error in diagnosis: {str(ve)}", exc_info=True)
@@ -788,5 +442,254 @@ class MedicalDiagnosisModel:
                 'condition_id': 'error'
             }
 
-# Singleton instance
-medical_model = MedicalDiagnosisModel()
+    def _build_diagnosis(self, symptoms: List[str], similar_conditions: List[ConditionMatch],
+                         age: Optional[int], gender: Optional[str], recommend=None) -> Dict:
+        """Assemble the diagnosis response from the ranked similar conditions."""
+        if not similar_conditions:
+            return {
+                'diagnosis': 'Insufficient information',
+                'confidence': 0.0,
+                'severity': 'low',
+                'description': 'Symptoms do not match any known conditions',
+                'recommendation': 'Please consult a healthcare provider',
+                'alternative_conditions': [],
+                'symptoms': symptoms,
+                'condition': 'unknown_condition',
+                'condition_id': 'unknown_condition'
+            }
+        
+        # Get top condition
+        top_condition = similar_conditions[0]
+        confidence = top_condition['similarity']
+        
+        # Generate recommendations based on condition severity
+        recommendation = (recommend or self._generate_recommendation)(
+            top_condition['condition'], 
+            top_condition['severity'],
+            age,
+            gender
+        )
+        
+        # Validate response structure
+        required_fields = ['diagnosis', 'condition', 'condition_id', 'confidence', 'severity', 'description', 'recommendation', 'alternative_conditions', 'symptoms']
+        response = {
+            'diagnosis': top_condition['description'],
+            'condition': top_condition['condition'],
+            'condition_id': top_condition['condition'],
+            'confidence': float(confidence),
+            'severity': top_condition['severity'],
+            'description': top_condition['description'],
+            'recommendation': recommendation,
+            'alternative_conditions': [dict(match) for match in similar_conditions[1:]],
+            'symptoms': symptoms
+        }
+        
+        missing_fields = [field for field in required_fields if field not in response]
+        if missing_fields:
+            logger.error(f"Missing required fields in diagnosis response: {missing_fields}")
+            raise ValueError(f"Missing required fields: {missing_fields}")
+        
+        return response
+
+    def generate_diagnosis_batch(self, patients: List[Dict], top_k: int = 3) -> List[Dict]:
+        """Generate diagnoses for many patients at once.
+
+        Each patient is a dict with ``symptoms`` and optional ``age``,
+        ``gender`` and ``strategy``, as taken by ``generate_diagnosis``.
+        Identical normalized symptom lists are ranked once per strategy, and
+        the distinct lists of a strategy are ranked together; for ``fuzzy``
+        that is one engine pass scoring every distinct symptom once (lists
+        are not reordered, since the order of the float sum decides ties).
+        Recommendations are shared
+        between patients with the same condition, severity, age and gender.
+        Results are returned in input order.
+        """
+        results: List[Optional[Dict]] = [None] * len(patients)
+        groups: Dict[Tuple[str, Tuple[str, ...]], List[int]] = {}
+        ages: Dict[int, Optional[int]] = {}
+
+        for i, patient in enumerate(patients):
+            patient = patient if isinstance(patient, dict) else {}
+            symptoms = patient.get('symptoms')
+            age = patient.get('age')
+            if isinstance(age, str):
+                try:
+                    age = int(age)
+                except (ValueError, TypeError):
+                    age = None
+            strategy = patient.get('strategy', 'fuzzy')
+            try:
+                key = tuple(self.preprocess_symptoms(symptoms)) if isinstance(symptoms, list) else None
+            except Exception:
+                key = None
+            if not key or strategy not in strategy_registry:
+                # Empty or malformed symptom lists take the regular single-patient path
+                results[i] = self.generate_diagnosis(symptoms, age, patient.get('gender'), strategy)
+                continue
+            ages[i] = age
+            groups.setdefault((strategy, key), []).append(i)
+
+        keys = list(groups)
+        ranked: Dict[Tuple[str, Tuple[str, ...]], List[Tuple[int, float]]] = {}
+        for strategy in dict.fromkeys(key_strategy for key_strategy, _ in keys):
+            lists = [symptoms for key_strategy, symptoms in keys if key_strategy == strategy]
+            try:
+                started = time.perf_counter()
+                matches = self.scoring_strategy(strategy).rank_many(lists, top_k)
+                strategy_registry.record(strategy, time.perf_counter() - started, len(lists))
+            except Exception as e:
+                logger.error(f"Error scoring diagnosis batch: {str(e)}", exc_info=True)
+                matches = [[] for _ in lists]
+            ranked.update(zip(((strategy, symptoms) for symptoms in lists), matches))
+
+        recommendations: Dict[Tuple, str] = {}
+
+        def recommend(condition, severity, age, gender):
+            key = (condition, severity, age, gender)
+            if key not in recommendations:
+                recommendations[key] = self._generate_recommendation(condition, severity, age, gender)
+            return recommendations[key]
+
+        for key in keys:
+            similar_conditions = self._match_results(ranked[key])
+            for i in groups[key]:
+                patient = patients[i]
+                try:
+                    results[i] = self._build_diagnosis(
+                        patient['symptoms'], similar_conditions, ages[i], patient.get('gender'), recommend
+                    )
+                except Exception as e:
+                    logger.error(f"Unexpected error generating diagnosis: {str(e)}", exc_info=True)
+                    results[i] = self.generate_diagnosis(patient['symptoms'], ages[i], patient.get('gender'), key[0])
+
+        logger.info("Generated %d diagnoses from %d distinct symptom sets", len(patients), len(keys))
+        return results
+
+# Bump when the pickled structures change shape
+SNAPSHOT_VERSION = 3
+
+# One model per process, built on first use (or explicitly by preload_model)
+_model: Optional[MedicalDiagnosisModel] = None
+_model_lock = threading.Lock()
+_startup_report: Dict[str, Any] = {}
+
+
+def _catalog_source(path: Optional[str]) -> Dict[str, Any]:
+    """Identify the catalog a snapshot is built from, so a changed file invalidates it."""
+    if not path:
+        return {'catalog': 'builtin'}
+    stat = os.stat(path)
+    return {'catalog': os.path.abspath(path), 'size': stat.st_size, 'mtime': stat.st_mtime}
+
+
+def _build_model() -> MedicalDiagnosisModel:
+    """Build the process model from the environment.
+
+    - ``CONDITIONS_PATH``: external knowledge base to load instead of the built-in catalog
+    - ``MODEL_SNAPSHOT``: binary snapshot to load from, or to write after compiling
+    - ``SIMILARITY_CACHE_SIZE`` / ``CANDIDATE_THRESHOLD``: similarity engine options
+    - ``LSH_BANDS`` / ``LSH_ROWS`` / ``LSH_NEIGHBORS``: options of the ``lsh`` scoring strategy
+    """
+    started = time.perf_counter()
+    conditions_path = os.environ.get('CONDITIONS_PATH')
+    snapshot_path = os.environ.get('MODEL_SNAPSHOT')
+    candidate_threshold = os.environ.get('CANDIDATE_THRESHOLD')
+    lsh_options = {option: int(os.environ[variable]) for option, variable in
+                   (('bands', 'LSH_BANDS'), ('rows', 'LSH_ROWS'), ('neighbors', 'LSH_NEIGHBORS'))
+                   if os.environ.get(variable)}
+    model = MedicalDiagnosisModel(
+        cache_size=int(os.environ.get('SIMILARITY_CACHE_SIZE', 1024)),
+        candidate_threshold=float(candidate_threshold) if candidate_threshold else None,
+        lsh_options=lsh_options
+    )
+    report = {
+        'import_seconds': round(_import_seconds, 4),
+        'catalog': conditions_path or 'builtin',
+        'snapshot': None,
+        'catalog_load_seconds': 0.0,
+        'index_build_seconds': round(model.compile_seconds, 4)
+    }
+
+    source = _catalog_source(conditions_path)
+    loaded = False
+    if snapshot_path and os.path.exists(snapshot_path):
+        try:
+            loaded = model.load_snapshot(snapshot_path, source)
+        except Exception as e:
+            logger.warning(f"Could not read model snapshot {snapshot_path}: {str(e)}")
+        if loaded:
+            report['snapshot'] = 'loaded'
+            report['snapshot_load_seconds'] = round(model.compile_seconds, 4)
+            report['index_build_seconds'] = 0.0
+        else:
+            logger.info(f"Model snapshot {snapshot_path} is stale, rebuilding")
+
+    if not loaded:
+        if conditions_path:
+            load = model.load_knowledge_base(conditions_path)
+            report['catalog_load_seconds'] = load['parse_seconds']
+            report['index_build_seconds'] = load['compile_seconds']
+        if snapshot_path:
+            try:
+                model.save_snapshot(snapshot_path, source)
+                report['snapshot'] = 'written'
+            except OSError as e:
+                logger.warning(f"Could not write model snapshot {snapshot_path}: {str(e)}")
+
+    report['conditions'] = len(model.symptom_index)
+    report['vocabulary'] = len(model.symptom_index.vocabulary)
+    report['model_ready_seconds'] = round(time.perf_counter() - started, 4)
+    _startup_report.clear()
+    _startup_report.update(report)
+    logger.info(f"Model ready: {report}")
+    return model
+
+
+def get_model() -> MedicalDiagnosisModel:
+    """Return the process-wide model, building it on first use."""
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                _model = _build_model()
+    return _model
+
+
+def preload_model() -> Dict[str, Any]:
+    """Build the process-wide model now (e.g. before gunicorn forks) and return the startup report."""
+    get_model()
+    return startup_report()
+
+
+def start_scoring_pool(workers: Optional[int] = None) -> Optional[ScoringPool]:
+    """Start scoring worker processes for the process model, forked from this process.
+
+    ``workers`` defaults to ``SCORING_WORKERS``; 0 (the default) keeps
+    scoring in-process. Call it once per serving process, after any fork.
+    """
+    if workers is None:
+        workers = int(os.environ.get('SCORING_WORKERS', 0))
+    if workers <= 0:
+        return None
+    return get_model().start_scoring_pool(workers)
+
+
+def stop_scoring_pool() -> None:
+    """Stop the process model's scoring workers, if it has any."""
+    if _model is not None:
+        _model.stop_scoring_pool()
+
+
+def startup_report() -> Dict[str, Any]:
+    """Timings of module import, catalog load and index build for the process model."""
+    return dict(_startup_report)
+
+
+def __getattr__(name: str):
+    # Backwards compatible ``from medical_model import medical_model``, now built lazily
+    if name == 'medical_model':
+        return get_model()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+_import_seconds = time.perf_counter() - _import_started
@@ -0,0 +1,57 @@
+"""
+Incremental reading of newline-delimited JSON request bodies
+"""
+import gzip
+import io
+import zlib
+from typing import BinaryIO, Iterator, Optional, Tuple
+
+# Bytes read from the request (or decompressor) at a time
+READ_SIZE = 64 * 1024
+
+# Exceptions raised by a truncated or corrupt compressed body
+DECODE_ERRORS = (OSError, EOFError, zlib.error)
+
+
+class UnsupportedEncoding(ValueError):
+    """The body uses a Content-Encoding this endpoint cannot decode."""
+
+
+def open_body(stream: BinaryIO, content_encoding: Optional[str]) -> BinaryIO:
+    """Wrap a request body stream so reads return decoded bytes.
+
+    Only ``gzip`` (and no encoding) are accepted. The gzip stream is
+    decompressed as it is read, so neither the compressed nor the
+    decompressed body is ever held in full.
+    """
+    encoding = (content_encoding or 'identity').strip().lower()
+    if encoding in ('', 'identity'):
+        return stream
+    if encoding in ('gzip', 'x-gzip'):
+        return gzip.GzipFile(fileobj=stream, mode='rb')
+    raise UnsupportedEncoding(f"Unsupported Content-Encoding: {content_encoding}")
+
+
+def iter_lines(stream: BinaryIO, max_line_bytes: int) -> Iterator[Tuple[int, Optional[bytes]]]:
+    """Yield ``(line_number, line)`` for each non-blank line of ``stream``, numbered from 1.
+
+    A line longer than ``max_line_bytes`` is skipped without being buffered
+    and yielded as ``(line_number, None)``, so memory use is bounded by the
+    line limit whatever the size of the body. Decoding errors of a
+    compressed body (``OSError``, ``EOFError``, ``zlib.error``) propagate.
+    """
+    reader = io.BufferedReader(stream, READ_SIZE) if not hasattr(stream, 'peek') else stream
+    number = 0
+    while True:
+        line = reader.readline(max_line_bytes + 1)
+        if not line:
+            return
+        number += 1
+        if len(line) > max_line_bytes and not line.endswith(b'\n'):
+            # Drop the rest of the oversized line
+            while line and not line.endswith(b'\n'):
+                line = reader.readline(READ_SIZE)
+            yield number, None
+            continue
+        if line.strip():
+            yield number, line
@@ -0,0 +1,79 @@
+"""
+Character-trigram similarity scoring over a precompiled symptom index
+"""
+from collections import Counter
+from typing import Dict, FrozenSet, List, Sequence
+
+from similarity_engine import SimilarityEngine, np
+from symptom_index import SymptomIndex
+
+
+def trigrams(text: str) -> FrozenSet[str]:
+    """Distinct character trigrams of ``text``, padded so word starts and ends count."""
+    padded = f"  {text} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+class TrigramVocabulary:
+    """Trigram postings of a symptom vocabulary, for whole-vocabulary Dice similarities."""
+
+    def __init__(self, vocabulary: Sequence[str]):
+        self.vectorized = np is not None
+        postings: Dict[str, List[int]] = {}
+        sizes = []
+        for symptom_id, symptom in enumerate(vocabulary):
+            grams = trigrams(symptom)
+            sizes.append(len(grams))
+            for gram in grams:
+                postings.setdefault(gram, []).append(symptom_id)
+        if self.vectorized:
+            self._postings = {gram: np.array(ids, dtype=np.intp) for gram, ids in postings.items()}
+            self._sizes = np.array(sizes, dtype=np.float64)
+        else:
+            self._postings = postings
+            self._sizes = sizes
+
+    def similarities(self, symptom: str):
+        """Trigram Dice similarity of ``symptom`` to every vocabulary entry (an array with NumPy)."""
+        grams = trigrams(symptom)
+        hits = [self._postings[gram] for gram in grams if gram in self._postings]
+        if self.vectorized:
+            common = np.zeros(len(self._sizes))
+            if hits:
+                common = np.bincount(np.concatenate(hits), minlength=len(self._sizes)).astype(np.float64)
+            return 2.0 * common / (len(grams) + self._sizes)
+        counts = Counter(symptom_id for ids in hits for symptom_id in ids)
+        return [2.0 * counts[symptom_id] / (len(grams) + size) for symptom_id, size in enumerate(self._sizes)]
+
+    def nearest(self, symptom: str, count: int, minimum: float = 0.0) -> List[int]:
+        """Ids of the ``count`` most similar vocabulary entries scoring above ``minimum``, best first."""
+        similarities = self.similarities(symptom)
+        if count <= 0:
+            return []
+        if self.vectorized:
+            candidates = np.flatnonzero(similarities > minimum)
+            order = candidates[np.argsort(-similarities[candidates], kind='stable')]
+            return [int(symptom_id) for symptom_id in order[:count]]
+        ranked = sorted((i for i, similarity in enumerate(similarities) if similarity > minimum),
+                        key=lambda i: -similarities[i])
+        return ranked[:count]
+
+
+class NgramEngine(SimilarityEngine):
+    """``SimilarityEngine`` with the trigram Dice coefficient as symptom similarity.
+
+    ``2 * |A & B| / (|A| + |B|)`` over the trigram sets of the two symptoms
+    tolerates typos and reordered words like ``difflib`` does, but a whole
+    similarity row comes from the postings of the input's trigrams instead
+    of a string comparison per vocabulary entry. Best matches, caching and
+    ranking are the base engine's; candidate pruning (whose bounds are
+    specific to ``difflib``) is not available.
+    """
+
+    def __init__(self, index: SymptomIndex, cache_size: int = 1024):
+        super().__init__(index, cache_size=cache_size)
+        self.trigrams = TrigramVocabulary(index.vocabulary)
+
+    def similarity_row(self, symptom: str):
+        """Trigram similarity of one normalized input symptom against every vocabulary entry."""
+        return self.trigrams.similarities(symptom)
@@ -0,0 +1,127 @@
+"""
+Exact symptom-overlap scoring over vocabulary bitsets
+"""
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+from symptom_index import SymptomIndex
+from top_k import TopK, select_top_k
+
+# Catalogs from this size up are scored as a packed bit matrix
+PACKED_MIN_CONDITIONS = 2048
+
+WORD_BITS = 64
+
+
+def _popcount(words):
+    """Set bits of every element of a uint64 array."""
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(words)
+    # NumPy < 2.0: count per byte through a lookup table
+    counts = _BYTE_COUNTS[words.view(np.uint8)]
+    return counts.reshape(words.shape + (8,)).sum(axis=-1, dtype=np.uint8)
+
+
+_BYTE_COUNTS = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+
+class OverlapIndex:
+    """Scores conditions by the share of their symptoms the input names exactly.
+
+    Every condition is a bitmask over the symptom vocabulary and so is every
+    request; a condition's score is ``popcount(request & condition)`` over
+    its number of distinct symptoms. Symptoms outside the vocabulary, and
+    repeated ones, count nothing. There is no string comparison, so this
+    suits callers that send canonical symptoms (autocomplete, structured
+    forms).
+
+    Small catalogs keep one Python int per condition. From ``packed_min``
+    conditions on, the masks are packed into a ``(words, conditions)``
+    uint64 matrix; a request then reads only the rows of the words it has
+    bits in. Either layout takes about ``conditions * vocabulary / 8``
+    bytes.
+    """
+
+    def __init__(self, index: SymptomIndex, packed_min: int = PACKED_MIN_CONDITIONS):
+        self.index = index
+        self.packed = len(index) >= packed_min
+        words = (len(index.vocabulary) + WORD_BITS - 1) // WORD_BITS
+
+        if self.packed:
+            # Distinct (condition, symptom) pairs, as position * vocabulary + symptom id
+            lengths = [len(ids) for ids in index.condition_symptom_ids]
+            pairs = np.repeat(np.arange(len(index), dtype=np.int64), lengths) * len(index.vocabulary)
+            if len(pairs):
+                pairs += np.concatenate([np.frombuffer(ids, dtype=np.uint32) for ids in index.condition_symptom_ids])
+            pairs = np.unique(pairs)
+            positions, symptom_ids = np.divmod(pairs, max(len(index.vocabulary), 1))
+            self._sizes = np.bincount(positions, minlength=len(index)).astype(np.float64)
+            self._words = np.zeros((words, len(index)), dtype=np.uint64)
+            np.bitwise_or.at(self._words, (symptom_ids // WORD_BITS, positions),
+                             np.left_shift(np.uint64(1), (symptom_ids % WORD_BITS).astype(np.uint64)))
+        else:
+            self._masks: List[int] = []
+            self._sizes = []
+            for ids in index.condition_symptom_ids:
+                mask = 0
+                for symptom_id in ids:
+                    mask |= 1 << symptom_id
+                self._masks.append(mask)
+                self._sizes.append(mask.bit_count())
+
+    def request_mask(self, symptoms: Sequence[str]) -> int:
+        """Bitmask of the normalized input symptoms that are in the vocabulary."""
+        mask = 0
+        for symptom_id in self.index.lookup(symptoms):
+            if symptom_id is not None:
+                mask |= 1 << symptom_id
+        return mask
+
+    def rank(self, symptoms: Sequence[str], top_k: int) -> List[Tuple[int, float]]:
+        """Return up to ``top_k`` ``(position, score)`` pairs with any overlap.
+
+        Ties keep catalog order, matching a stable descending sort.
+        """
+        mask = self.request_mask(symptoms)
+        if not mask or top_k <= 0:
+            return []
+        if self.packed:
+            return self._rank_packed(mask, top_k)
+
+        top = TopK(top_k)
+        sizes = self._sizes
+        for position, condition in enumerate(self._masks):
+            overlap = (condition & mask).bit_count()
+            if overlap:
+                top.push(position, overlap / sizes[position])
+        return top.results()
+
+    def rank_many(self, symptom_lists: Sequence[Sequence[str]], top_k: int) -> List[List[Tuple[int, float]]]:
+        """Rank several symptom lists; results in input order."""
+        return [self.rank(symptoms, top_k) for symptoms in symptom_lists]
+
+    def _rank_packed(self, mask: int, top_k: int) -> List[Tuple[int, float]]:
+        rows = []
+        values = []
+        row = 0
+        while mask:
+            word = mask & 0xFFFFFFFFFFFFFFFF
+            if word:
+                rows.append(row)
+                values.append(word)
+            mask >>= WORD_BITS
+            row += 1
+        request = np.array(values, dtype=np.uint64)[:, None]
+        overlap = _popcount(self._words[rows] & request).sum(axis=0, dtype=np.int64)
+
+        # Conditions without symptoms have no overlap and keep a score of 0
+        scores = np.divide(overlap, self._sizes, out=np.zeros(len(overlap)), where=overlap > 0)
+        return select_top_k(scores, 0.0, top_k)
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by the condition masks."""
+        if self.packed:
+            return self._words.nbytes + self._sizes.nbytes
+        return sum((mask.bit_length() + 7) // 8 for mask in self._masks)
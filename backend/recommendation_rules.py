@@ -0,0 +1,447 @@
+"""
+Declarative recommendation rules compiled into lookup tables
+
+``RULES`` holds every literal the recommendation methods of
+``MedicalDiagnosisModel`` used to rebuild on each call. ``RecommendationTables``
+compiles it once into dicts keyed on the discrete inputs the rules read
+(BMI band, exercise level, sleep band, age band, gender, condition and
+severity), so a call only buckets its arguments and does one lookup. Results
+are shared between calls and read-only: tuples for lists and ``FrozenDict``
+for dicts, both of which JSON-encode like lists and dicts.
+"""
+import logging
+from typing import Any, Dict, Iterable, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+EXERCISE_LEVELS = ('never', 'rarely', 'sometimes', 'regularly', 'daily')
+SLEEP_BANDS = ('less than 6', '6-7', '7-8', '8-9', 'more than 9')
+SEVERITY_BANDS = ('high', 'moderate', None)  # None: any other severity
+AGE_BANDS = ('infant', 'child', 'adult', 'senior')
+BMI_BANDS = ('under', 'normal', 'over')
+
+RULES: Dict[str, Any] = {
+    # Answers assumed when lifestyle is a preset name or leaves a question out
+    'lifestyle_defaults': {'exercise': 'sometimes', 'sleep': '7-8'},
+    'lifestyle_presets': {
+        'sedentary': {'exercise': 'rarely', 'sleep': 'less than 6'},
+        'moderate': {'exercise': 'sometimes', 'sleep': '6-7'},
+        'active': {'exercise': 'regularly', 'sleep': '7-8'},
+        'very_active': {'exercise': 'daily', 'sleep': '8-9'}
+    },
+
+    'lifestyle': {
+        'exercise': {
+            'never': "Start with light exercise (e.g., 15-minute walks) and gradually increase",
+            'rarely': "Start with light exercise (e.g., 15-minute walks) and gradually increase",
+            'sometimes': "Maintain your current exercise routine and consider adding variety",
+            'regularly': "Maintain your current exercise routine and consider adding variety",
+            'daily': "Great job! Keep up your active lifestyle and ensure proper rest days"
+        },
+        'sleep': {
+            'less than 6': "Aim for 7-9 hours of sleep per night for optimal health",
+            '6-7': "Try to get closer to 8 hours of sleep for better recovery",
+            '7-8': "Great sleep duration! Maintain this for optimal health",
+            '8-9': "Excellent sleep duration! Keep it up",
+            'more than 9': "If you feel tired, consider reducing sleep duration to 7-9 hours"
+        },
+        'general': [
+            "Maintain a balanced diet with plenty of fruits and vegetables",
+            "Stay hydrated by drinking at least 8 glasses of water daily",
+            "Practice stress management techniques like meditation or deep breathing",
+            "Regular health check-ups are recommended"
+        ]
+    },
+
+    'fitness': {
+        'workout_frequency': {
+            'never': 'Start with 2-3 days/week',
+            'rarely': 'Increase to 3-4 days/week',
+            'sometimes': 'Maintain 3-4 days/week',
+            'regularly': 'Consider 4-5 days/week',
+            'daily': 'Great! Keep up daily routine'
+        },
+        'duration': '30-45 minutes per session',
+        'intensity': {
+            'never': 'Light (walking, gentle yoga)',
+            'rarely': 'Moderate (brisk walking, light jogging)',
+            'sometimes': 'Moderate (jogging, cycling)',
+            'regularly': 'Moderate to vigorous (running, cycling)',
+            'daily': 'Vigorous (HIIT, running)'
+        },
+        'rest': {
+            'less than 6': 'Prioritize recovery',
+            '6-7': 'Consider more sleep',
+            '7-8': 'Good recovery time',
+            '8-9': 'Excellent recovery',
+            'more than 9': 'Consider reducing sleep'
+        }
+    },
+
+    'diet': {
+        'daily_calories': 2000,
+        'active_bonus': 100,
+        'active_levels': ['regularly', 'daily'],
+        'base': {
+            'protein': '1.2-1.6g per kg body weight',
+            'carbohydrates': '45-65% of daily calories',
+            'fats': '20-35% of daily calories',
+            'water': '8-10 glasses per day'
+        },
+        # Age notes apply below 18 and from 65; a BMI note replaces them
+        'age_notes': {
+            'child': 'Focus on balanced growth and development',
+            'senior': 'Include more fiber and calcium-rich foods'
+        },
+        'bmi_notes': {
+            'under': 'Consider increasing calorie intake',
+            'over': 'Consider reducing calorie intake'
+        }
+    },
+
+    'follow_up': {
+        'base': [
+            "Follow up with your healthcare provider if symptoms persist or worsen",
+            "Keep track of symptom patterns and triggers",
+            "Maintain a symptom diary"
+        ],
+        # Matched against the lower-cased condition
+        'conditions': {
+            "migraine": [
+                "Keep a headache diary to identify triggers",
+                "Avoid known triggers like caffeine and stress"
+            ],
+            "tension_headache": [
+                "Practice stress management techniques",
+                "Regular exercise can help reduce tension"
+            ]
+        },
+        'senior': ["Geriatric follow-up recommended due to increased risk of complications"]
+    },
+
+    'preventive': {
+        'conditions': {
+            'fever_headache': [
+                "Annual flu vaccination",
+                "Frequent hand washing",
+                "Avoid close contact with sick individuals",
+                "Stay home when feeling unwell"
+            ],
+            'cough_fatigue': [
+                "Annual flu shot",
+                "Pneumonia vaccine if eligible",
+                "Avoid smoking and secondhand smoke",
+                "Use a humidifier in dry environments"
+            ],
+            'gastroenteritis': [
+                "Frequent hand washing, especially before eating",
+                "Proper food handling and preparation",
+                "Avoid undercooked foods when traveling",
+                "Stay hydrated"
+            ],
+            'migraine': [
+                "Identify and avoid personal triggers",
+                "Maintain regular sleep schedule",
+                "Stay hydrated and don't skip meals",
+                "Consider preventive medications if migraines are frequent"
+            ]
+        },
+        'default': [
+            "Regular health check-ups",
+            "Balanced diet and regular exercise",
+            "Adequate sleep and stress management"
+        ]
+    },
+
+    'differential': {
+        'conditions': {
+            'fever_headache': [
+                'Influenza (Flu)',
+                'Common Cold',
+                'COVID-19',
+                'Sinusitis',
+                'Meningitis (if severe headache and neck stiffness)',
+                'Mononucleosis (in adolescents/young adults)'
+            ],
+            'cough_fatigue': [
+                'Acute Bronchitis',
+                'Pneumonia',
+                'Asthma exacerbation',
+                'Chronic Obstructive Pulmonary Disease (COPD)',
+                'Postnasal Drip Syndrome',
+                'Gastroesophageal Reflux Disease (GERD)'
+            ],
+            'gastroenteritis': [
+                'Food Poisoning',
+                'Inflammatory Bowel Disease flare',
+                'Appendicitis (if severe abdominal pain)',
+                'Diverticulitis',
+                'Bowel Obstruction',
+                'Gastroparesis'
+            ],
+            'migraine': [
+                'Tension Headache',
+                'Cluster Headache',
+                'Sinus Headache',
+                'Medication Overuse Headache',
+                'Temporal Arteritis (in patients > 50 years)',
+                'Intracranial Hemorrhage (if sudden onset)'
+            ]
+        },
+        # Added when the (raw, case-sensitive) symptom is reported
+        'symptoms': {
+            'fever': ['Infection', 'Viral Syndrome', 'Bacterial Infection'],
+            'headache': ['Migraine', 'Tension Headache', 'Cluster Headache'],
+            'nausea': ['Gastroenteritis', 'Food Poisoning', 'Vestibular Disorder']
+        },
+        'condition_similarity': 0.85,
+        'symptom_similarity': 0.75
+    },
+
+    'recommendation': {
+        'severity': {
+            'high': ["Seek medical attention immediately", "Avoid self-medication"],
+            'moderate': ["Schedule a doctor's appointment", "Monitor symptoms closely"],
+            None: ["Rest and monitor symptoms", "Stay hydrated"]
+        },
+        'age': {
+            'infant': ["Contact pediatrician immediately"],
+            'child': ["Inform school/teachers"],
+            'senior': ["Contact healthcare provider", "Monitor for complications"]
+        },
+        'gender': {
+            'female': ["Monitor for pregnancy-related symptoms"]
+        },
+        # Matched against the lower-cased condition
+        'conditions': {
+            'migraine': ["Keep a headache diary", "Identify and avoid triggers", "Practice stress management"],
+            'gastroenteritis': ["Stay hydrated", "Eat bland foods", "Avoid dairy and fatty foods"]
+        },
+        'fallback': "Consult a healthcare provider for proper diagnosis and treatment."
+    }
+}
+
+
+class FrozenDict(dict):
+    """A dict that refuses in-place changes, so table results can be shared.
+
+    It is still a ``dict`` subclass, so JSON encoders and ``{**d}`` copies
+    treat it like any other dict.
+    """
+
+    __slots__ = ()
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("FrozenDict is read-only")
+
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __reduce__(self):
+        return (FrozenDict, (dict(self),))
+
+
+def age_band(age) -> Optional[str]:
+    """Band of ``age`` at the 2 / 18 / 65 thresholds, or None when age is None."""
+    if age is None:
+        return None
+    if age < 2:
+        return 'infant'
+    if age < 18:
+        return 'child'
+    if age >= 65:
+        return 'senior'
+    return 'adult'
+
+
+def bmi_band(weight: float, height: float) -> str:
+    """BMI band of a weight in kg and a height in cm."""
+    bmi = weight / ((height / 100) ** 2)
+    if bmi < 18.5:
+        return 'under'
+    if bmi > 25:
+        return 'over'
+    return 'normal'
+
+
+def _level(value: Any, levels: Tuple) -> Optional[str]:
+    # Answers outside the known levels all behave alike; ``in`` also copes with unhashable values
+    return value if value in levels else None
+
+
+class RecommendationTables:
+    """Recommendation rules compiled into lookup tables.
+
+    Every method returns the same result as the if/elif implementation it
+    replaces (tests/test_rules_parity.py compares them over every input bucket),
+    including the exceptions raised for malformed input.
+    """
+
+    def __init__(self, rules: Dict[str, Any] = RULES):
+        self.rules = rules
+        self._defaults = rules['lifestyle_defaults']
+        self._presets = rules['lifestyle_presets']
+        self._lifestyle = self._compile_lifestyle(rules['lifestyle'])
+        self._fitness = self._compile_fitness(rules['fitness'])
+        self._diet = self._compile_diet(rules['diet'])
+        self._diet_active_levels = rules['diet']['active_levels']
+        self._follow_up = self._compile_follow_up(rules['follow_up'])
+        self._preventive = {condition: tuple(measures)
+                            for condition, measures in rules['preventive']['conditions'].items()}
+        self._preventive_default = tuple(rules['preventive']['default'])
+        self._differential = self._compile_differential(rules['differential'])
+        self._differential_triggers = tuple(rules['differential']['symptoms'])
+        self._recommendation = self._compile_recommendation(rules['recommendation'])
+        self._recommendation_fallback = rules['recommendation']['fallback']
+
+    # Compilation
+
+    @staticmethod
+    def _compile_lifestyle(rules: Dict) -> Dict[Tuple, Tuple[str, ...]]:
+        table = {}
+        for exercise in EXERCISE_LEVELS + (None,):
+            for sleep in SLEEP_BANDS + (None,):
+                recommendations = []
+                if exercise is not None:
+                    recommendations.append(rules['exercise'][exercise])
+                if sleep is not None:
+                    recommendations.append(rules['sleep'][sleep])
+                table[exercise, sleep] = tuple(recommendations + rules['general'])
+        return table
+
+    @staticmethod
+    def _compile_fitness(rules: Dict) -> Dict[Tuple, FrozenDict]:
+        return {
+            (exercise, sleep): FrozenDict({
+                'workout_frequency': rules['workout_frequency'][exercise],
+                'duration': rules['duration'],
+                'intensity': rules['intensity'][exercise],
+                'rest': rules['rest'][sleep]
+            })
+            for exercise in EXERCISE_LEVELS for sleep in SLEEP_BANDS
+        }
+
+    @staticmethod
+    def _compile_diet(rules: Dict) -> Dict[Tuple, FrozenDict]:
+        table = {}
+        for band in ('child', 'adult', 'senior'):
+            for bmi in BMI_BANDS:
+                for active in (False, True):
+                    plan = {
+                        'daily_calories': int(rules['daily_calories'] + (rules['active_bonus'] if active else 0)),
+                        **rules['base']
+                    }
+                    note = rules['bmi_notes'].get(bmi, rules['age_notes'].get(band))
+                    if note is not None:
+                        plan['notes'] = note
+                    table[band, bmi, active] = FrozenDict(plan)
+        return table
+
+    @staticmethod
+    def _compile_follow_up(rules: Dict) -> Dict[Tuple, Tuple[str, ...]]:
+        return {
+            (condition, senior): tuple(rules['base'] + rules['conditions'].get(condition, [])
+                                       + (rules['senior'] if senior else []))
+            for condition in list(rules['conditions']) + [None]
+            for senior in (False, True)
+        }
+
+    @staticmethod
+    def _compile_differential(rules: Dict) -> Dict[Optional[str], Dict[Tuple, Tuple[FrozenDict, ...]]]:
+        triggers = list(rules['symptoms'])
+        table = {}
+        for condition in list(rules['conditions']) + [None]:
+            condition_differentials = rules['conditions'].get(condition, [])
+            by_symptoms = table[condition] = {}
+            for mask in range(1 << len(triggers)):
+                present = tuple(bool(mask & (1 << i)) for i in range(len(triggers)))
+                symptom_differentials = [differential for trigger, reported in zip(triggers, present) if reported
+                                         for differential in rules['symptoms'][trigger]]
+                # Same set construction as before, so the order of the de-duplicated list is unchanged
+                by_symptoms[present] = tuple(FrozenDict({
+                    'condition': differential,
+                    'similarity': (rules['condition_similarity'] if differential in condition_differentials
+                                   else rules['symptom_similarity']),
+                    'description': f"Alternative diagnosis: {differential}"
+                }) for differential in list(set(condition_differentials + symptom_differentials)))
+        return table
+
+    @staticmethod
+    def _compile_recommendation(rules: Dict) -> Dict[Tuple, str]:
+        table = {}
+        for severity in SEVERITY_BANDS:
+            for band in AGE_BANDS + (None,):
+                for female in (False, True):
+                    for condition in list(rules['conditions']) + [None]:
+                        recommendations = (rules['severity'][severity]
+                                           + rules['age'].get(band, [])
+                                           + (rules['gender']['female'] if female else [])
+                                           + rules['conditions'].get(condition, []))
+                        table[severity, band, female, condition] = ". ".join(recommendations) + "."
+        return table
+
+    # Lookups
+
+    def _answers(self, lifestyle: Union[dict, str]) -> Tuple[Any, Any]:
+        if isinstance(lifestyle, str):
+            return self._defaults['exercise'], self._defaults['sleep']
+        return (lifestyle.get('exercise', self._defaults['exercise']),
+                lifestyle.get('sleep', self._defaults['sleep']))
+
+    def lifestyle_recommendations(self, lifestyle: Union[dict, str]) -> Tuple[str, ...]:
+        if isinstance(lifestyle, dict):
+            exercise = lifestyle.get('exercise', self._defaults['exercise'])
+            sleep = lifestyle.get('sleep', self._defaults['sleep'])
+        else:
+            preset = self._presets.get(lifestyle, self._defaults) if isinstance(lifestyle, str) else self._defaults
+            exercise, sleep = preset['exercise'], preset['sleep']
+        return self._lifestyle[_level(exercise, EXERCISE_LEVELS), _level(sleep, SLEEP_BANDS)]
+
+    def fitness_plan(self, lifestyle: Union[dict, str]) -> FrozenDict:
+        exercise, sleep = self._answers(lifestyle)
+        plan = self._fitness.get((exercise, sleep))
+        if plan is None:
+            # Same error as the original per-field lookups
+            raise KeyError(exercise if exercise not in EXERCISE_LEVELS else sleep)
+        return plan
+
+    def diet_plan(self, age: int, weight: float, height: float, lifestyle: Union[dict, str]) -> FrozenDict:
+        bmi = bmi_band(weight, height)
+        exercise, _ = self._answers(lifestyle)
+        band = 'child' if age < 18 else 'senior' if age >= 65 else 'adult'
+        return self._diet[band, bmi, exercise in self._diet_active_levels]
+
+    def follow_up_instructions(self, condition: str, age: int) -> Tuple[str, ...]:
+        senior = bool(age and age >= 65)
+        key = condition.lower()
+        return self._follow_up.get((key, senior)) or self._follow_up[None, senior]
+
+    def preventive_measures(self, condition: str) -> Tuple[str, ...]:
+        return self._preventive.get(condition, self._preventive_default)
+
+    def differential_diagnosis(self, condition: str, symptoms: Iterable[str]) -> Tuple[FrozenDict, ...]:
+        by_symptoms = self._differential.get(condition) or self._differential[None]
+        return by_symptoms[tuple(trigger in symptoms for trigger in self._differential_triggers)]
+
+    def recommendation(self, condition: str, severity: str, age: Union[str, int, None] = None,
+                       gender: Optional[str] = None) -> str:
+        try:
+            # Convert age to integer if it's a string
+            if isinstance(age, str):
+                try:
+                    age = int(age)
+                except (ValueError, TypeError):
+                    logger.warning(f"Invalid age format: {age}")
+                    age = None
+            band = age_band(age)
+            key = condition.lower()
+            return self._recommendation[
+                severity if severity in ('high', 'moderate') else None,
+                band,
+                gender == 'female',
+                key if key in self.rules['recommendation']['conditions'] else None
+            ]
+        except Exception as e:
+            logger.error(f"Error generating recommendations: {str(e)}", exc_info=True)
+            return self._recommendation_fallback
+
@@ -0,0 +1,195 @@
+"""
+Non-blocking, sampled and redacted request logging
+
+``configure_logging`` moves every root handler behind a queue: request
+threads only enqueue the log record, and a background listener thread
+formats it and performs the I/O. Records at INFO and below can be sampled
+per route (warnings and errors are always kept), and ``Redacted`` keeps
+patient payload fields out of log messages.
+
+The queue is bounded: if the listener falls ``queue_size`` records behind,
+further records are dropped and counted rather than holding up requests
+or growing without limit. A process forked after ``configure_logging``
+inherits the queue handler but not the listener thread, so it must call
+``restart_listener`` (gunicorn.conf.py does in ``post_fork``) or
+``detach_queue`` before logging.
+"""
+import atexit
+import logging
+import os
+import random
+from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener
+from queue import Full, Queue
+from typing import Any, Dict, Optional
+
+# Payload fields that carry patient data and never reach the logs
+REDACTED_FIELDS = frozenset({
+    'symptoms', 'symptoms_text', 'age', 'gender', 'height', 'weight', 'lifestyle'
+})
+
+_sampled: ContextVar[bool] = ContextVar('log_sampled', default=True)
+_sample_rates: Dict[str, float] = {}
+_default_rate = 1.0
+# Records the queue holds before new ones are dropped
+QUEUE_SIZE = 10000
+
+_listener: Optional[QueueListener] = None
+# Process that started ``_listener``; a fork inherits the listener object but not its thread
+_listener_pid: Optional[int] = None
+
+
+def redact(payload: Any) -> Any:
+    """Copy of ``payload`` with patient fields replaced by a placeholder."""
+    if isinstance(payload, dict):
+        return {key: '[redacted]' if key in REDACTED_FIELDS else redact(value) for key, value in payload.items()}
+    if isinstance(payload, list):
+        return [redact(item) for item in payload]
+    return payload
+
+
+class Redacted:
+    """Log argument that redacts its payload only if the record is actually formatted."""
+
+    __slots__ = ('payload',)
+
+    def __init__(self, payload: Any):
+        self.payload = payload
+
+    def __str__(self) -> str:
+        return str(redact(self.payload))
+
+
+class DeferredQueueHandler(QueueHandler):
+    """QueueHandler that leaves message formatting to the listener thread.
+
+    The stock ``prepare`` formats the message on the calling thread; here
+    only the traceback text is rendered up front, so the record does not keep
+    the request's frames alive while it waits in the queue. Records that do
+    not fit in a full queue are counted in ``dropped``.
+    """
+
+    def __init__(self, queue: Queue):
+        super().__init__(queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except Full:
+            self.dropped += 1
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class SamplingFilter(logging.Filter):
+    """Drops INFO/DEBUG records of requests that were not sampled."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno >= logging.WARNING or _sampled.get()
+
+
+def parse_sample_rates(spec: str) -> Dict[str, float]:
+    """Parse ``"/api/health-assessment=0.1,/health=0"`` into a route -> rate mapping."""
+    rates = {}
+    for item in filter(None, (part.strip() for part in spec.split(','))):
+        route, _, rate = item.rpartition('=')
+        if not route:
+            raise ValueError(f"Invalid log sample rate: {item}")
+        rates[route] = min(max(float(rate), 0.0), 1.0)
+    return rates
+
+
+def begin_request(route: str) -> None:
+    """Decide once per request whether its INFO/DEBUG records are kept."""
+    if not _sample_rates and _default_rate >= 1.0:
+        return
+    rate = _sample_rates.get(route, _default_rate)
+    _sampled.set(rate >= 1.0 or random.random() < rate)
+
+
+def detach_queue() -> None:
+    """In a forked child, write records straight to the listener's handlers.
+
+    The child inherits the queue but not the listener thread, so queued
+    records would never be written.
+    """
+    global _listener, _listener_pid
+    if _listener is None:
+        return
+    logging.getLogger().handlers = list(_listener.handlers)
+    _listener = _listener_pid = None
+
+
+def _queue_handler() -> Optional[DeferredQueueHandler]:
+    for handler in logging.getLogger().handlers:
+        if isinstance(handler, DeferredQueueHandler):
+            return handler
+    return None
+
+
+def restart_listener() -> None:
+    """In a forked child, start a listener thread of its own on a fresh queue.
+
+    Records the parent had queued but not yet written stay the parent's to
+    write. Does nothing in the process that started the listener.
+    """
+    global _listener, _listener_pid
+    handler = _queue_handler()
+    if _listener is None or _listener_pid == os.getpid() or handler is None:
+        return
+    handler.queue = Queue(_listener.queue.maxsize)
+    _listener = QueueListener(handler.queue, *_listener.handlers, respect_handler_level=True)
+    _listener_pid = os.getpid()
+    _listener.start()
+
+
+def _stop_listener() -> None:
+    """Write out what is queued and stop the listener, if this process started it."""
+    global _listener_pid
+    if _listener is not None and _listener_pid == os.getpid():
+        _listener_pid = None
+        _listener.stop()
+
+
+def dropped_records() -> int:
+    """Records dropped in this process because the log queue was full."""
+    handler = _queue_handler()
+    return handler.dropped if handler is not None else 0
+
+
+def configure_logging(level: int = logging.INFO, sample_rates: Optional[Dict[str, float]] = None,
+                      default_rate: float = 1.0, queue_size: int = QUEUE_SIZE) -> QueueListener:
+    """Route all root logging through a queue drained by a background thread.
+
+    The current root handlers (or a stderr handler if there are none) become
+    the listener's targets. Calling this again only updates the sampling rates.
+    """
+    global _listener, _listener_pid, _default_rate
+    if queue_size <= 0:
+        raise ValueError(f"The log queue needs room for at least one record, got {queue_size}")
+    _sample_rates.clear()
+    _sample_rates.update(sample_rates or {})
+    _default_rate = default_rate
+
+    root = logging.getLogger()
+    root.setLevel(level)
+    if _listener is not None:
+        return _listener
+
+    handlers = root.handlers[:] or [logging.StreamHandler()]
+    queue = Queue(queue_size)
+    handler = DeferredQueueHandler(queue)
+    handler.addFilter(SamplingFilter())
+    root.handlers = [handler]
+
+    _listener = QueueListener(queue, *handlers, respect_handler_level=True)
+    _listener_pid = os.getpid()
+    _listener.start()
+    atexit.register(_stop_listener)
+    return _listener
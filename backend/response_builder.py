@@ -0,0 +1,108 @@
+"""
+JSON response assembly from pre-encoded fragments
+
+Sections that are the same for every caller (or for every caller in a
+bucket) are encoded once and kept as bytes; a response body is then spliced
+together from those bytes and the per-request fields. orjson is used when it
+is installed, otherwise the standard library encoder.
+"""
+import json
+import threading
+import uuid
+from typing import Any, Callable, Dict, Hashable, Optional, Sequence, Tuple
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+_encoder = json.JSONEncoder(sort_keys=True, separators=(',', ':'))
+
+# Mark where pre-encoded sections go in a body being assembled: (placeholder, its JSON encoding)
+_PLACEHOLDER_TOKEN = uuid.uuid4().hex
+_PLACEHOLDERS = [(f"fragment-{_PLACEHOLDER_TOKEN}-{i}", f'"fragment-{_PLACEHOLDER_TOKEN}-{i}"'.encode('ascii'))
+                 for i in range(64)]
+
+
+def encode(value: Any) -> bytes:
+    """Encode ``value`` as compact JSON with sorted keys, like ``jsonify`` outside debug mode.
+
+    With orjson, non-ASCII text is written as UTF-8 instead of ``\\u`` escapes.
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(value, option=orjson.OPT_SORT_KEYS)
+        except TypeError:
+            pass  # e.g. non-string keys, which the standard encoder converts
+    return _encoder.encode(value).encode('utf-8')
+
+
+class FragmentCache:
+    """Process-wide response sections, each stored with its encoded JSON.
+
+    ``section`` returns the same object for every request with the same key,
+    and ``encoded`` recognizes those objects when the response is assembled.
+    Keys must identify every input the section depends on. Once ``capacity``
+    sections are stored, further ones are built per request instead.
+    Sections are shared and must not be modified.
+    """
+
+    def __init__(self, capacity: int = 4096):
+        self.capacity = capacity
+        self._sections: Dict[Hashable, Tuple[Any, bytes]] = {}
+        self._by_id: Dict[int, Tuple[Any, bytes]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._sections)
+
+    def section(self, key: Hashable, build: Callable[[], Any]) -> Any:
+        """Return the section stored under ``key``, building and encoding it on first use."""
+        entry = self._sections.get(key)
+        if entry is None:
+            value = build()
+            with self._lock:
+                entry = self._sections.get(key)
+                if entry is None:
+                    if len(self._sections) >= self.capacity:
+                        return value
+                    # Stored entries are never dropped, so their ids stay unique
+                    entry = (value, encode(value))
+                    self._sections[key] = entry
+                    self._by_id[id(value)] = entry
+        return entry[0]
+
+    def encoded(self, value: Any) -> Optional[bytes]:
+        """Encoded JSON of ``value`` if it is a stored section, else None."""
+        entry = self._by_id.get(id(value))
+        return entry[1] if entry is not None and entry[0] is value else None
+
+
+def encode_with_fragments(obj: Dict[str, Any], fragments: FragmentCache, field: str,
+                          section_keys: Sequence[str]) -> bytes:
+    """Encode ``obj`` like ``encode``, splicing in the stored encoding of the shared sections.
+
+    The sections named ``section_keys`` inside ``obj[field]`` are swapped for
+    placeholder strings, the rest is encoded in one call, and each placeholder
+    is then replaced by the section's stored bytes. Placeholders embed a
+    random per-process token, so request data cannot forge one.
+
+    With orjson a full encode is cheaper than the bookkeeping the splice
+    needs (see benchmarks/serialization.py), so the body is encoded in one
+    pass instead.
+    """
+    if orjson is not None:
+        return encode(obj)
+
+    nested = dict(obj[field])
+    spliced = []
+    for (placeholder, quoted), key in zip(_PLACEHOLDERS, section_keys):
+        raw = fragments.encoded(nested.get(key))
+        if raw is not None:
+            nested[key] = placeholder
+            spliced.append((quoted, raw))
+
+    body = encode({**obj, field: nested})
+    for quoted, raw in spliced:
+        body = body.replace(quoted, raw, 1)
+    return body
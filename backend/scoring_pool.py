@@ -0,0 +1,139 @@
+"""
+Process-pool backend for similarity scoring
+
+Fuzzy matching is pure-Python work that holds the GIL, so scoring threads
+only take turns. A ``ScoringPool`` forks worker processes from a process
+that already holds the compiled engine: the workers inherit the catalog,
+index and similarity cache copy-on-write, and a request only carries the
+symptoms, as vocabulary ids where the symptom is a catalog symptom, and
+returns ``(position, score)`` pairs.
+"""
+import gc
+import itertools
+import logging
+import multiprocessing
+import os
+import signal
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Dict, List, Sequence, Tuple, Union
+
+from request_logging import detach_queue
+from similarity_engine import SimilarityEngine
+
+logger = logging.getLogger(__name__)
+
+# Engines of the pools created in this process, inherited by the workers at fork
+_engines: Dict[int, SimilarityEngine] = {}
+_tokens = itertools.count()
+
+Query = Tuple[Union[int, str], ...]
+
+
+def _init_worker() -> None:
+    # The parent handles Ctrl-C and shuts the pool down; the parent's log queue has no reader here
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    detach_queue()
+
+
+def _ready() -> int:
+    return os.getpid()
+
+
+def _rank_many(token: int, queries: Sequence[Query], threshold: float,
+               top_k: int) -> List[List[Tuple[int, float]]]:
+    engine = _engines[token]
+    vocabulary = engine.index.vocabulary
+    symptom_lists = [
+        [vocabulary[symptom] if isinstance(symptom, int) else symptom for symptom in query]
+        for query in queries
+    ]
+    return engine.rank_many(symptom_lists, threshold, top_k)
+
+
+class ScoringPool:
+    """Worker processes ranking symptom lists with a fork-inherited ``SimilarityEngine``.
+
+    All workers are forked when the pool is created, so create it after the
+    catalog is loaded and before serving (e.g. in gunicorn's
+    ``post_worker_init``, see gunicorn.conf.py). Objects that exist at that
+    point are moved out of the garbage collector's reach in the workers, so
+    collections there do not write to, and copy, the shared catalog pages.
+    The pool only works in the process that created it; a process forked
+    later must create its own.
+    """
+
+    def __init__(self, engine: SimilarityEngine, workers: int):
+        if workers < 1:
+            raise ValueError(f"A scoring pool needs at least one worker, got {workers}")
+        self.engine = engine
+        self.workers = workers
+        self.pid = os.getpid()
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self._lock = threading.Lock()
+        self._token = next(_tokens)
+        _engines[self._token] = engine
+
+        # With fork, the executor starts every worker on the first submission
+        gc.freeze()
+        try:
+            self._executor = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context('fork'),
+                initializer=_init_worker
+            )
+            self._executor.submit(_ready).result()
+        finally:
+            gc.unfreeze()
+        logger.info("Started %d scoring workers", workers)
+
+    def encode(self, symptoms: Sequence[str]) -> Query:
+        """Normalized symptoms as sent to a worker: vocabulary ids, or the text if not in the vocabulary."""
+        symptom_ids = self.engine.index.symptom_ids
+        return tuple(symptom_ids.get(symptom, symptom) for symptom in symptoms)
+
+    def rank(self, symptoms: Sequence[str], threshold: float, top_k: int) -> List[Tuple[int, float]]:
+        """``SimilarityEngine.rank`` in a worker."""
+        return self._submit([self.encode(symptoms)], threshold, top_k).result()[0]
+
+    def rank_many(self, symptom_lists: Sequence[Sequence[str]], threshold: float,
+                  top_k: int) -> List[List[Tuple[int, float]]]:
+        """``SimilarityEngine.rank_many``, with the lists split across the workers."""
+        queries = [self.encode(symptoms) for symptoms in symptom_lists]
+        size = -(-len(queries) // self.workers) or 1
+        futures = [self._submit(queries[start:start + size], threshold, top_k)
+                   for start in range(0, len(queries), size)]
+        return [ranked for future in futures for ranked in future.result()]
+
+    def _submit(self, queries: List[Query], threshold: float, top_k: int) -> Future:
+        future = self._executor.submit(_rank_many, self._token, queries, threshold, top_k)
+        with self._lock:
+            self.submitted += 1
+        future.add_done_callback(self._finished)
+        return future
+
+    def _finished(self, future: Future) -> None:
+        with self._lock:
+            if future.cancelled() or future.exception() is not None:
+                self.failed += 1
+            else:
+                self.completed += 1
+
+    def stats(self) -> Dict[str, int]:
+        """Pool size, calls waiting or running (``backlog``) and finished call counts."""
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'backlog': self.submitted - self.completed - self.failed,
+                'submitted': self.submitted,
+                'completed': self.completed,
+                'failed': self.failed
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the workers, cancelling calls that have not started."""
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+        _engines.pop(self._token, None)
+        logger.info("Stopped %d scoring workers", self.workers)
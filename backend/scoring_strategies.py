@@ -0,0 +1,288 @@
+"""
+Registry of interchangeable condition scoring strategies
+"""
+import logging
+import statistics
+import threading
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Any, Dict, List, Sequence, Tuple, Type
+
+from ngram_engine import NgramEngine, TrigramVocabulary
+from overlap_index import OverlapIndex
+from weighted_engine import WeightedEngine
+
+try:
+    from lsh_index import MinHashLSH
+except ImportError:  # pragma: no cover - NumPy is optional
+    MinHashLSH = None
+
+logger = logging.getLogger(__name__)
+
+# Score a condition must exceed to be reported by the similarity-based strategies
+SIMILARITY_THRESHOLD = 0.3
+
+
+class ScoringStrategy(ABC):
+    """Ranks the conditions of one model's catalog for normalized input symptoms.
+
+    Subclasses set ``name``, a one-line ``description`` and a ``cost``
+    profile: ``relative`` (1 is cheapest), and short notes on ``build``
+    time, ``per_request`` work and ``memory``. A strategy is built lazily
+    for each loaded catalog and must be safe to call from request threads.
+    """
+
+    name = ''
+    description = ''
+    cost: Dict[str, Any] = {}
+
+    def __init__(self, model):
+        self.model = model
+
+    @abstractmethod
+    def rank(self, symptoms: Sequence[str], top_k: int) -> List[Tuple[int, float]]:
+        """Up to ``top_k`` ``(position, score)`` pairs, best first, ties in catalog order."""
+
+    def rank_many(self, symptom_lists: Sequence[Sequence[str]], top_k: int) -> List[List[Tuple[int, float]]]:
+        """Rank several symptom lists; results in input order."""
+        return [self.rank(symptoms, top_k) for symptoms in symptom_lists]
+
+
+class LatencyStats:
+    """Call count and a rolling window of per-list ranking times of one strategy."""
+
+    def __init__(self, window: int):
+        self._samples: 'deque[float]' = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.lists = 0
+        self.seconds = 0.0
+
+    def record(self, seconds: float, lists: int) -> None:
+        with self._lock:
+            self.calls += 1
+            self.lists += lists
+            self.seconds += seconds
+            self._samples.append(seconds / max(lists, 1))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            samples = sorted(self._samples)
+            calls, lists, seconds = self.calls, self.lists, self.seconds
+        if not samples:
+            return {'calls': calls, 'lists': lists}
+        return {
+            'calls': calls,
+            'lists': lists,
+            'mean_ms': round(seconds / max(lists, 1) * 1000, 4),
+            'p50_ms': round(statistics.median(samples) * 1000, 4),
+            'p95_ms': round(samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1000, 4),
+            'max_ms': round(samples[-1] * 1000, 4)
+        }
+
+
+class StrategyRegistry:
+    """Named scoring strategies, with the latency each has shown in this process.
+
+    ``register`` is usable as a class decorator. Latency is kept per
+    ranked symptom list over the last ``window`` calls, so operators can
+    pick the cheapest strategy whose results are good enough for a client.
+    """
+
+    def __init__(self, window: int = 1024):
+        self.window = window
+        self._strategies: Dict[str, Type[ScoringStrategy]] = {}
+        self._latency: Dict[str, LatencyStats] = {}
+
+    def register(self, strategy: Type[ScoringStrategy]) -> Type[ScoringStrategy]:
+        if not strategy.name:
+            raise ValueError("Scoring strategies need a name")
+        if strategy.name in self._strategies:
+            raise ValueError(f"Scoring strategy already registered: {strategy.name}")
+        self._strategies[strategy.name] = strategy
+        self._latency[strategy.name] = LatencyStats(self.window)
+        return strategy
+
+    def __contains__(self, name: object) -> bool:
+        return isinstance(name, str) and name in self._strategies
+
+    def names(self) -> Tuple[str, ...]:
+        return tuple(self._strategies)
+
+    def create(self, name: str, model) -> ScoringStrategy:
+        """Build strategy ``name`` for ``model``'s current catalog; ValueError if unknown."""
+        strategy = self._strategies.get(name)
+        if strategy is None:
+            raise ValueError(f"Unknown scoring strategy: {name}")
+        return strategy(model)
+
+    def record(self, name: str, seconds: float, lists: int = 1) -> None:
+        """Account ``seconds`` spent ranking ``lists`` symptom lists with strategy ``name``."""
+        self._latency[name].record(seconds, lists)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Description, cost profile and observed latency of every strategy."""
+        return {
+            name: {
+                'description': strategy.description,
+                'cost': dict(strategy.cost),
+                'latency': self._latency[name].stats()
+            }
+            for name, strategy in self._strategies.items()
+        }
+
+
+strategy_registry = StrategyRegistry()
+
+
+@strategy_registry.register
+class ExactOverlapStrategy(ScoringStrategy):
+    name = 'exact'
+    description = 'Share of a condition\'s symptoms named exactly; for canonical symptoms'
+    cost = {
+        'relative': 1,
+        'build': 'one vocabulary bitmask per condition',
+        'per_request': 'popcount of AND against every condition, no string comparison',
+        'memory': 'conditions x vocabulary bits'
+    }
+
+    def __init__(self, model):
+        super().__init__(model)
+        self.overlap = OverlapIndex(model.symptom_index)
+
+    def rank(self, symptoms: Sequence[str], top_k: int) -> List[Tuple[int, float]]:
+        return self.overlap.rank(symptoms, top_k)
+
+
+class WeightedStrategy(ScoringStrategy):
+    """IDF-weighted overlap through a sparse ``WeightedEngine`` with the class's ``scheme``."""
+
+    scheme = 'tfidf'
+
+    def __init__(self, model):
+        super().__init__(model)
+        self.engine = WeightedEngine(model.symptom_index, self.scheme)
+
+    def rank(self, symptoms: Sequence[str], top_k: int) -> List[Tuple[int, float]]:
+        # Any weighted overlap counts, as with exact overlap
+        return self.engine.rank(symptoms, threshold=0.0, top_k=top_k)
+
+
+@strategy_registry.register
+class TfidfStrategy(WeightedStrategy):
+    name = 'weighted'
+    description = 'Cosine of TF-IDF vectors; symptoms shared by many conditions weigh less'
+    scheme = 'tfidf'
+    cost = {
+        'relative': 1,
+        'build': 'sparse condition x symptom weight matrix (CSR by symptom)',
+        'per_request': 'sparse dot product over the postings of the input symptoms',
+        'memory': 'one index and one weight per (condition, symptom) pair'
+    }
+
+
+@strategy_registry.register
+class Bm25Strategy(WeightedStrategy):
+    name = 'bm25'
+    description = 'Okapi BM25 over condition symptom lists, normalized to [0, 1]'
+    scheme = 'bm25'
+    cost = TfidfStrategy.cost
+
+
+@strategy_registry.register
+class NgramStrategy(ScoringStrategy):
+    name = 'ngram'
+    description = 'Average best trigram similarity of each input symptom; tolerates typos'
+    cost = {
+        'relative': 2,
+        'build': 'trigram postings of the vocabulary',
+        'per_request': 'postings lookups per new input symptom (cached), then per-condition max and mean',
+        'memory': 'vocabulary trigrams plus a similarity cache'
+    }
+
+    def __init__(self, model):
+        super().__init__(model)
+        self.engine = NgramEngine(model.symptom_index, cache_size=model.similarity_engine.cache.capacity)
+
+    def rank(self, symptoms: Sequence[str], top_k: int) -> List[Tuple[int, float]]:
+        return self.engine.rank(symptoms, threshold=SIMILARITY_THRESHOLD, top_k=top_k)
+
+    def rank_many(self, symptom_lists: Sequence[Sequence[str]], top_k: int) -> List[List[Tuple[int, float]]]:
+        return self.engine.rank_many(symptom_lists, threshold=SIMILARITY_THRESHOLD, top_k=top_k)
+
+
+@strategy_registry.register
+class FuzzyStrategy(ScoringStrategy):
+    name = 'fuzzy'
+    description = 'Average best difflib ratio of each input symptom; the default'
+    cost = {
+        'relative': 3,
+        'build': 'condition symptom layout (shared with sessions)',
+        'per_request': 'difflib ratio against the whole vocabulary per new input symptom (cached)',
+        'memory': 'a similarity cache of per-condition vectors'
+    }
+
+    def rank(self, symptoms: Sequence[str], top_k: int) -> List[Tuple[int, float]]:
+        # Through the model, so a scoring pool is used when one is running
+        return self.model.rank_similar(symptoms, top_k)
+
+    def rank_many(self, symptom_lists: Sequence[Sequence[str]], top_k: int) -> List[List[Tuple[int, float]]]:
+        return self.model.rank_similar_many(symptom_lists, top_k)
+
+
+@strategy_registry.register
+class LshStrategy(ScoringStrategy):
+    """Fuzzy scoring of the conditions a MinHash/LSH index retrieves.
+
+    The request's symptom set is its canonical symptoms plus, for every
+    input not in the vocabulary, its ``neighbors`` nearest vocabulary
+    entries by trigram similarity (above ``min_similarity``). Conditions
+    sharing a band with that set (see ``MinHashLSH``) are scored exactly
+    as the ``fuzzy`` strategy scores them, so results differ from it only
+    when a condition of its top-k was not retrieved. Options come from the
+    model's ``lsh_options`` unless given here.
+    """
+
+    name = 'lsh'
+    description = 'Fuzzy scores over MinHash/LSH-retrieved candidates; approximate, for very large catalogs'
+    cost = {
+        'relative': 2,
+        'build': 'MinHash signatures of every condition, banded into sorted key tables',
+        'per_request': 'one binary search per band, then difflib against the candidates\' symptoms only',
+        'memory': 'bands x conditions keys and positions'
+    }
+
+    def __init__(self, model, **options):
+        super().__init__(model)
+        options = {**model.lsh_options, **options}
+        self.neighbors = options.get('neighbors', 1)
+        self.min_similarity = options.get('min_similarity', 0.5)
+        index = model.symptom_index
+        self.lsh = None
+        if MinHashLSH is None:
+            logger.warning("LSH retrieval requires NumPy; using the exhaustive fuzzy scan")
+            return
+        self.trigrams = TrigramVocabulary(index.vocabulary)
+        self.lsh = MinHashLSH(index, bands=options.get('bands', 32), rows=options.get('rows', 1),
+                              seed=options.get('seed', 1))
+
+    def symptom_ids(self, symptoms: Sequence[str]) -> List[int]:
+        """Vocabulary ids the request is retrieved by."""
+        ids = []
+        for symptom, symptom_id in zip(symptoms, self.model.symptom_index.lookup(symptoms)):
+            if symptom_id is not None:
+                ids.append(symptom_id)
+            else:
+                ids.extend(self.trigrams.nearest(symptom, self.neighbors, self.min_similarity))
+        return ids
+
+    def candidates(self, symptoms: Sequence[str]):
+        """Positions of the conditions retrieved for ``symptoms``."""
+        return self.lsh.candidates(self.symptom_ids(symptoms))
+
+    def rank(self, symptoms: Sequence[str], top_k: int) -> List[Tuple[int, float]]:
+        if self.lsh is None:
+            return self.model.rank_similar(symptoms, top_k)
+        return self.model.similarity_engine.rank_candidates(
+            symptoms, self.candidates(symptoms), SIMILARITY_THRESHOLD, top_k
+        )
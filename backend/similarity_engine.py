@@ -0,0 +1,276 @@
+"""
+Vectorized similarity scoring over a precompiled symptom index
+"""
+import difflib
+import logging
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from cache import LRUCache
+from candidate_index import CharProfileIndex
+from symptom_index import SymptomIndex
+from top_k import TopK, select_top_k
+
+logger = logging.getLogger(__name__)
+
+
+def symptom_similarity(symptom: str, cond_symptom: str) -> float:
+    """Fuzzy similarity between an input symptom and a condition symptom."""
+    return difflib.SequenceMatcher(None, symptom, cond_symptom).ratio()
+
+
+class SimilarityEngine:
+    """Scores every condition of a catalog against a list of input symptoms.
+
+    Each input symptom is mapped to a row of similarities against the
+    canonical vocabulary. The per-condition best match is then the max over
+    that condition's symptom columns, and the condition score is the mean of
+    the best matches over all inputs. Both reductions run as array
+    operations over a CSR-style (offsets, columns) layout of the catalog.
+
+    The per-condition best-match vector of each input symptom is memoized in
+    a bounded LRU cache. The cache belongs to the engine, and a new engine is
+    built whenever the catalog changes, so stale vectors are never served.
+
+    For large catalogs a ``candidate_threshold`` enables candidate pruning.
+    A character-profile index gives an upper bound of every
+    input/vocabulary similarity, and the exact ratio is computed only for
+    entries whose bound reaches the threshold. The cached vectors then hold
+    a lower and an upper bound of each best match. At ranking time, conditions
+    whose upper bound cannot reach the top-k are dropped, and the remaining
+    unsettled ones are rescored exactly, so the result is the same as the
+    exhaustive scan. With ``verify_candidates`` every pruned ranking is also
+    checked against the exhaustive one; a mismatch is logged, counted in
+    ``verification_failures`` and the exhaustive ranking is returned.
+    """
+
+    def __init__(self, index: SymptomIndex, cache_size: int = 1024,
+                 candidate_threshold: Optional[float] = None, verify_candidates: bool = False):
+        self.index = index
+        self.cache = LRUCache(cache_size)
+        self.candidate_threshold = candidate_threshold
+        self.verify_candidates = verify_candidates
+        self.verification_failures = 0
+        self.profile_index = None
+
+        lengths = np.fromiter(
+            (len(ids) for ids in index.condition_symptom_ids),
+            dtype=np.int64, count=len(index)
+        )
+        # Conditions without symptoms can never match; reduceat needs non-empty segments
+        self._scored_positions = np.flatnonzero(lengths)
+        scored_lengths = lengths[self._scored_positions]
+        self._offsets = np.zeros(len(scored_lengths), dtype=np.int64)
+        np.cumsum(scored_lengths[:-1], out=self._offsets[1:])
+        if len(scored_lengths):
+            self._columns = np.concatenate([
+                np.frombuffer(index.condition_symptom_ids[i], dtype=np.uint32)
+                for i in self._scored_positions
+            ]).astype(np.intp)
+        else:
+            self._columns = np.zeros(0, dtype=np.intp)
+
+        if candidate_threshold is not None:
+            self.profile_index = CharProfileIndex(index.vocabulary)
+
+    def similarity_row(self, symptom: str) -> np.ndarray:
+        """Similarity of one normalized input symptom against every vocabulary entry."""
+        vocabulary = self.index.vocabulary
+        return np.fromiter(
+            (symptom_similarity(symptom, cond_symptom) for cond_symptom in vocabulary),
+            dtype=np.float64, count=len(vocabulary)
+        )
+
+    def best_matches(self, symptom: str):
+        """Best-match similarity of one normalized input symptom for every condition.
+
+        The returned vector is shared through the cache and must not be modified.
+        """
+        return self.cache.get_or_compute(symptom, lambda: self._compute_best_matches(symptom))
+
+    def exact_matches(self, symptom: str):
+        """Exact best-match vector of ``symptom``, as ``best_matches`` returns it.
+
+        With candidate pruning the cache holds bounds instead, so the vector
+        is computed without it. The returned vector must not be modified.
+        """
+        if self.profile_index is not None:
+            return self._compute_best_matches(symptom)
+        return self.best_matches(symptom)
+
+    def _compute_best_matches(self, symptom: str):
+        best = self._reduce_max(self.similarity_row(symptom))
+        best.flags.writeable = False
+        return best
+
+    def _reduce_max(self, row):
+        if not len(self._scored_positions):
+            return np.zeros(0)
+        return np.maximum.reduceat(row[self._columns], self._offsets)
+
+    def score_conditions(self, symptoms: Sequence[str], cached: bool = True):
+        """Average best-match similarity of every condition, in catalog order."""
+        if cached:
+            vectors = [self.best_matches(symptom) for symptom in symptoms]
+        else:
+            vectors = [self._compute_best_matches(symptom) for symptom in symptoms]
+        return self._mean_scores(vectors)
+
+    def _mean_scores(self, vectors):
+        scores = np.zeros(len(self.index))
+        if vectors:
+            # Summing along axis 0 adds the vectors in input order, as a session accumulates them
+            scores[self._scored_positions] = np.vstack(vectors).sum(axis=0) / len(vectors)
+        return scores
+
+    def rank(self, symptoms: Sequence[str], threshold: float, top_k: int) -> List[Tuple[int, float]]:
+        """Return up to ``top_k`` ``(position, score)`` pairs scoring above ``threshold``.
+
+        Ties keep catalog order, matching a stable descending sort.
+        """
+        if self.profile_index is None:
+            return select_top_k(self.score_conditions(symptoms), threshold, top_k)
+
+        ranked = self._rank_pruned(symptoms, threshold, top_k)
+        if self.verify_candidates:
+            exact = select_top_k(self.score_conditions(symptoms, cached=False), threshold, top_k)
+            if exact != ranked:
+                self.verification_failures += 1
+                logger.warning("Candidate pruning changed the top-%d for symptoms %s", top_k, list(symptoms))
+                return exact
+        return ranked
+
+    def rank_many(self, symptom_lists: Sequence[Sequence[str]], threshold: float,
+                  top_k: int) -> List[List[Tuple[int, float]]]:
+        """Rank several symptom lists in one pass.
+
+        Every distinct symptom across the lists is scored against the catalog
+        once and held for the whole batch, so a small cache cannot evict
+        vectors that later lists still need.
+        """
+        if self.profile_index is not None:
+            return [self.rank(symptoms, threshold, top_k) for symptoms in symptom_lists]
+
+        vectors = {}
+        for symptoms in symptom_lists:
+            for symptom in symptoms:
+                if symptom not in vectors:
+                    vectors[symptom] = self.best_matches(symptom)
+        return [
+            select_top_k(self._mean_scores([vectors[symptom] for symptom in symptoms]), threshold, top_k)
+            for symptoms in symptom_lists
+        ]
+
+    def rank_totals(self, totals, count: int, threshold: float, top_k: int) -> List[Tuple[int, float]]:
+        """Rank from the element-wise sum of ``count`` best-match vectors, like ``rank``.
+
+        ``totals`` must have been summed in input order, starting from the
+        first vector, for the scores to equal a fresh ``rank`` of the same
+        symptoms.
+        """
+        if not count or top_k <= 0:
+            return []
+        scores = np.zeros(len(self.index))
+        scores[self._scored_positions] = totals / count
+        return select_top_k(scores, threshold, top_k)
+
+    def rank_candidates(self, symptoms: Sequence[str], positions: Iterable[int], threshold: float,
+                        top_k: int) -> List[Tuple[int, float]]:
+        """Rank only the conditions at ``positions``, scoring each exactly as ``rank`` would.
+
+        Similarities are computed against the symptoms of those conditions
+        alone, so the cost follows the candidate set rather than the
+        vocabulary. The result is ``rank``'s top-k whenever it lies within
+        the candidates. Nothing is cached.
+        """
+        count = len(symptoms)
+        top = TopK(top_k)
+        if not count or top_k <= 0:
+            return []
+        index = self.index
+        vocabulary = index.vocabulary
+        similarities: List[dict] = [{} for _ in range(count)]
+        for position in positions:
+            total = 0.0
+            for i, symptom in enumerate(symptoms):
+                row = similarities[i]
+                best = 0
+                for symptom_id in index.condition_symptom_ids[position]:
+                    similarity = row.get(symptom_id)
+                    if similarity is None:
+                        similarity = row[symptom_id] = symptom_similarity(symptom, vocabulary[symptom_id])
+                    if similarity > best:
+                        best = similarity
+                total += best
+            score = total / count
+            if score > threshold:
+                top.push(int(position), score)
+        return top.results()
+
+    def match_bounds(self, symptom: str):
+        """Lower and upper bound of the best match of ``symptom`` for every scored condition.
+
+        Only used with candidate pruning. The vectors are shared through the
+        cache and must not be modified.
+        """
+        return self.cache.get_or_compute(symptom, lambda: self._compute_match_bounds(symptom))
+
+    def _compute_match_bounds(self, symptom: str):
+        vocabulary = self.index.vocabulary
+        bounds = self.profile_index.upper_bounds(symptom)
+        computed = bounds >= self.candidate_threshold
+
+        exact = np.zeros(len(vocabulary))
+        for symptom_id in np.flatnonzero(computed):
+            exact[symptom_id] = symptom_similarity(symptom, vocabulary[symptom_id])
+
+        lower = self._reduce_max(exact)
+        upper = self._reduce_max(np.where(computed, exact, bounds))
+        lower.flags.writeable = False
+        upper.flags.writeable = False
+        return lower, upper
+
+    def _rank_pruned(self, symptoms: Sequence[str], threshold: float, top_k: int) -> List[Tuple[int, float]]:
+        if not symptoms or top_k <= 0:
+            return []
+
+        bounds = [self.match_bounds(symptom) for symptom in symptoms]
+        lower = np.vstack([low for low, _ in bounds])
+        upper = np.vstack([high for _, high in bounds])
+        lower_scores = lower.sum(axis=0) / len(symptoms)
+        upper_scores = upper.sum(axis=0) / len(symptoms)
+
+        # A condition whose upper bound is below the k-th best lower bound cannot enter the top-k
+        eligible = upper_scores > threshold
+        passing = lower_scores[lower_scores > threshold]
+        if len(passing) >= top_k:
+            cutoff = np.partition(passing, len(passing) - top_k)[len(passing) - top_k]
+            eligible &= upper_scores >= cutoff
+        survivors = np.flatnonzero(eligible)
+
+        # Settled conditions already have their exact score; the rest are rescored
+        # in decreasing upper-bound order until none of them can enter the top-k
+        top = TopK(top_k)
+        settled = (lower[:, survivors] == upper[:, survivors]).all(axis=0)
+        for i in np.flatnonzero(settled):
+            if lower_scores[survivors[i]] > threshold:
+                top.push(int(self._scored_positions[survivors[i]]), float(lower_scores[survivors[i]]))
+
+        unsettled = survivors[~settled]
+        for scored in unsettled[np.argsort(-upper_scores[unsettled], kind='stable')]:
+            position = int(self._scored_positions[scored])
+            if not top.beats(float(upper_scores[scored]), position):
+                break
+            score = self._exact_score(symptoms, position)
+            if score > threshold:
+                top.push(position, score)
+        return top.results()
+
+    def _exact_score(self, symptoms: Sequence[str], position: int) -> float:
+        vocabulary = self.index.vocabulary
+        symptom_ids = self.index.condition_symptom_ids[position]
+        total = 0.0
+        for symptom in symptoms:
+            total += max(symptom_similarity(symptom, vocabulary[i]) for i in symptom_ids)
+        return total / len(symptoms)
@@ -0,0 +1,66 @@
+"""
+Pre-serialized responses for endpoints whose content only changes between deploys
+"""
+import gzip
+import hashlib
+from typing import Any, List, Optional, Tuple
+
+from flask import Flask, Request, Response
+from werkzeug.http import parse_accept_header, parse_etags
+
+# Browsers and CDNs may reuse a static response this long before revalidating it
+STATIC_MAX_AGE = 3600
+
+
+class StaticResponse:
+    """A JSON body encoded once, with its gzip variant and strong ETags.
+
+    ``negotiate`` only picks among the stored bytes: it sends the gzip
+    variant to clients that accept it, and answers 304 when ``If-None-Match``
+    names the ETag of the variant it picked. ``respond`` wraps the result in a Flask ``Response``. The two
+    variants have different ETags, as strong validators of different
+    representations must.
+    """
+
+    __slots__ = ('body', 'gzipped', 'etag', 'gzip_etag', 'mimetype', 'cache_control')
+
+    def __init__(self, body: bytes, mimetype: str = 'application/json', max_age: int = STATIC_MAX_AGE):
+        self.body = body
+        # mtime=0 keeps the compressed bytes, and so the ETag, identical across workers and restarts
+        self.gzipped = gzip.compress(body, compresslevel=9, mtime=0)
+        digest = hashlib.sha256(body).hexdigest()[:32]
+        self.etag = digest
+        self.gzip_etag = f"{digest}-gzip"
+        self.mimetype = mimetype
+        self.cache_control = f"public, max-age={max_age}"
+
+    @classmethod
+    def json(cls, app: Flask, payload: Any, max_age: int = STATIC_MAX_AGE) -> 'StaticResponse':
+        """Encode ``payload`` exactly like ``jsonify`` outside debug mode."""
+        body = f"{app.json.dumps(payload, separators=(',', ':'))}\n".encode('utf-8')
+        return cls(body, app.json.mimetype, max_age)
+
+    def negotiate(self, accept_encoding: Optional[str],
+                  if_none_match: Optional[str]) -> Tuple[int, List[Tuple[str, str]], bytes]:
+        """``(status, headers, body)`` for a request with the given header values."""
+        use_gzip = parse_accept_header(accept_encoding)['gzip'] > 0
+        etag = self.gzip_etag if use_gzip else self.etag
+        headers = [
+            ('ETag', f'"{etag}"'),
+            ('Cache-Control', self.cache_control),
+            ('Vary', 'Accept-Encoding')
+        ]
+        # A client holding the other variant must get this one, not a 304 that keeps the wrong encoding
+        if parse_etags(if_none_match).contains_weak(etag):
+            return 304, headers, b''
+        body = self.gzipped if use_gzip else self.body
+        headers += [('Content-Type', self.mimetype), ('Content-Length', str(len(body)))]
+        if use_gzip:
+            headers.append(('Content-Encoding', 'gzip'))
+        return 200, headers, body
+
+    def respond(self, request: Request) -> Response:
+        """Flask response for ``request``: 304, gzip or identity body, with validators and caching headers."""
+        status, headers, body = self.negotiate(request.headers.get('Accept-Encoding'),
+                                               request.headers.get('If-None-Match'))
+        return Response(body, status=status, headers=headers)
@@ -0,0 +1,94 @@
+"""
+Prefix search over canonical symptoms and their everyday phrasings
+"""
+import bisect
+import heapq
+from typing import Dict, List, Optional, Tuple
+
+from cache import LRUCache
+from symptom_extractor import SYNONYMS
+from symptom_index import SymptomIndex, normalize_symptom
+
+
+def normalize_prefix(text: str) -> str:
+    """Lower-case ``text`` and collapse its whitespace, keeping one trailing space if it had any."""
+    words = text.lower().split()
+    if not words:
+        return ''
+    prefix = ' '.join(words)
+    return f"{prefix} " if text[-1:].isspace() else prefix
+
+
+class SymptomAutocomplete:
+    """Sorted-array prefix index over the catalog vocabulary and ``SYNONYMS``.
+
+    Every phrase (a canonical symptom, or a synonym of one in the catalog)
+    is indexed under each of its word suffixes, so ``light`` finds
+    ``sensitivity to light`` as well as ``light sensitivity``. The keys sit
+    in one sorted list; the keys starting with a prefix are a contiguous
+    slice found by two bisections. Suggestions are canonical symptoms,
+    ranked by whether a phrase starts with the prefix, then by the number of
+    conditions listing the symptom; the symptom's own name is preferred over
+    a synonym, then shorter and alphabetical phrases.
+    Results are memoized per ``(prefix, limit)``.
+    """
+
+    def __init__(self, index: SymptomIndex, synonyms: Optional[Dict[str, str]] = None,
+                 cache_size: int = 4096):
+        # (phrase, symptom id, is a synonym)
+        phrases: List[Tuple[str, int, bool]] = [
+            (symptom, symptom_id, False) for symptom_id, symptom in enumerate(index.vocabulary)
+        ]
+        for phrase, symptom in (SYNONYMS if synonyms is None else synonyms).items():
+            symptom_id = index.symptom_ids.get(normalize_symptom(symptom))
+            if symptom_id is not None:
+                phrases.append((normalize_prefix(phrase).strip(), symptom_id, True))
+
+        entries = []
+        for phrase_id, (phrase, _, _) in enumerate(phrases):
+            words = phrase.split(' ')
+            for start in range(len(words)):
+                entries.append((' '.join(words[start:]), start > 0, phrase_id))
+        entries.sort()
+
+        self._keys: List[str] = [key for key, _, _ in entries]
+        # Per key: (inside a phrase, phrase id)
+        self._postings: List[Tuple[bool, int]] = [(inner, phrase_id) for _, inner, phrase_id in entries]
+        self._phrases = phrases
+        self._vocabulary = index.vocabulary
+        self._frequency = [len(conditions) for conditions in index.postings]
+        self.cache = LRUCache(cache_size)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def suggest(self, prefix: str, limit: int = 10) -> List[Dict]:
+        """Up to ``limit`` canonical symptoms for a typed prefix, best first.
+
+        Each suggestion has the canonical ``symptom``, the phrase that matched
+        (a synonym or the symptom itself) and the number of ``conditions``
+        listing the symptom. The returned list is shared through the cache and
+        must not be modified.
+        """
+        prefix = normalize_prefix(prefix)
+        if not prefix or limit <= 0:
+            return []
+        return self.cache.get_or_compute((prefix, limit), lambda: self._suggest(prefix, limit))
+
+    def _suggest(self, prefix: str, limit: int) -> List[Dict]:
+        low = bisect.bisect_left(self._keys, prefix)
+        high = bisect.bisect_left(self._keys, prefix + '\uffff', low)
+
+        # Best-ranked phrase per canonical symptom
+        best: Dict[int, Tuple] = {}
+        for inner, phrase_id in self._postings[low:high]:
+            phrase, symptom_id, synonym = self._phrases[phrase_id]
+            rank = (inner, -self._frequency[symptom_id], synonym, len(phrase), phrase)
+            if symptom_id not in best or rank < best[symptom_id]:
+                best[symptom_id] = rank
+
+        return [{
+            'symptom': self._vocabulary[symptom_id],
+            'match': rank[4],
+            'conditions': -rank[1]
+        } for rank, symptom_id in heapq.nsmallest(limit, ((rank, symptom_id) for symptom_id, rank in best.items()))]
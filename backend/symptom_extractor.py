@@ -0,0 +1,153 @@
+"""
+Free-text symptom extraction with a compiled Aho-Corasick automaton
+"""
+import re
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from symptom_index import normalize_symptom
+
+# Everyday phrasings mapped to the canonical symptom they describe. Entries whose
+# canonical symptom is not in the loaded catalog are ignored.
+SYNONYMS: Dict[str, str] = {
+    'stuffy nose': 'congestion',
+    'blocked nose': 'congestion',
+    'nasal congestion': 'congestion',
+    'sneezes': 'sneezing',
+    'scratchy throat': 'sore throat',
+    'throat pain': 'sore throat',
+    'coughing': 'cough',
+    'feverish': 'fever',
+    'high temperature': 'fever',
+    'temperature': 'fever',
+    'body aches': 'muscle aches',
+    'aching muscles': 'muscle aches',
+    'muscle pain': 'muscle aches',
+    'sore muscles': 'muscle aches',
+    'headaches': 'headache',
+    'head ache': 'headache',
+    'bad headache': 'severe headache',
+    'terrible headache': 'severe headache',
+    'tired': 'fatigue',
+    'exhausted': 'fatigue',
+    'exhaustion': 'fatigue',
+    'tiredness': 'fatigue',
+    'nauseous': 'nausea',
+    'nauseated': 'nausea',
+    'queasy': 'nausea',
+    'light sensitivity': 'sensitivity to light',
+    'sensitive to light': 'sensitivity to light',
+    'sound sensitivity': 'sensitivity to sound',
+    'sensitive to noise': 'sensitivity to sound',
+    'the runs': 'diarrhea',
+    'diarrhoea': 'diarrhea',
+    'throwing up': 'vomiting',
+    'threw up': 'vomiting',
+    'vomited': 'vomiting',
+    'stomach ache': 'abdominal pain',
+    'stomachache': 'abdominal pain',
+    'stomach pain': 'abdominal pain',
+    'belly pain': 'abdominal pain',
+    'short of breath': 'shortness of breath',
+    'breathless': 'shortness of breath',
+    'nose bleed': 'nosebleeds',
+    'nosebleed': 'nosebleeds',
+    'dizzy': 'dizziness',
+    'lightheaded': 'dizziness',
+    'thirsty': 'increased thirst',
+    'very thirsty': 'increased thirst',
+    'peeing a lot': 'frequent urination',
+    'urinating often': 'frequent urination',
+    'blurry vision': 'blurred vision',
+}
+
+_TOKEN = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lower-case word tokens."""
+    return _TOKEN.findall(text.lower())
+
+
+class SymptomExtractor:
+    """Aho-Corasick automaton over word tokens that finds symptom phrases in text.
+
+    Patterns are the catalog vocabulary plus ``SYNONYMS``, compiled once into
+    a trie with failure and dictionary-suffix links. ``extract`` tokenizes the
+    text and walks the automaton in a single pass, so the cost is linear in
+    the text length plus the number of matches, independent of the size of
+    the vocabulary. Overlapping matches are resolved leftmost-longest.
+    """
+
+    def __init__(self, vocabulary: Iterable[str], synonyms: Optional[Dict[str, str]] = None):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._output: List[Optional[Tuple[int, str]]] = [None]
+        canonical = set(vocabulary)
+
+        for symptom in sorted(canonical):
+            self._add(symptom, symptom)
+        for phrase, symptom in (SYNONYMS if synonyms is None else synonyms).items():
+            symptom = normalize_symptom(symptom)
+            if symptom in canonical:
+                self._add(phrase, symptom)
+
+        self._fail = [0] * len(self._goto)
+        self._dict_link = [0] * len(self._goto)
+        self._link()
+
+    def _add(self, phrase: str, symptom: str) -> None:
+        tokens = tokenize(phrase)
+        if not tokens:
+            return
+        node = 0
+        for token in tokens:
+            child = self._goto[node].get(token)
+            if child is None:
+                child = len(self._goto)
+                self._goto[node][token] = child
+                self._goto.append({})
+                self._output.append(None)
+            node = child
+        # Catalog symptoms are added first, so they win over a synonym spelled the same way
+        if self._output[node] is None:
+            self._output[node] = (len(tokens), symptom)
+
+    def _link(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for token, child in self._goto[node].items():
+                fail = self._fail[node]
+                while fail and token not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(token, 0)
+                target = self._fail[child]
+                self._dict_link[child] = target if self._output[target] is not None else self._dict_link[target]
+                queue.append(child)
+
+    def extract(self, text: str) -> List[str]:
+        """Canonical symptoms mentioned in ``text``, in order of first mention."""
+        matches = []
+        node = 0
+        for end, token in enumerate(tokenize(text)):
+            while node and token not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(token, 0)
+
+            hit = node if self._output[node] is not None else self._dict_link[node]
+            while hit:
+                length, symptom = self._output[hit]
+                matches.append((end - length + 1, -length, symptom))
+                hit = self._dict_link[hit]
+
+        symptoms = []
+        seen = set()
+        covered_until = 0
+        for start, negative_length, symptom in sorted(matches):
+            if start < covered_until:
+                continue
+            covered_until = start - negative_length
+            if symptom not in seen:
+                seen.add(symptom)
+                symptoms.append(symptom)
+        return symptoms
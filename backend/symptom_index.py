@@ -0,0 +1,150 @@
+"""
+Precompiled symptom index for the medical diagnosis model
+"""
+import hashlib
+import sys
+from array import array
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from condition_store import Severity
+
+# Condition fields compiled into the index; any others are kept in ``extras``
+CORE_FIELDS = ('symptoms', 'description', 'severity')
+
+
+def normalize_symptom(symptom: str) -> str:
+    """Return the canonical (lower-cased, stripped, interned) form of a symptom."""
+    return sys.intern(str(symptom).lower().strip())
+
+
+class SymptomIndex:
+    """Immutable index over a condition catalog.
+
+    Built once when the catalog is loaded so the scoring path never has to
+    re-normalize condition symptoms. Holds:
+
+    - ``vocabulary``: every distinct canonical symptom, indexed by symptom id
+    - ``symptom_ids``: canonical symptom -> symptom id
+    - ``postings``: symptom id -> ``array('I')`` of the conditions that list it
+    - ``condition_keys``, ``descriptions``: condition index -> id and
+      description (equal descriptions share one string)
+    - ``condition_symptom_ids``: condition index -> ``array('I')`` of symptom ids
+    - ``severity_codes``: condition index -> code in ``severity_labels``, whose
+      first entries are the ``Severity`` labels
+    - ``extras``: condition index -> fields beyond symptoms, description and
+      severity, for the conditions that have any
+    - ``fingerprint``: digest of the catalog, identical across processes that
+      compiled the same conditions
+    """
+
+    __slots__ = (
+        'vocabulary', 'symptom_ids', 'postings', 'condition_keys', 'condition_symptom_ids',
+        'descriptions', 'severity_codes', 'severity_labels', 'extras', 'fingerprint', '_positions'
+    )
+
+    def __init__(self, conditions: Mapping[str, Dict]):
+        """Compile the index from a ``{condition_id: {'symptoms', 'description', 'severity'}}`` mapping."""
+        self._compile(conditions.items())
+
+    @classmethod
+    def from_records(cls, records: Iterable[Tuple[str, Dict]]) -> 'SymptomIndex':
+        """Compile the index from ``(condition_id, condition)`` pairs, consumed one at a time.
+
+        A condition id seen again adds the symptoms it did not list yet;
+        the first record's description, severity and other fields are kept.
+        """
+        index = cls.__new__(cls)
+        index._compile(records)
+        return index
+
+    def _compile(self, records: Iterable[Tuple[str, Dict]]) -> None:
+        symptom_ids: Dict[str, int] = {}
+        vocabulary: List[str] = []
+        positions: Dict[str, int] = {}
+        condition_keys = []
+        condition_symptom_ids = []
+        descriptions = []
+        shared_descriptions: Dict[str, str] = {}
+        severity_labels: List[str] = [severity.label for severity in Severity]
+        severity_ids: Dict[str, int] = {label: code for code, label in enumerate(severity_labels)}
+        severity_codes = []
+        extras: Dict[int, Dict[str, Any]] = {}
+
+        for condition_id, condition in records:
+            position = positions.get(condition_id)
+            if position is None:
+                ids = array('I')
+                known = None
+            else:
+                ids = condition_symptom_ids[position]
+                known = set(ids)
+            for symptom in condition['symptoms']:
+                canonical = normalize_symptom(symptom)
+                if not canonical:
+                    continue
+                symptom_id = symptom_ids.get(canonical)
+                if symptom_id is None:
+                    symptom_id = len(vocabulary)
+                    symptom_ids[canonical] = symptom_id
+                    vocabulary.append(canonical)
+                if known is not None:
+                    if symptom_id in known:
+                        continue
+                    known.add(symptom_id)
+                ids.append(symptom_id)
+            if position is not None:
+                continue
+
+            positions[condition_id] = len(condition_keys)
+            condition_keys.append(condition_id)
+            condition_symptom_ids.append(ids)
+            description = condition['description']
+            descriptions.append(shared_descriptions.setdefault(description, description))
+            severity = condition['severity']
+            if severity not in severity_ids:
+                severity_ids[severity] = len(severity_labels)
+                severity_labels.append(sys.intern(severity) if isinstance(severity, str) else severity)
+            severity_codes.append(severity_ids[severity])
+            extra = {key: value for key, value in condition.items() if key not in CORE_FIELDS}
+            if extra:
+                extras[len(condition_keys) - 1] = extra
+
+        # Built once every condition is complete, as a later record may still add symptoms to an earlier one
+        postings: List[array] = [array('I') for _ in vocabulary]
+        digest = hashlib.blake2b(digest_size=16)
+        for position, ids in enumerate(condition_symptom_ids):
+            for symptom_id in ids:
+                posting = postings[symptom_id]
+                if not posting or posting[-1] != position:
+                    posting.append(position)
+            digest.update('\x1f'.join((
+                str(condition_keys[position]), '\x1e'.join(vocabulary[i] for i in ids),
+                str(descriptions[position]), str(severity_labels[severity_codes[position]])
+            )).encode('utf-8', 'surrogatepass') + b'\x1d')
+
+        self.vocabulary: Tuple[str, ...] = tuple(vocabulary)
+        self.symptom_ids: Dict[str, int] = symptom_ids
+        self.postings: Tuple[array, ...] = tuple(postings)
+        self.condition_keys: Tuple[str, ...] = tuple(condition_keys)
+        self.condition_symptom_ids: Tuple[array, ...] = tuple(condition_symptom_ids)
+        self.descriptions: Tuple[str, ...] = tuple(descriptions)
+        self.severity_codes = array('B' if len(severity_labels) <= 256 else 'I', severity_codes)
+        self.severity_labels: Tuple[str, ...] = tuple(severity_labels)
+        self.extras = extras
+        self.fingerprint: str = digest.hexdigest()
+        self._positions: Dict[str, int] = positions
+
+    def __len__(self) -> int:
+        return len(self.condition_keys)
+
+    def position(self, condition_id: str) -> Optional[int]:
+        """Return the catalog position of a condition, or None if unknown."""
+        return self._positions.get(condition_id)
+
+    def severity(self, position: int) -> str:
+        """Severity label of the condition at ``position``."""
+        return self.severity_labels[self.severity_codes[position]]
+
+    def lookup(self, symptoms: Iterable[str]) -> List[Optional[int]]:
+        """Map already-normalized symptoms to symptom ids (None when not in the vocabulary)."""
+        return [self.symptom_ids.get(symptom) for symptom in symptoms]
@@ -0,0 +1,17 @@
+"""
+Shared fixtures of the backend test suite
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from medical_model import MedicalDiagnosisModel  # noqa: E402
+
+
+@pytest.fixture
+def model():
+    """A model over the built-in catalog, with its own caches."""
+    return MedicalDiagnosisModel()
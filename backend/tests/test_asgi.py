@@ -0,0 +1,63 @@
+import asyncio
+import json
+
+import asgi
+
+
+def call(method, path, body=b'', headers=()):
+    """Status, headers and body of one request through the ASGI application."""
+    scope = {
+        'type': 'http', 'method': method, 'path': path, 'query_string': b'', 'http_version': '1.1',
+        'scheme': 'http', 'server': ('localhost', 80), 'client': ('127.0.0.1', 1),
+        'headers': [(name.lower().encode(), value.encode()) for name, value in headers]
+    }
+    messages = [{'type': 'http.request', 'body': body, 'more_body': False}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0) if messages else {'type': 'http.disconnect'}
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(asgi.application(scope, receive, send))
+    response_headers = [(name.decode(), value.decode()) for name, value in sent[0]['headers']]
+    return sent[0]['status'], response_headers, b''.join(message.get('body', b'') for message in sent[1:])
+
+
+def header_values(headers, name):
+    return [value for header, value in headers if header == name]
+
+
+def test_reflected_origin_varies_by_origin():
+    status, headers, _ = call('GET', '/api/health-tips', headers=[('Origin', 'http://a.example')])
+    assert status == 200
+    assert header_values(headers, 'access-control-allow-origin') == ['http://a.example']
+    assert header_values(headers, 'vary') == ['Accept-Encoding, Origin']
+
+
+def test_no_origin_leaves_vary_alone():
+    _, headers, _ = call('GET', '/api/health-tips')
+    assert header_values(headers, 'vary') == ['Accept-Encoding']
+    assert not header_values(headers, 'access-control-allow-origin')
+
+
+def test_assessment_adds_vary_origin():
+    payload = {'symptoms': ['fever', 'cough'], 'age': 30, 'gender': 'male', 'weight': 70, 'height': 175}
+    headers = [('Content-Type', 'application/json'), ('Origin', 'http://a.example')]
+    for _ in range(2):
+        # The second request is answered from the assessment cache
+        status, response_headers, body = call('POST', '/api/health-assessment', json.dumps(payload).encode(), headers)
+        assert status == 200
+        assert json.loads(body)['data']['condition'] == 'influenza'
+        assert header_values(response_headers, 'vary') == ['Origin']
+
+
+def test_oversized_body_is_rejected_with_cors(monkeypatch):
+    monkeypatch.setattr(asgi, 'MAX_BODY_BYTES', 16)
+    headers = [('Content-Type', 'application/json'), ('Origin', 'http://a.example')]
+    status, response_headers, body = call('POST', '/api/health-assessment', b'{"symptoms": ["fever", "cough"]}', headers)
+    assert status == 413
+    assert json.loads(body)['error'] == 'Request too large'
+    assert header_values(response_headers, 'access-control-allow-origin') == ['http://a.example']
+    assert header_values(response_headers, 'vary') == ['Origin']
@@ -0,0 +1,40 @@
+from assessment_cache import AssessmentCache, assessment_key
+
+PARAMS = {'symptoms': ['Fever', ' cough '], 'age': 30, 'gender': 'male', 'weight': 70, 'height': 175,
+          'lifestyle': {'exercise': 'daily', 'sleep': '7-8'}}
+
+
+def test_shared_hits_are_copied_locally(tmp_path):
+    path = str(tmp_path / 'assessments.sqlite')
+    AssessmentCache(shared_path=path).put('key', {'condition': 'influenza'})
+    other = AssessmentCache(shared_path=path)
+    assert other.get('key') == {'condition': 'influenza'}
+    assert other.local.get('key') == {'condition': 'influenza'}
+    assert other.stats()['shared']['hits'] == 1
+
+
+def test_key_ignores_symptom_order_and_case():
+    reordered = {**PARAMS, 'symptoms': ['COUGH', 'Fever']}
+    assert assessment_key(PARAMS, 'catalog') == assessment_key(reordered, 'catalog')
+    assert assessment_key({**PARAMS, 'age': 31}, 'catalog') == assessment_key(PARAMS, 'catalog')
+
+
+def test_key_changes_with_inputs_that_change_the_response():
+    key = assessment_key(PARAMS, 'catalog')
+    assert assessment_key(PARAMS, 'other catalog') != key
+    assert assessment_key({**PARAMS, 'age': 70}, 'catalog') != key
+    assert assessment_key({**PARAMS, 'strategy': 'exact'}, 'catalog') != key
+    # 'fever' is a differential trigger only as entered, case-sensitively
+    assert assessment_key({**PARAMS, 'symptoms': ['fever', 'cough']}, 'catalog') != key
+    assert assessment_key({**PARAMS, 'symptoms': []}, 'catalog') is None
+
+
+def test_catalog_reload_invalidates_cached_results(model):
+    fingerprint = model.symptom_index.fingerprint
+    engine = model.similarity_engine
+    engine.best_matches('fever')
+    model.load_conditions({'flu_only': {'symptoms': ['fever'], 'description': '', 'severity': 'mild'}})
+    # A new catalog gets a new cache key prefix and a similarity engine with an empty cache
+    assert model.symptom_index.fingerprint != fingerprint
+    assert model.similarity_engine is not engine
+    assert len(model.similarity_engine.cache) == 0
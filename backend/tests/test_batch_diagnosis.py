@@ -0,0 +1,49 @@
+import pytest
+
+import app as app_module
+
+PATIENT = {'symptoms': ['fever', 'cough'], 'age': 30, 'gender': 'male', 'weight': 70, 'height': 175}
+
+
+@pytest.fixture
+def client():
+    return app_module.app.test_client()
+
+
+def test_batch_matches_single_diagnoses(model):
+    # Each patient with the generate_diagnosis arguments it stands for
+    patients = [
+        ({'symptoms': ['Fever', 'cough'], 'age': 30, 'gender': 'male'}, (['Fever', 'cough'], 30, 'male')),
+        ({'symptoms': ['nausea', 'vomiting'], 'age': '70', 'gender': 'female', 'strategy': 'exact'},
+         (['nausea', 'vomiting'], 70, 'female', 'exact')),
+        ({'symptoms': ['fever', 'cough'], 'age': 30, 'gender': 'male'}, (['fever', 'cough'], 30, 'male')),
+        ({'symptoms': ['sever headach'], 'age': 'unknown', 'strategy': 'weighted'},
+         (['sever headach'], None, None, 'weighted')),
+        ({'symptoms': []}, ([],)),
+        ({'symptoms': 'fever'}, ('fever',)),
+        ('not a patient', (None,)),
+        ({'symptoms': ['fever'], 'strategy': 'no such strategy'}, (['fever'], None, None, 'no such strategy')),
+    ]
+    expected = [model.generate_diagnosis(*arguments) for _, arguments in patients]
+    assert model.generate_diagnosis_batch([patient for patient, _ in patients]) == expected
+
+
+def test_batch_endpoint_keeps_input_order_and_isolates_errors(client):
+    assessments = [PATIENT, {'age': 30}, dict(PATIENT, symptoms=['nausea', 'vomiting']), PATIENT]
+    response = client.post('/api/health-assessment/batch', json={'assessments': assessments})
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['count'] == 4
+    assert [result['index'] for result in body['results']] == [0, 1, 2, 3]
+    assert [result['success'] for result in body['results']] == [True, False, True, True]
+    assert body['results'][1]['error'] == 'Missing required fields'
+    single = client.post('/api/health-assessment', json=assessments[2]).get_json()
+    assert body['results'][2]['data'] == single['data']
+    assert body['results'][0]['data'] == body['results'][3]['data']
+
+
+def test_batch_endpoint_rejects_bad_and_oversized_bodies(client, monkeypatch):
+    assert client.post('/api/health-assessment/batch', json={'assessments': {}}).status_code == 400
+    assert client.post('/api/health-assessment/batch', json=[PATIENT]).status_code == 400
+    monkeypatch.setattr(app_module, 'MAX_BATCH_SIZE', 2)
+    assert client.post('/api/health-assessment/batch', json={'assessments': [PATIENT] * 3}).status_code == 413
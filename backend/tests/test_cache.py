@@ -0,0 +1,84 @@
+import pytest
+
+import cache
+
+
+class Clock:
+    """Stand-in for ``time.monotonic`` / ``time.time`` that only moves when told."""
+
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache.time, 'monotonic', clock)
+    monkeypatch.setattr(cache.time, 'time', clock)
+    return clock
+
+
+def test_lru_evicts_least_recently_used():
+    lru = cache.LRUCache(2)
+    lru.put('a', 1)
+    lru.put('b', 2)
+    assert lru.get('a') == 1
+    lru.put('c', 3)
+    assert lru.get('b') is None
+    assert (lru.get('a'), lru.get('c')) == (1, 3)
+    stats = lru.stats()
+    assert (stats['size'], stats['hits'], stats['misses'], stats['evictions']) == (2, 3, 1, 1)
+
+
+def test_lru_entries_expire_after_ttl(clock):
+    lru = cache.LRUCache(4, ttl=10)
+    lru.put('a', 1)
+    clock.now += 9.9
+    assert lru.get('a') == 1
+    clock.now += 0.1
+    assert lru.get('a') is None
+    assert len(lru) == 0
+    assert lru.stats()['expirations'] == 1
+    # Storing again restarts the lifetime
+    lru.put('a', 2)
+    clock.now += 5
+    assert lru.get('a') == 2
+
+
+def test_lru_without_capacity_stores_nothing():
+    lru = cache.LRUCache(0)
+    assert lru.get_or_compute('a', lambda: 1) == 1
+    assert len(lru) == 0
+    with pytest.raises(ValueError):
+        cache.LRUCache(-1)
+
+
+def test_sqlite_cache_is_shared_bounded_and_expires(tmp_path, clock):
+    path = str(tmp_path / 'cache.sqlite')
+    writer = cache.SQLiteCache(path, capacity=2, ttl=60)
+    reader = cache.SQLiteCache(path, capacity=2, ttl=60)
+    writer.put('a', {'value': [1, 2]})
+    assert reader.get('a') == {'value': [1, 2]}
+
+    clock.now += 1
+    writer.put('b', 2)
+    clock.now += 1
+    writer.put('c', 3)
+    assert reader.get('a') is None
+    assert writer.stats()['evictions'] == 1
+
+    clock.now += 60
+    assert reader.get('b') is None
+    assert reader.get('c') is None
+    assert reader.stats()['expirations'] == 2
+    assert reader.stats()['size'] == 0
+
+
+def test_sqlite_cache_errors_are_misses(tmp_path):
+    broken = cache.SQLiteCache(str(tmp_path / 'missing' / 'cache.sqlite'))
+    broken.put('a', 1)
+    assert broken.get('a', 'default') == 'default'
+    assert broken.stats()['misses'] == 1
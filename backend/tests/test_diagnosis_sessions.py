@@ -0,0 +1,96 @@
+import pytest
+
+import app as app_module
+import diagnosis_sessions
+from diagnosis_sessions import SessionStore
+from scoring_strategies import SIMILARITY_THRESHOLD
+
+
+@pytest.fixture
+def client():
+    return app_module.app.test_client()
+
+
+def test_session_ranks_like_a_fresh_ranking(model):
+    engine = model.similarity_engine
+    session = SessionStore().create(engine)
+    for symptom in ['Fever', 'cough', 'nausea', 'headache']:
+        session.add(symptom)
+    assert session.rank(SIMILARITY_THRESHOLD, 3) == engine.rank(['fever', 'cough', 'nausea', 'headache'],
+                                                               SIMILARITY_THRESHOLD, 3)
+    assert session.remove(' NAUSEA ')
+    assert not session.remove('nausea')
+    assert session.symptoms == ['Fever', 'cough', 'headache']
+    assert session.rank(SIMILARITY_THRESHOLD, 3) == engine.rank(['fever', 'cough', 'headache'],
+                                                               SIMILARITY_THRESHOLD, 3)
+    with pytest.raises(ValueError):
+        session.add('   ')
+
+
+def test_session_rebinds_to_a_reloaded_catalog(model):
+    session = SessionStore().create(model.similarity_engine)
+    session.add('fever')
+    model.load_conditions({'flu_only': {'symptoms': ['fever'], 'description': '', 'severity': 'mild'}})
+    session.rebind(model.similarity_engine)
+    assert session.rank(SIMILARITY_THRESHOLD, 3) == [(0, 1.0)]
+
+
+def test_store_expires_idle_sessions(model, monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(diagnosis_sessions.time, 'monotonic', lambda: now[0])
+    store = SessionStore(ttl=60)
+    idle = store.create(model.similarity_engine)
+    used = store.create(model.similarity_engine)
+    now[0] += 40
+    assert store.get(used.id) is used
+    now[0] += 30
+    assert store.get(idle.id) is None
+    assert store.get(used.id) is used
+    assert store.stats()['expirations'] == 1
+
+
+def test_store_evicts_least_recently_used_beyond_its_budget(model):
+    store = SessionStore(max_bytes=3 * diagnosis_sessions.SESSION_OVERHEAD_BYTES)
+    sessions = [store.create(model.similarity_engine) for _ in range(3)]
+    store.get(sessions[0].id)
+    sessions[2].add('fever')
+    store.resize(sessions[2])
+    assert store.get(sessions[1].id) is None
+    assert store.get(sessions[0].id) is sessions[0]
+    assert store.stats()['evictions'] == 1
+    assert store.delete(sessions[0].id)
+    assert not store.delete(sessions[0].id)
+
+
+def test_session_lifecycle_through_the_api(client):
+    created = client.post('/api/sessions', json={'symptoms': ['fever', 'cough']})
+    assert created.status_code == 201
+    session_id = created.get_json()['session_id']
+
+    added = client.post(f'/api/sessions/{session_id}/symptoms', json={'symptom': 'headache'})
+    assert added.status_code == 200
+    assert added.get_json()['symptoms'] == ['fever', 'cough', 'headache']
+    assessment = client.post('/api/health-assessment', json={
+        'symptoms': ['fever', 'cough', 'headache'], 'age': 30, 'gender': 'male', 'weight': 70, 'height': 175
+    }).get_json()['data']
+    top = added.get_json()['matches'][0]
+    assert (top['condition'], top['similarity']) == (assessment['condition'], assessment['confidence'])
+
+    removed = client.delete(f'/api/sessions/{session_id}/symptoms/cough?top_k=1')
+    assert removed.status_code == 200
+    assert removed.get_json()['symptoms'] == ['fever', 'headache']
+    assert len(removed.get_json()['matches']) == 1
+    assert client.delete(f'/api/sessions/{session_id}/symptoms/cough').status_code == 404
+
+    assert client.get(f'/api/sessions/{session_id}').get_json()['symptoms'] == ['fever', 'headache']
+    assert client.delete(f'/api/sessions/{session_id}').status_code == 200
+    assert client.get(f'/api/sessions/{session_id}').status_code == 404
+
+
+def test_session_input_is_validated(client):
+    assert client.post('/api/sessions', json={'symptoms': 'fever'}).status_code == 400
+    assert client.post('/api/sessions', json={'symptoms': ['fever', '']}).status_code == 400
+    assert client.post('/api/sessions?top_k=0', json={}).status_code == 400
+    session_id = client.post('/api/sessions', json={}).get_json()['session_id']
+    assert client.post(f'/api/sessions/{session_id}/symptoms', json={'symptom': 3}).status_code == 400
+    assert client.post('/api/sessions/missing/symptoms', json={'symptom': 'fever'}).status_code == 404
@@ -0,0 +1,104 @@
+import gzip
+import json
+
+import pytest
+
+import knowledge_base
+from knowledge_base import KnowledgeBaseError
+from symptom_index import SymptomIndex
+
+RECORDS = [
+    {'condition_id': 'influenza', 'symptoms': ['Fever', 'cough', 'fever'], 'description': 'Flu',
+     'severity': 'Moderate', 'icd10': 'J11'},
+    {'id': 'migraine', 'symptoms': ['severe headache', 'nausea'], 'description': 'Headache', 'severity': 'mild'},
+    {'condition_id': 'influenza', 'symptoms': ['cough', 'muscle aches'], 'description': 'Ignored',
+     'severity': 'severe'},
+]
+# The catalog RECORDS compile to: repeated ids merge into the first record
+EXPECTED = {
+    'influenza': {'symptoms': ['fever', 'cough', 'muscle aches'], 'description': 'Flu', 'severity': 'moderate',
+                  'icd10': 'J11'},
+    'migraine': {'symptoms': ['severe headache', 'nausea'], 'description': 'Headache', 'severity': 'mild'},
+}
+
+
+def write_jsonl(path, records, extra_lines=()):
+    opener = gzip.open if str(path).endswith('.gz') else open
+    with opener(path, 'wt', encoding='utf-8') as handle:
+        for record in records:
+            handle.write(json.dumps(record) + '\n')
+        for line in extra_lines:
+            handle.write(line + '\n')
+    return str(path)
+
+
+@pytest.mark.parametrize('name', ['conditions.jsonl', 'conditions.jsonl.gz'])
+def test_jsonl_knowledge_base_loads_into_the_model(model, tmp_path, name):
+    path = write_jsonl(tmp_path / name, RECORDS, ['', 'not json', '[1]', json.dumps({'id': 'x', 'symptoms': []})])
+    report = model.load_knowledge_base(path)
+    assert {key: dict(value) for key, value in model.conditions.items()} == EXPECTED
+    assert model.symptom_index.fingerprint == SymptomIndex(EXPECTED).fingerprint
+    assert (report['records'], report['skipped'], report['merged']) == (6, 3, 1)
+    assert (report['conditions'], report['symptom_pairs'], report['vocabulary']) == (2, 5, 5)
+    assert len(report['errors']) == 3
+    assert model.find_similar_conditions(['fever', 'muscle aches'])[0]['condition'] == 'influenza'
+
+
+def test_long_and_wide_csv_knowledge_bases(model, tmp_path):
+    long = tmp_path / 'long.csv'
+    long.write_text('condition_id,symptom,description,severity,icd10\n'
+                    'influenza,Fever,Flu,Moderate,J11\n'
+                    'migraine,severe headache,Headache,mild,\n'
+                    'influenza,cough,Flu,Moderate,J11\n'
+                    'migraine,nausea,Headache,mild,\n'
+                    'influenza,muscle aches,Flu,Moderate,J11\n', encoding='utf-8')
+    wide = tmp_path / 'wide.csv'
+    wide.write_text('id,symptoms,description,severity,icd10\n'
+                    'influenza,fever;cough;;Fever,Flu,moderate,J11\n'
+                    'migraine,severe headache;nausea,Headache,mild,\n'
+                    'influenza,muscle aches,Flu,moderate,J11\n', encoding='utf-8')
+
+    for path, merged in ((long, 3), (wide, 1)):
+        report = model.load_knowledge_base(str(path))
+        assert {key: dict(value) for key, value in model.conditions.items()} == EXPECTED
+        assert (report['conditions'], report['merged'], report['skipped']) == (2, merged, 0)
+
+
+def test_invalid_knowledge_bases_leave_the_model_unchanged(model, tmp_path):
+    fingerprint = model.symptom_index.fingerprint
+    strict = write_jsonl(tmp_path / 'strict.jsonl', RECORDS, ['{"id": "x"}'])
+    with pytest.raises(KnowledgeBaseError, match='strict.jsonl:4'):
+        model.load_knowledge_base(strict, strict=True)
+    with pytest.raises(KnowledgeBaseError, match='No valid conditions'):
+        model.load_knowledge_base(write_jsonl(tmp_path / 'empty.jsonl', [], ['not json']))
+    with pytest.raises(KnowledgeBaseError, match='Unsupported'):
+        model.load_knowledge_base(str(tmp_path / 'conditions.xml'))
+    assert model.symptom_index.fingerprint == fingerprint
+
+
+def test_records_are_compiled_as_they_are_read(tmp_path, monkeypatch):
+    # The index consumes each record before the next one is read
+    path = write_jsonl(tmp_path / 'conditions.jsonl', RECORDS)
+    read = []
+    compiled = []
+    original = SymptomIndex._compile
+
+    def compile_tracking(index, records):
+        def tracked():
+            for condition_id, record in records:
+                compiled.append(len(read))
+                yield condition_id, record
+        original(index, tracked())
+
+    iter_records = knowledge_base.iter_records
+
+    def reading(path):
+        for item in iter_records(path):
+            read.append(item)
+            yield item
+
+    monkeypatch.setattr(SymptomIndex, '_compile', compile_tracking)
+    monkeypatch.setattr(knowledge_base, 'iter_records', reading)
+    index, _ = knowledge_base.compile_conditions(path)
+    assert compiled == [1, 2, 3]
+    assert len(index) == 2
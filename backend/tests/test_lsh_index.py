@@ -0,0 +1,43 @@
+import random
+
+import pytest
+
+from lsh_index import MinHashLSH
+from symptom_index import SymptomIndex
+
+FLU = ['fever', 'cough', 'headache']
+
+
+def ranked(matches):
+    return [(match['condition'], match['similarity']) for match in matches]
+
+
+def test_candidates_share_a_symptom_and_include_identical_sets():
+    rng = random.Random(4)
+    vocabulary = [f"symptom {i}" for i in range(80)]
+    catalog = {f"condition_{i}": {'symptoms': rng.sample(vocabulary, rng.randint(1, 6)), 'description': '',
+                                  'severity': 'mild'} for i in range(500)}
+    catalog['empty'] = {'symptoms': [], 'description': '', 'severity': 'mild'}
+    index = SymptomIndex(catalog)
+    lsh = MinHashLSH(index, bands=8, rows=2)
+    for position, ids in enumerate(index.condition_symptom_ids):
+        request = set(ids)
+        found = lsh.candidates(request)
+        if request:
+            # Identical sets have identical signatures, so they always collide
+            assert position in found
+        for candidate in found:
+            assert request & set(index.condition_symptom_ids[candidate])
+    assert len(lsh.candidates([])) == 0
+    with pytest.raises(ValueError):
+        MinHashLSH(index, bands=0)
+
+
+@pytest.mark.parametrize('symptoms', [FLU, ['nausea', 'vomitting'], ['runny nose', 'sneezing']])
+def test_lsh_returns_fuzzy_scores_for_what_it_retrieves(model, symptoms):
+    fuzzy = dict(ranked(model.find_conditions(symptoms, 'fuzzy', top_k=6)))
+    lsh = ranked(model.find_conditions(symptoms, 'lsh'))
+    assert lsh
+    for condition, score in lsh:
+        assert fuzzy[condition] == score
+    assert lsh[0] == ranked(model.find_conditions(symptoms, 'fuzzy'))[0]
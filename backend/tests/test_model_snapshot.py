@@ -0,0 +1,63 @@
+import json
+
+import medical_model
+from medical_model import MedicalDiagnosisModel
+
+CATALOG = {
+    'influenza': {'symptoms': ['fever', 'cough', 'muscle aches'], 'description': 'Flu', 'severity': 'moderate'},
+    'migraine': {'symptoms': ['severe headache', 'nausea'], 'description': 'Headache', 'severity': 'mild'},
+}
+SOURCE = {'catalog': 'test', 'size': 1}
+
+
+def test_snapshot_round_trip(tmp_path):
+    path = str(tmp_path / 'model.snapshot')
+    built = MedicalDiagnosisModel()
+    built.load_conditions(CATALOG)
+    built.save_snapshot(path, SOURCE)
+
+    loaded = MedicalDiagnosisModel()
+    assert loaded.load_snapshot(path, SOURCE)
+    assert loaded.symptom_index.fingerprint == built.symptom_index.fingerprint
+    assert {key: dict(value) for key, value in loaded.conditions.items()} == CATALOG
+    text = 'A bad headache and feeling nauseous'
+    assert loaded.extract_symptoms(text) == built.extract_symptoms(text) == ['severe headache', 'nausea']
+    assert loaded.find_similar_conditions(['fevr', 'cough']) == built.find_similar_conditions(['fevr', 'cough'])
+    assert loaded.suggest_symptoms('se') == built.suggest_symptoms('se')
+
+
+def test_mismatched_snapshots_are_refused(tmp_path, monkeypatch):
+    path = str(tmp_path / 'model.snapshot')
+    built = MedicalDiagnosisModel()
+    built.load_conditions(CATALOG)
+    built.save_snapshot(path, SOURCE)
+
+    model = MedicalDiagnosisModel()
+    fingerprint = model.symptom_index.fingerprint
+    assert not model.load_snapshot(path, dict(SOURCE, size=2))
+    assert not model.load_snapshot(path)
+    monkeypatch.setattr(medical_model, 'SNAPSHOT_VERSION', medical_model.SNAPSHOT_VERSION + 1)
+    assert not model.load_snapshot(path, SOURCE)
+    assert model.symptom_index.fingerprint == fingerprint
+
+
+def test_startup_writes_reuses_and_rebuilds_the_snapshot(tmp_path, monkeypatch):
+    catalog = tmp_path / 'conditions.jsonl'
+    catalog.write_text(''.join(json.dumps({'id': key, **value}) + '\n' for key, value in CATALOG.items()))
+    monkeypatch.setenv('CONDITIONS_PATH', str(catalog))
+    monkeypatch.setenv('MODEL_SNAPSHOT', str(tmp_path / 'model.snapshot'))
+    monkeypatch.setattr(medical_model, '_startup_report', {})
+
+    first = medical_model._build_model()
+    assert medical_model.startup_report()['snapshot'] == 'written'
+    second = medical_model._build_model()
+    assert medical_model.startup_report()['snapshot'] == 'loaded'
+    assert second.symptom_index.fingerprint == first.symptom_index.fingerprint
+
+    # A changed catalog file makes the snapshot stale
+    cold = {'id': 'cold', 'symptoms': ['sneezing'], 'description': '', 'severity': 'mild'}
+    with catalog.open('a') as handle:
+        handle.write(json.dumps(cold) + '\n')
+    third = medical_model._build_model()
+    assert medical_model.startup_report()['snapshot'] == 'written'
+    assert len(third.symptom_index) == 3
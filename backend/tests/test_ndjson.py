@@ -0,0 +1,63 @@
+import gzip
+import io
+import json
+
+import pytest
+
+import app as app_module
+from ndjson import UnsupportedEncoding, iter_lines, open_body
+
+PATIENT = {'symptoms': ['fever', 'cough'], 'age': 30, 'gender': 'male', 'weight': 70, 'height': 175}
+
+
+@pytest.fixture
+def client():
+    return app_module.app.test_client()
+
+
+def ndjson(lines):
+    return b''.join(line + b'\n' for line in lines)
+
+
+def test_lines_are_numbered_and_oversized_ones_skipped():
+    body = ndjson([b'{"a": 1}', b'', b'   ', b'x' * 50, b'{"b": 2}']) + b'{"c": 3}'
+    assert list(iter_lines(io.BytesIO(body), 20)) == [
+        (1, b'{"a": 1}\n'), (4, None), (5, b'{"b": 2}\n'), (6, b'{"c": 3}')
+    ]
+
+
+def test_gzip_bodies_are_decoded_as_read():
+    body = ndjson([b'{"a": 1}', b'{"b": 2}'])
+    stream = open_body(io.BytesIO(gzip.compress(body)), 'gzip')
+    assert [line for _, line in iter_lines(stream, 100)] == [b'{"a": 1}\n', b'{"b": 2}\n']
+    assert open_body(io.BytesIO(body), None).read() == body
+    with pytest.raises(UnsupportedEncoding):
+        open_body(io.BytesIO(body), 'br')
+
+
+def test_stream_endpoint_assesses_records_in_order(client, monkeypatch):
+    monkeypatch.setattr(app_module, 'STREAM_CHUNK_SIZE', 2)
+    monkeypatch.setattr(app_module, 'MAX_STREAM_LINE_BYTES', 200)
+    records = [json.dumps(PATIENT).encode(), b'{not json', b'', json.dumps({'age': 30}).encode(),
+               b'"' + b'x' * 300 + b'"', json.dumps(dict(PATIENT, symptoms=['nausea'])).encode()]
+    for body, headers in ((ndjson(records), {}), (gzip.compress(ndjson(records)), {'Content-Encoding': 'gzip'})):
+        response = client.post('/api/health-assessment/stream', data=body, headers=headers)
+        assert response.status_code == 200
+        assert response.mimetype == 'application/x-ndjson'
+        results = [json.loads(line) for line in response.data.splitlines()]
+        assert [(result['line'], result['success']) for result in results] == [
+            (1, True), (2, False), (4, False), (5, False), (6, True)
+        ]
+        assert [result.get('error') for result in results[1:4]] == [
+            'Invalid JSON', 'Missing required fields', 'Line too long'
+        ]
+        batch = client.post('/api/health-assessment/batch', json={'assessments': [PATIENT]}).get_json()
+        assert results[0]['data'] == batch['results'][0]['data']
+
+
+def test_stream_endpoint_reports_bad_bodies(client):
+    response = client.post('/api/health-assessment/stream', data=b'{}', headers={'Content-Encoding': 'br'})
+    assert response.status_code == 415
+    corrupt = gzip.compress(ndjson([json.dumps(PATIENT).encode()] * 3))[:-12]
+    response = client.post('/api/health-assessment/stream', data=corrupt, headers={'Content-Encoding': 'gzip'})
+    assert json.loads(response.data.splitlines()[-1])['error'] == 'Invalid request body'
@@ -0,0 +1,34 @@
+import random
+
+from overlap_index import OverlapIndex
+from symptom_index import SymptomIndex
+
+FLU = ['fever', 'cough', 'headache']
+
+
+def ranked(matches):
+    return [(match['condition'], match['similarity']) for match in matches]
+
+
+def test_exact_scores_share_of_condition_symptoms(model):
+    assert ranked(model.find_conditions(FLU, 'exact')) == [
+        ('influenza', 0.5), ('hypertension', 0.25), ('gastroenteritis', 0.2)
+    ]
+    # Misspellings match nothing exactly
+    assert model.find_conditions(['fevr'], 'exact') == []
+
+
+def test_packed_masks_rank_like_int_masks():
+    rng = random.Random(9)
+    vocabulary = [f"symptom {i}" for i in range(150)]
+    catalog = {f"condition_{i}": {'symptoms': rng.sample(vocabulary, rng.randint(1, 8)), 'description': '',
+                                  'severity': 'mild'} for i in range(300)}
+    index = SymptomIndex(catalog)
+    packed = OverlapIndex(index, packed_min=0)
+    masks = OverlapIndex(index, packed_min=len(index) + 1)
+    assert packed.packed and not masks.packed
+    for _ in range(100):
+        # Repeats and unknown symptoms count nothing
+        symptoms = rng.sample(vocabulary, rng.randint(1, 6)) + ['symptom 0', 'unknown']
+        for top_k in (1, 3, 50):
+            assert packed.rank(symptoms, top_k) == masks.rank(symptoms, top_k)
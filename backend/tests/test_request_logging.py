@@ -0,0 +1,62 @@
+import logging
+import os
+import runpy
+
+import pytest
+
+import request_logging
+from request_logging import configure_logging, dropped_records
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def log_file(tmp_path):
+    """Queue root logging into a file, restoring the root handlers afterwards."""
+    root = logging.getLogger()
+    handlers, level = root.handlers[:], root.level
+    path = tmp_path / 'app.log'
+    file_handler = logging.FileHandler(path)
+    root.handlers = [file_handler]
+    yield path
+    request_logging._stop_listener()
+    request_logging._listener = None
+    file_handler.close()
+    root.handlers, root.level = handlers, level
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason='needs os.fork')
+def test_forked_worker_writes_its_logs(log_file):
+    configure_logging()
+    hooks = runpy.run_path(os.path.join(BACKEND, 'gunicorn.conf.py'))
+    logger = logging.getLogger('test_request_logging')
+
+    pid = os.fork()
+    if pid == 0:
+        status = 1
+        try:
+            hooks['post_fork'](None, None)
+            logger.warning('from the worker')
+            request_logging._stop_listener()
+            status = 0
+        finally:
+            os._exit(status)
+    assert os.waitpid(pid, 0)[1] == 0
+
+    logger.warning('from the master')
+    request_logging._stop_listener()
+    assert log_file.read_text().splitlines() == ['from the worker', 'from the master']
+
+
+def test_full_queue_drops_and_counts_records(log_file):
+    listener = configure_logging(queue_size=2)
+    listener.stop()
+    logger = logging.getLogger('test_request_logging')
+    for number in range(5):
+        logger.warning('record %d', number)
+    assert dropped_records() == 3
+    listener.start()
+    request_logging._stop_listener()
+    assert log_file.read_text().splitlines() == ['record 0', 'record 1']
+    with pytest.raises(ValueError):
+        configure_logging(queue_size=0)
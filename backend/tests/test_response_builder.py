@@ -0,0 +1,15 @@
+import json
+
+from response_builder import FragmentCache, encode, encode_with_fragments
+
+
+def test_fragment_splice_matches_a_full_encode():
+    fragments = FragmentCache(capacity=1)
+    shared = fragments.section(('tips',), lambda: ['Drink water', 'Sleep "enough"'])
+    assert fragments.section(('tips',), lambda: ['rebuilt']) is shared
+    body = {'success': True, 'data': {'condition': 'influenza', 'tips': shared, 'extra': shared}}
+    assert encode_with_fragments(body, fragments, 'data', ['tips']) == encode(body)
+    assert json.loads(encode_with_fragments(body, fragments, 'data', ['tips'])) == body
+    # Past capacity sections are built per request and not stored
+    assert fragments.section(('other',), lambda: [1]) == [1]
+    assert len(fragments) == 1
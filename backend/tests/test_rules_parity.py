@@ -0,0 +1,111 @@
+"""
+Parity of the compiled recommendation tables with the original rules
+
+Every table method is called next to its original (see legacy_rules) on
+every input bucket, at and around each threshold and with malformed input;
+results, including exceptions, must be identical.
+"""
+import itertools
+import logging
+from typing import Any, Callable, List, Tuple
+
+import pytest
+
+import legacy_rules
+from recommendation_rules import EXERCISE_LEVELS, RULES, SLEEP_BANDS, RecommendationTables
+
+ANSWERS = list(EXERCISE_LEVELS) + ['bogus', None, ['unhashable']]
+SLEEPS = list(SLEEP_BANDS) + ['bogus', None]
+LIFESTYLES: List[Any] = (
+    [{}, 'sedentary', 'moderate', 'active', 'very_active', 'unknown', None, 42]
+    + [{'exercise': exercise} for exercise in ANSWERS]
+    + [{'sleep': sleep} for sleep in SLEEPS]
+    + [{'exercise': exercise, 'sleep': sleep} for exercise in ANSWERS for sleep in SLEEPS]
+)
+AGES = [None, 0, 1, 1.99, 2, 17, 17.5, 18, 40, 64, 64.99, 65, 90, '1', '40', '70', 'abc', [3]]
+# Height 100cm makes the BMI equal to the weight, so these straddle the 18.5 and 25 bands
+BODIES = [(weight, 100) for weight in (10, 18.4, 18.5, 18.6, 22, 25, 25.1, 40)] + [(70, 170), (1, 0)]
+CONDITIONS = (list(RULES['differential']['conditions']) + list(RULES['follow_up']['conditions'])
+              + ['Migraine', 'GASTROENTERITIS', 'common_cold', '', 'unknown', None, 7])
+TRIGGERS = list(RULES['differential']['symptoms'])
+SYMPTOM_SETS = [list(combination) + extra
+                for size in range(len(TRIGGERS) + 1) for combination in itertools.combinations(TRIGGERS, size)
+                for extra in ([], ['Fever', 'cough'])] + ['feverish headache', None]
+
+
+@pytest.fixture(scope='module')
+def tables():
+    return RecommendationTables()
+
+
+@pytest.fixture(autouse=True)
+def quiet_logs():
+    # Both implementations log every malformed input they are given
+    logging.disable(logging.CRITICAL)
+    yield
+    logging.disable(logging.NOTSET)
+
+
+def _outcome(function: Callable, *args) -> Tuple[str, Any]:
+    try:
+        return 'result', _plain(function(*args))
+    except Exception as e:
+        return type(e).__name__, str(e)
+
+
+def _plain(value: Any) -> Any:
+    # Tables return tuples and FrozenDicts where the originals built lists and dicts
+    if isinstance(value, (list, tuple)):
+        return [_plain(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _plain(item) for key, item in value.items()}
+    return value
+
+
+def mismatches(original: Callable, compiled: Callable, cases) -> List[str]:
+    """Description of every case whose outcome differs, in order and in key order."""
+    found = []
+    for args in cases:
+        expected, actual = _outcome(original, *args), _outcome(compiled, *args)
+        if expected != actual or (expected[0] == 'result' and repr(expected) != repr(actual)):
+            found.append(f"{args!r}: expected {expected!r}, got {actual!r}")
+    return found
+
+
+def test_lifestyle_recommendations(tables):
+    assert mismatches(legacy_rules.get_lifestyle_recommendations, tables.lifestyle_recommendations,
+                      [(lifestyle,) for lifestyle in LIFESTYLES]) == []
+
+
+def test_fitness_plan(tables):
+    assert mismatches(lambda lifestyle: legacy_rules.generate_fitness_plan(30, lifestyle), tables.fitness_plan,
+                      [(lifestyle,) for lifestyle in LIFESTYLES]) == []
+
+
+def test_diet_plan(tables):
+    cases = [(age, weight, height, lifestyle)
+             for lifestyle in LIFESTYLES for age in AGES for weight, height in BODIES]
+    assert mismatches(legacy_rules.generate_diet_plan, tables.diet_plan, cases) == []
+
+
+def test_preventive_measures(tables):
+    assert mismatches(legacy_rules.get_preventive_measures, tables.preventive_measures,
+                      [(condition,) for condition in CONDITIONS]) == []
+
+
+def test_follow_up_instructions(tables):
+    cases = [(condition, age) for condition in CONDITIONS for age in AGES]
+    assert mismatches(lambda condition, age: legacy_rules.get_follow_up_instructions(condition, age, []),
+                      tables.follow_up_instructions, cases) == []
+
+
+def test_differential_diagnosis(tables):
+    cases = [(condition, symptoms) for condition in CONDITIONS for symptoms in SYMPTOM_SETS]
+    assert mismatches(legacy_rules.get_differential_diagnosis, tables.differential_diagnosis, cases) == []
+
+
+def test_recommendation(tables):
+    cases = [(condition, severity, age, gender)
+             for condition in CONDITIONS for severity in ('high', 'moderate', 'mild', 'low', None, ['high'])
+             for age in AGES for gender in ('male', 'female', 'other', None)]
+    assert mismatches(legacy_rules.generate_recommendation, tables.recommendation, cases) == []
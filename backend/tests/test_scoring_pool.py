@@ -0,0 +1,47 @@
+import pytest
+
+from scoring_pool import ScoringPool
+
+QUERIES = [['fever', 'cough'], ['head ache', 'nausea'], ['feverish'], ['xyz'], ['sneezing', 'runny nose', 'tired']]
+
+
+@pytest.fixture
+def pooled(model):
+    in_process = [model.find_similar_conditions(symptoms) for symptoms in QUERIES]
+    model.start_scoring_pool(2)
+    yield model, in_process
+    model.stop_scoring_pool()
+
+
+def test_pool_ranks_like_the_engine(pooled):
+    model, in_process = pooled
+    assert [model.find_similar_conditions(symptoms) for symptoms in QUERIES] == in_process
+    stats = model.scoring_pool_stats()
+    assert (stats['workers'], stats['backlog'], stats['failed']) == (2, 0, 0)
+    assert stats['completed'] == len(QUERIES)
+
+
+def test_pool_batches_split_across_workers(pooled):
+    model, _ = pooled
+    engine = model.similarity_engine
+    pool = model._active_pool()
+    assert pool.rank_many(QUERIES, 0.6, 3) == engine.rank_many(QUERIES, 0.6, 3)
+    assert pool.rank_many([], 0.6, 3) == []
+    # Catalog symptoms travel as vocabulary ids, anything else as text
+    assert pool.encode(['fever', 'xyz']) == (engine.index.symptom_ids['fever'], 'xyz')
+
+
+def test_pool_follows_catalog_reloads(pooled):
+    model, _ = pooled
+    model.load_conditions({'flu_only': {'symptoms': ['fever'], 'description': '', 'severity': 'mild'}})
+    assert model.scoring_pool_stats()['submitted'] == 0
+    assert [match['condition'] for match in model.find_similar_conditions(['fever'])] == ['flu_only']
+
+
+def test_stopped_pool_scores_in_process(pooled):
+    model, in_process = pooled
+    model.stop_scoring_pool()
+    assert model.scoring_pool_stats() is None
+    assert [model.find_similar_conditions(symptoms) for symptoms in QUERIES] == in_process
+    with pytest.raises(ValueError):
+        ScoringPool(model.similarity_engine, 0)
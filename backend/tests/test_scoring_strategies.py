@@ -0,0 +1,75 @@
+import pytest
+
+import app as app_module
+from scoring_strategies import SIMILARITY_THRESHOLD, ScoringStrategy, strategy_registry
+
+FLU = ['fever', 'cough', 'headache']
+
+
+def ranked(matches):
+    return [(match['condition'], match['similarity']) for match in matches]
+
+
+def test_registry_lists_every_strategy():
+    assert set(strategy_registry.names()) == {'exact', 'weighted', 'bm25', 'ngram', 'fuzzy', 'lsh'}
+    assert 'fuzzy' in strategy_registry
+    assert 'missing' not in strategy_registry
+    assert None not in strategy_registry
+
+
+def test_strategies_must_implement_rank(model):
+    class Unranked(ScoringStrategy):
+        name = 'unranked'
+
+    with pytest.raises(TypeError):
+        Unranked(model)
+
+
+@pytest.mark.parametrize('strategy', strategy_registry.names())
+def test_every_strategy_ranks_influenza_first(model, strategy):
+    matches = model.find_conditions(FLU, strategy)
+    assert matches[0]['condition'] == 'influenza'
+    assert 1 <= len(matches) <= 3
+    scores = [match['similarity'] for match in matches]
+    assert scores == sorted(scores, reverse=True)
+    assert all(0.0 < score <= 1.0 + 1e-12 for score in scores)
+
+
+def test_fuzzy_matches_the_exhaustive_engine(model):
+    symptoms = ['fever', 'coughing', 'head ache', 'nausea']
+    expected = model.similarity_engine.rank(symptoms, SIMILARITY_THRESHOLD, 3)
+    assert ranked(model.find_conditions(symptoms, 'fuzzy')) == [
+        (model.symptom_index.condition_keys[position], score) for position, score in expected
+    ]
+    assert model.find_similar_conditions(symptoms) == model.find_conditions(symptoms, 'fuzzy')
+    assert model.rank_similar(symptoms, 3) == expected
+    assert model.rank_similar_many([symptoms, ['nausea']], 3) == [
+        expected, model.similarity_engine.rank(['nausea'], SIMILARITY_THRESHOLD, 3)
+    ]
+
+
+def test_ngram_tolerates_typos(model):
+    assert model.find_conditions(['diarhea', 'vomitting'], 'ngram')[0]['condition'] == 'gastroenteritis'
+
+
+def test_unknown_strategy_is_rejected(model):
+    with pytest.raises(ValueError):
+        model.find_conditions(FLU, 'missing')
+    response = app_module.app.test_client().post('/api/health-assessment', json={
+        'symptoms': FLU, 'age': 30, 'gender': 'male', 'weight': 70, 'height': 175, 'strategy': 'missing'
+    })
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'Invalid strategy'
+
+
+def test_strategies_follow_catalog_reloads(model):
+    model.find_conditions(FLU, 'exact')
+    model.load_conditions({'flu_only': {'symptoms': ['fever'], 'description': '', 'severity': 'mild'}})
+    for strategy in strategy_registry.names():
+        assert [match['condition'] for match in model.find_conditions(['fever'], strategy)] == ['flu_only']
+
+
+def test_latency_is_recorded_per_strategy(model):
+    before = strategy_registry.stats()['exact']['latency']['calls']
+    model.find_conditions(FLU, 'exact')
+    assert strategy_registry.stats()['exact']['latency']['calls'] == before + 1
@@ -0,0 +1,45 @@
+import random
+
+import pytest
+
+from medical_model import MedicalDiagnosisModel
+from similarity_engine import SimilarityEngine
+from symptom_index import SymptomIndex
+
+WORDS = ['pain', 'chest', 'fever', 'cough', 'nausea', 'rash', 'swelling', 'joint', 'blurred', 'vision',
+         'fatigue', 'dry', 'skin', 'night', 'sweats', 'loss', 'appetite', 'ear', 'ache', 'stiff', 'neck']
+
+
+def random_catalog(rng, conditions=200, vocabulary=120):
+    symptoms = sorted({' '.join(rng.sample(WORDS, rng.randint(1, 3))) for _ in range(vocabulary)})
+    return {f"condition_{i}": {'symptoms': rng.sample(symptoms, rng.randint(1, 7)), 'description': '',
+                               'severity': 'mild'} for i in range(conditions)}
+
+
+def misspell(rng, symptom):
+    characters = list(symptom)
+    for _ in range(rng.randint(0, 2)):
+        characters[rng.randrange(len(characters))] = rng.choice('abcdefghijklmnopqrstuvwxyz ')
+    return ''.join(characters)
+
+
+@pytest.mark.parametrize('candidate_threshold', [0.3, 0.6, 0.9])
+def test_pruned_ranking_matches_the_exhaustive_scan(candidate_threshold):
+    rng = random.Random(4)
+    index = SymptomIndex(random_catalog(rng))
+    exhaustive = SimilarityEngine(index)
+    pruned = SimilarityEngine(index, candidate_threshold=candidate_threshold)
+    assert pruned.profile_index is not None
+    vocabulary = index.vocabulary
+    for _ in range(25):
+        symptoms = [misspell(rng, rng.choice(vocabulary)) for _ in range(rng.randint(1, 4))]
+        for top_k in (1, 3, 20):
+            for threshold in (0.0, 0.3):
+                assert pruned.rank(symptoms, threshold, top_k) == exhaustive.rank(symptoms, threshold, top_k)
+
+
+def test_model_with_candidate_threshold_ranks_like_the_default(model):
+    pruned = MedicalDiagnosisModel(candidate_threshold=0.5, verify_candidates=True)
+    for symptoms in (['fever', 'cough'], ['sever headach', 'nausea'], ['thirsty', 'blurry vision'], ['xyz']):
+        assert pruned.find_similar_conditions(symptoms) == model.find_similar_conditions(symptoms)
+    assert pruned.similarity_engine.verification_failures == 0
@@ -0,0 +1,24 @@
+import gzip
+
+import app as app_module
+from static_responses import StaticResponse
+
+
+def test_not_modified_only_for_the_negotiated_variant():
+    static = StaticResponse.json(app_module.app, {'tips': ['sleep']})
+    identity, gzipped = f'"{static.etag}"', f'"{static.gzip_etag}"'
+
+    status, headers, body = static.negotiate('gzip', gzipped)
+    assert (status, body) == (304, b'')
+    assert ('ETag', gzipped) in headers
+    assert static.negotiate(None, f'W/{identity}')[0] == 304
+    assert static.negotiate('gzip', '*')[0] == 304
+
+    # Holding the other encoding's validator fetches this encoding in full
+    status, headers, body = static.negotiate('gzip', identity)
+    assert status == 200
+    assert gzip.decompress(body) == static.body
+    assert ('Content-Encoding', 'gzip') in headers
+    status, headers, body = static.negotiate('identity', gzipped)
+    assert (status, body) == (200, static.body)
+    assert ('ETag', identity) in headers
@@ -0,0 +1,56 @@
+import random
+
+import app as app_module
+from symptom_autocomplete import SymptomAutocomplete, normalize_prefix
+from symptom_extractor import SYNONYMS
+from symptom_index import SymptomIndex, normalize_symptom
+
+WORDS = ['sore', 'throat', 'severe', 'headache', 'head', 'nausea', 'light', 'sensitivity', 'to', 'fever',
+         'high', 'temperature', 'muscle', 'aches', 'stomach', 'pain', 'abdominal']
+
+
+def naive_suggest(index, prefix, limit):
+    """Rank every phrase and each of its word suffixes by comparing strings one by one."""
+    prefix = normalize_prefix(prefix)
+    if not prefix:
+        return []
+    phrases = [(symptom, symptom, False) for symptom in index.vocabulary]
+    phrases += [(' '.join(phrase.lower().split()), normalize_symptom(symptom), True)
+                for phrase, symptom in SYNONYMS.items() if normalize_symptom(symptom) in index.symptom_ids]
+    best = {}
+    for phrase, symptom, synonym in phrases:
+        words = phrase.split(' ')
+        for start in range(len(words)):
+            if ' '.join(words[start:]).startswith(prefix):
+                conditions = len(index.postings[index.symptom_ids[symptom]])
+                rank = (start > 0, -conditions, synonym, len(phrase), phrase, index.symptom_ids[symptom])
+                best[symptom] = min(best.get(symptom, rank), rank)
+    ranked = sorted(best.values())[:limit]
+    return [{'symptom': index.vocabulary[rank[5]], 'match': rank[4], 'conditions': -rank[1]} for rank in ranked]
+
+
+def test_suggestions_match_a_naive_scan():
+    rng = random.Random(20)
+    vocabulary = sorted({' '.join(rng.sample(WORDS, rng.randint(1, 3))) for _ in range(80)} | {'fever', 'nausea'})
+    catalog = {f"condition_{i}": {'symptoms': rng.sample(vocabulary, rng.randint(1, 6)), 'description': '',
+                                  'severity': 'mild'} for i in range(60)}
+    index = SymptomIndex(catalog)
+    autocomplete = SymptomAutocomplete(index)
+    prefixes = ['', ' ', 'zzz'] + [word[:rng.randint(1, len(word))] for word in WORDS]
+    prefixes += [rng.choice(vocabulary)[:rng.randint(1, 12)] for _ in range(100)]
+    prefixes += ['Sore  Throat', 'sore ', 'HIGH TEMP', 'light sens', 'to l']
+    for prefix in prefixes:
+        for limit in (1, 3, 10, 100):
+            assert autocomplete.suggest(prefix, limit) == naive_suggest(index, prefix, limit), prefix
+
+
+def test_autocomplete_endpoint():
+    client = app_module.app.test_client()
+    response = client.get('/api/symptoms/autocomplete?q=head&limit=2')
+    assert response.status_code == 200
+    assert [suggestion['symptom'] for suggestion in response.get_json()['suggestions']] == [
+        'headache', 'mild headache'
+    ]
+    assert client.get('/api/symptoms/autocomplete?q=head&limit=0').status_code == 400
+    assert client.get('/api/symptoms/autocomplete?q=head&limit=100000').status_code == 400
+    assert client.get('/api/symptoms/autocomplete?q=' + 'a' * 10000).status_code == 400
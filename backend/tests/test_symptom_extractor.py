@@ -0,0 +1,56 @@
+import random
+
+from symptom_extractor import SymptomExtractor, tokenize
+
+VOCABULARY = ['sore throat pain', 'throat', 'shortness of breath', 'breath test', 'severe headache', 'headache',
+              'pain']
+
+
+def naive_extract(vocabulary, text):
+    """Leftmost-longest matching by trying every phrase at every token."""
+    phrases = sorted((tokenize(symptom), symptom) for symptom in vocabulary)
+    tokens = tokenize(text)
+    symptoms = []
+    start = 0
+    while start < len(tokens):
+        found = [(len(words), symptom) for words, symptom in phrases if tokens[start:start + len(words)] == words]
+        if found:
+            length, symptom = max(found, key=lambda item: item[0])
+            if symptom not in symptoms:
+                symptoms.append(symptom)
+            start += length
+        else:
+            start += 1
+    return symptoms
+
+
+def test_longest_phrase_wins_over_nested_and_overlapping_ones():
+    extractor = SymptomExtractor(VOCABULARY, synonyms={})
+    # 'headache' is nested in 'severe headache'; 'breath test' overlaps 'shortness of breath'
+    assert extractor.extract('Severe headache and shortness of breath test') == [
+        'severe headache', 'shortness of breath'
+    ]
+    # A failed longer phrase falls back to the shorter ones it contains
+    assert extractor.extract('sore throat, then more pain') == ['throat', 'pain']
+    assert extractor.extract('sore throat pain, throat, headache; headache') == [
+        'sore throat pain', 'throat', 'headache'
+    ]
+
+
+def test_synonyms_map_to_catalog_symptoms(model):
+    assert model.extract_symptoms("Stuffy nose, feeling feverish with a bad headache. Threw up twice.") == [
+        'congestion', 'fever', 'severe headache', 'vomiting'
+    ]
+    # Catalog spellings win over a synonym, and synonyms of missing symptoms are ignored
+    synonyms = {'fever': 'cough', 'high temperature': 'fever', 'coughing': 'cough'}
+    extractor = SymptomExtractor(['fever'], synonyms=synonyms)
+    assert extractor.extract('high temperature and coughing, fever') == ['fever']
+
+
+def test_extraction_matches_a_naive_scan():
+    rng = random.Random(5)
+    words = sorted({word for symptom in VOCABULARY for word in tokenize(symptom)} | {'and', 'of'})
+    extractor = SymptomExtractor(VOCABULARY, synonyms={})
+    for _ in range(500):
+        text = ' '.join(rng.choice(words) for _ in range(rng.randint(0, 12)))
+        assert extractor.extract(text) == naive_extract(VOCABULARY, text), text
@@ -0,0 +1,19 @@
+import random
+
+import numpy as np
+
+from top_k import TopK, select_top_k
+
+
+def test_select_top_k_orders_like_the_heap():
+    rng = random.Random(22)
+    for _ in range(300):
+        # Few distinct values, so ties at the k-th score are common
+        scores = np.array([rng.choice([0.0, 0.25, 0.5, 0.75, 1.0]) for _ in range(rng.randint(0, 40))])
+        threshold = rng.choice([0.0, 0.3])
+        for top_k in (0, 1, 3, 50):
+            top = TopK(top_k)
+            for position, score in enumerate(scores):
+                if score > threshold:
+                    top.push(position, float(score))
+            assert select_top_k(scores, threshold, top_k) == top.results()
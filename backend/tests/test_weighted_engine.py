@@ -0,0 +1,54 @@
+import random
+
+import pytest
+
+from symptom_index import SymptomIndex
+from weighted_engine import SCHEMES, WeightedEngine
+
+
+def synthetic_catalog(size, seed=3):
+    rng = random.Random(seed)
+    vocabulary = [f"symptom {i}" for i in range(60)]
+    return {
+        f"condition_{i}": {'symptoms': rng.sample(vocabulary, rng.randint(1, 9)), 'description': '',
+                           'severity': 'mild'}
+        for i in range(size)
+    }
+
+
+def test_tfidf_full_symptom_match_scores_one(model):
+    engine = WeightedEngine(model.symptom_index, 'tfidf')
+    for position, (key, condition) in enumerate(model.conditions.items()):
+        ranked = engine.rank(list(condition['symptoms']), threshold=0.0, top_k=1)
+        assert ranked[0][0] == position, key
+        assert ranked[0][1] == pytest.approx(1.0)
+
+
+def test_bm25_counts_idf_once(model):
+    engine = WeightedEngine(model.symptom_index, 'bm25')
+    ranked = engine.rank(['nosebleeds'], threshold=0.0, top_k=3)
+    assert [model.symptom_index.condition_keys[position] for position, _ in ranked] == ['hypertension']
+    assert ranked[0][1] == pytest.approx(0.489, abs=1e-3)
+    # A full match ranks first and stays below the (k1 + 1) * IDF bound
+    full = engine.rank(list(model.conditions['hypertension']['symptoms']), threshold=0.0, top_k=1)
+    assert model.symptom_index.condition_keys[full[0][0]] == 'hypertension'
+    assert 0.0 < full[0][1] <= 1.0
+
+
+@pytest.mark.parametrize('scheme', SCHEMES)
+def test_scores_never_exceed_one(scheme):
+    index = SymptomIndex(synthetic_catalog(400))
+    engine = WeightedEngine(index, scheme)
+    rng = random.Random(5)
+    for _ in range(200):
+        symptoms = rng.sample(index.vocabulary, rng.randint(1, 6))
+        for _, score in engine.rank(symptoms, threshold=0.0, top_k=len(index)):
+            assert 0.0 < score <= 1.0 + 1e-12
+
+
+def test_rare_symptoms_weigh_more(model):
+    # 'headache' is listed by two conditions and 'nosebleeds' by one
+    for strategy in ('weighted', 'bm25'):
+        matches = model.find_conditions(['headache', 'nosebleeds'], strategy)
+        assert matches[0]['condition'] == 'hypertension'
+        assert matches[1]['similarity'] < matches[0]['similarity'] / 2
@@ -0,0 +1,75 @@
+"""
+Bounded top-k selection over scored conditions
+"""
+import heapq
+from typing import List, Tuple
+
+import numpy as np
+
+
+class TopK:
+    """Bounded min-heap keeping the ``k`` best ``(position, score)`` pairs.
+
+    The order matches a stable descending sort over catalog positions: a
+    higher score ranks first, and on equal scores the lower position wins.
+    The heap minimum is the bar every further candidate has to beat, so
+    callers can skip or stop scoring conditions whose optimistic bound
+    cannot clear it.
+    """
+
+    __slots__ = ('k', '_heap')
+
+    def __init__(self, k: int):
+        self.k = k
+        self._heap: List[Tuple[float, int]] = []  # (score, -position)
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    @property
+    def full(self) -> bool:
+        return len(self._heap) >= self.k
+
+    @property
+    def floor(self) -> float:
+        """Score a candidate must exceed to enter, or -inf while the heap is not full."""
+        return self._heap[0][0] if self.full and self._heap else float('-inf')
+
+    def beats(self, score: float, position: int) -> bool:
+        """Whether a condition scoring ``score`` (or at most ``score``) could still enter."""
+        if self.k <= 0:
+            return False
+        return not self.full or (score, -position) > self._heap[0]
+
+    def push(self, position: int, score: float) -> None:
+        """Offer a fully scored condition."""
+        if not self.beats(score, position):
+            return
+        if self.full:
+            heapq.heapreplace(self._heap, (score, -position))
+        else:
+            heapq.heappush(self._heap, (score, -position))
+
+    def results(self) -> List[Tuple[int, float]]:
+        """Kept pairs, best first."""
+        return [(-negative_position, score) for score, negative_position in sorted(self._heap, reverse=True)]
+
+
+def select_top_k(scores: np.ndarray, threshold: float, top_k: int) -> List[Tuple[int, float]]:
+    """Up to ``top_k`` ``(position, score)`` pairs of a score vector scoring above ``threshold``.
+
+    The vectorized counterpart of ``TopK``, in the same order: best first,
+    and on equal scores the lower position wins.
+    """
+    if top_k <= 0:
+        return []
+    candidates = np.flatnonzero(scores > threshold)
+    if len(candidates) > top_k:
+        # Partition instead of sorting every candidate; ties at the k-th score go to the lowest positions
+        candidate_scores = scores[candidates]
+        kth = np.partition(candidate_scores, len(candidates) - top_k)[len(candidates) - top_k]
+        above = candidates[candidate_scores > kth]
+        tied = candidates[candidate_scores == kth][:top_k - len(above)]
+        candidates = np.sort(np.concatenate([above, tied]))
+    order = candidates[np.argsort(-scores[candidates], kind='stable')]
+    return [(int(position), float(scores[position])) for position in order]
@@ -0,0 +1,119 @@
+"""
+Sparse TF-IDF / BM25 scoring over a precompiled symptom index
+"""
+import math
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+from symptom_index import SymptomIndex
+from top_k import select_top_k
+
+SCHEMES = ('tfidf', 'bm25')
+
+
+class WeightedEngine:
+    """Scores conditions by IDF-weighted overlap with the input symptoms.
+
+    A symptom listed by few conditions weighs more than one most conditions
+    share. The condition x symptom weight matrix is precomputed and kept by
+    symptom rows (CSR of its transpose: ``indptr``, condition ``indices``
+    and ``data``), so a request reads only the rows of its own symptoms and
+    its score vector is one sparse dot product.
+
+    ``tfidf`` scores the cosine of the TF-IDF vectors (smoothed IDF,
+    ``log((N + 1) / (df + 1)) + 1``), so a condition listing exactly the
+    input symptoms scores 1. ``bm25`` sums Okapi BM25 term weights and
+    divides by the most the request could score (``(k1 + 1)`` times the IDF
+    of each of its symptoms, the limit of a term weight as its frequency
+    grows), so both lie in [0, 1]. Symptoms outside the vocabulary count
+    as unseen terms: they match nothing but weigh in the request's norm.
+    """
+
+    def __init__(self, index: SymptomIndex, scheme: str = 'tfidf', k1: float = 1.2, b: float = 0.75):
+        if scheme not in SCHEMES:
+            raise ValueError(f"Unknown weighting scheme: {scheme}")
+        self.index = index
+        self.scheme = scheme
+        self.k1 = k1
+        self.b = b
+
+        count = len(index)
+        vocabulary_size = len(index.vocabulary)
+        self.idf: List[float] = [self._idf(len(postings)) for postings in index.postings]
+        self.unseen_idf = self._idf(0)
+
+        lengths = [len(symptom_ids) for symptom_ids in index.condition_symptom_ids]
+        average_length = sum(lengths) / count if count and sum(lengths) else 1.0
+        # Term frequency of every distinct (symptom, condition) pair, as symptom_id * count + position
+        pairs = np.repeat(np.arange(count, dtype=np.int64), lengths)
+        if len(pairs):
+            pairs += np.concatenate([
+                np.frombuffer(symptom_ids, dtype=np.uint32) for symptom_ids in index.condition_symptom_ids
+            ]).astype(np.int64) * count
+        pairs, tf = np.unique(pairs, return_counts=True)
+        symptom_ids, positions = np.divmod(pairs, max(count, 1))
+        idf = np.array(self.idf, dtype=np.float64)[symptom_ids]
+        if scheme == 'tfidf':
+            weights = tf * idf
+            # Unit-length condition vectors, so the dot product is the cosine
+            squares = np.bincount(positions, weights=weights * weights, minlength=count)
+            weights = weights / np.sqrt(squares[positions])
+        else:
+            norm = 1 - b + b * np.array(lengths, dtype=np.int64)[positions] / average_length
+            weights = idf * tf * (k1 + 1) / (tf + k1 * norm)
+
+        self.indptr = np.zeros(vocabulary_size + 1, dtype=np.int64)
+        np.cumsum(np.bincount(symptom_ids, minlength=vocabulary_size), out=self.indptr[1:])
+        self.indices = positions.astype(np.intp)
+        self.data = weights
+
+    def _idf(self, df: int) -> float:
+        count = len(self.index)
+        if self.scheme == 'tfidf':
+            return math.log((count + 1) / (df + 1)) + 1
+        return math.log(1 + (count - df + 0.5) / (df + 0.5))
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the CSR arrays."""
+        return self.indptr.nbytes + self.indices.nbytes + self.data.nbytes
+
+    def query(self, symptoms: Sequence[str]) -> List[Tuple[int, float]]:
+        """``(symptom id, weight)`` of the distinct known input symptoms, scaled so scores lie in [0, 1]."""
+        seen = set()
+        terms = []
+        norm = 0.0
+        for symptom, symptom_id in zip(symptoms, self.index.lookup(symptoms)):
+            term = symptom if symptom_id is None else symptom_id
+            if term in seen:
+                continue
+            seen.add(term)
+            idf = self.unseen_idf if symptom_id is None else self.idf[symptom_id]
+            norm += idf * idf if self.scheme == 'tfidf' else idf * (self.k1 + 1)
+            if symptom_id is not None:
+                terms.append((symptom_id, idf))
+        if self.scheme == 'tfidf':
+            return [(symptom_id, idf / math.sqrt(norm)) for symptom_id, idf in terms]
+        # BM25 matrix values already hold the IDF, so each matched symptom counts once
+        return [(symptom_id, 1 / norm) for symptom_id, _ in terms]
+
+    def rank(self, symptoms: Sequence[str], threshold: float, top_k: int) -> List[Tuple[int, float]]:
+        """Return up to ``top_k`` ``(position, score)`` pairs scoring above ``threshold``.
+
+        Ties keep catalog order, matching a stable descending sort.
+        """
+        terms = self.query(symptoms)
+        if not terms or top_k <= 0:
+            return []
+        rows = [slice(self.indptr[symptom_id], self.indptr[symptom_id + 1]) for symptom_id, _ in terms]
+        positions = np.concatenate([self.indices[row] for row in rows])
+        products = np.concatenate([self.data[row] * weight for row, (_, weight) in zip(rows, terms)])
+        # bincount adds each condition's products in query order
+        scores = np.bincount(positions, weights=products, minlength=len(self.index))
+        return select_top_k(scores, threshold, top_k)
+
+    def rank_many(self, symptom_lists: Sequence[Sequence[str]], threshold: float,
+                  top_k: int) -> List[List[Tuple[int, float]]]:
+        """Rank several symptom lists; results in input order."""
+        return [self.rank(symptoms, threshold, top_k) for symptoms in symptom_lists]